@@ -4,6 +4,6 @@ Expose the main submodules so other packages can import from
 `app.core` (for example `from app.core import config`).
 """
 
-from . import auth, config, enums
+from . import auth, cache, config, enums, executors
 
-__all__ = ["auth", "config", "enums"]
+__all__ = ["auth", "cache", "config", "enums", "executors"]
@@ -0,0 +1,107 @@
+"""Small thread-safe LRU cache bounded by total byte size.
+
+Used by the in-process caches on the serving path. Entries carry an
+explicit size estimate supplied by the caller; the least recently used
+entries are evicted once the sum exceeds `max_bytes`. An optional `ttl`
+(seconds) expires entries on access.
+"""
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Hashable, Iterable
+
+
+class LRUCache:
+    def __init__(self, max_bytes: int, ttl: float | None = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # a peek: no hit/miss accounting and no LRU reordering
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (self.ttl is None or time.monotonic() - item[2] <= self.ttl)
+
+    def _lookup(self, key: Hashable, now: float):
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if self.ttl is not None and now - item[2] > self.ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._lookup(key, time.monotonic())
+        return default if item is None else item[0]
+
+    def get_many(self, keys: Iterable[Hashable]) -> list:
+        """Return cached values for `keys` (None where missing), in order."""
+        now = time.monotonic()
+        with self._lock:
+            out = []
+            for key in keys:
+                item = self._lookup(key, now)
+                out.append(None if item is None else item[0])
+            return out
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        self.put_many([(key, value, nbytes)])
+
+    def put_many(self, items: Iterable[tuple[Hashable, Any, int]]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, value, nbytes in items:
+                if nbytes > self.max_bytes:
+                    continue
+                if key in self._data:
+                    self._remove(key)
+                self._data[key] = (value, nbytes, now)
+                self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._data:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def discard_where(self, predicate) -> int:
+        """Drop every entry whose key satisfies `predicate`; return the count."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, nbytes, _ = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,75 @@
+"""Runtime settings read from environment variables.
+
+Values are resolved once at import time; set the variables before the
+application starts (e.g. in `.env`, which `main.py` loads).
+"""
+import os
+
+
+# process-pool size for curve feature extraction during training
+CURVE_EXTRACT_JOBS = int(os.getenv("CURVE_EXTRACT_JOBS", "1"))
+# rows per (column, row-shard) work unit when extracting in parallel
+CURVE_EXTRACT_SHARD_ROWS = int(os.getenv("CURVE_EXTRACT_SHARD_ROWS", "250000"))
+# byte budget of the serving-time curve feature cache (0 disables it)
+CURVE_FEATURE_CACHE_BYTES = int(os.getenv("CURVE_FEATURE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# running curve state kept by /predict/append: entities beyond the cap are
+# evicted least recently updated first, and idle ones after the TTL (seconds)
+INCREMENTAL_MAX_ENTITIES = int(os.getenv("INCREMENTAL_MAX_ENTITIES", "100000"))
+INCREMENTAL_IDLE_TTL_S = float(os.getenv("INCREMENTAL_IDLE_TTL_S", "3600"))
+# estimated resident-memory budget of the loaded-model cache used by /deploy
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+# default micro-batching for /deploy/predict; a registry entry can override
+# both via metadata {"batching": {"max_batch_rows": ..., "max_wait_ms": ...}}
+MICRO_BATCH_MAX_ROWS = int(os.getenv("MICRO_BATCH_MAX_ROWS", "512"))
+# 0 disables micro-batching unless a model enables it in its metadata
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "0"))
+# longest a request waits for its micro-batch result before failing (seconds)
+MICRO_BATCH_TIMEOUT_S = float(os.getenv("MICRO_BATCH_TIMEOUT_S", "30"))
+# dedicated bounded pools so inference latency is isolated from training;
+# requests beyond workers + queue depth are rejected with 503
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 4)))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "64"))
+# training jobs (/train) run in up to TRAINING_WORKERS worker processes;
+# at most TRAINING_QUEUE_DEPTH further jobs wait in the priority queue
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", "1"))
+TRAINING_QUEUE_DEPTH = int(os.getenv("TRAINING_QUEUE_DEPTH", "4"))
+# parallel members of a /train/sweep job, each pinned to its own CPU slice
+# (0 = one per config, capped at the CPU count)
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "0"))
+# fallback SimpleTabularPredictor: rows per normal-equation chunk and L2 penalty
+SIMPLE_FIT_CHUNK_ROWS = int(os.getenv("SIMPLE_FIT_CHUNK_ROWS", "100000"))
+SIMPLE_RIDGE = float(os.getenv("SIMPLE_RIDGE", "0"))
+# sparse (CSR) design matrix for high-cardinality categoricals; with
+# SIMPLE_HASH_BUCKETS > 0 categoricals are hashed into that many columns
+SIMPLE_SPARSE = os.getenv("SIMPLE_SPARSE", "0").lower() in ("1", "true", "yes")
+SIMPLE_HASH_BUCKETS = int(os.getenv("SIMPLE_HASH_BUCKETS", "0"))
+# run ids from the model registry to load and warm up at startup
+# (comma-separated; "*" preloads every registered model)
+PRELOAD_RUN_IDS = [r.strip() for r in os.getenv("PRELOAD_RUN_IDS", "").split(",") if r.strip()]
+# models that failed to preload are retried in the background, first after
+# WARMUP_RETRY_S seconds and then with doubling delays up to the max (0 disables)
+WARMUP_RETRY_S = float(os.getenv("WARMUP_RETRY_S", "30"))
+WARMUP_RETRY_MAX_S = float(os.getenv("WARMUP_RETRY_MAX_S", "600"))
+# model served by the /predict router: a registry run id, or "latest" for the
+# newest registered tabular model (training jobs are picked up without a
+# restart); an explicit AutoGluon directory in PREDICT_MODEL_PATH wins
+PREDICT_RUN_ID = os.getenv("PREDICT_RUN_ID", "latest")
+PREDICT_MODEL_PATH = os.getenv("PREDICT_MODEL_PATH", "")
+# per-row prediction cache for /deploy/predict, keyed by model version and
+# feature-row hash (0 disables it); entries expire after the TTL (seconds)
+PREDICTION_CACHE_BYTES = int(os.getenv("PREDICTION_CACHE_BYTES", "0"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "60"))
+# checkpoints of streaming anomaly detectors (/deploy/stream), one .npz per stream
+STREAM_CHECKPOINT_DIR = os.getenv("STREAM_CHECKPOINT_DIR", "./artifacts/streams")
+# most streaming detectors held at once; creating more fails until one is closed
+STREAM_MAX_STREAMS = int(os.getenv("STREAM_MAX_STREAMS", "1000"))
+# per-series forecast cache of each loaded time-series model (0 disables it)
+FORECAST_CACHE_BYTES = int(os.getenv("FORECAST_CACHE_BYTES", str(256 * 1024 * 1024)))
+# root for per-run training artifacts (<root>/runs/<run name>, <root>/jobs/<job id>)
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", "./artifacts")
+# on-disk curve feature store reused across training runs (opt-in: "" disables);
+# partitions are compacted beyond FEATURE_STORE_MAX_PARTS, and compaction keeps
+# only rows of the newest FEATURE_STORE_KEEP_DATASETS training sets (0 keeps all)
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "")
+FEATURE_STORE_MAX_PARTS = int(os.getenv("FEATURE_STORE_MAX_PARTS", "16"))
+FEATURE_STORE_KEEP_DATASETS = int(os.getenv("FEATURE_STORE_KEEP_DATASETS", "20"))
@@ -0,0 +1,61 @@
+"""Bounded executors for CPU-heavy work called from async routes.
+
+Inference and training each get their own thread pool so a long `/train`
+call can never occupy the threads that serve predictions or health
+checks. Every pool also has a queue-depth limit: once `max_workers +
+max_queue` jobs are pending, `submit` raises `ExecutorBusy` (mapped to
+HTTP 503 in `main.py`) instead of queueing without bound.
+"""
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+from app.core import config
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when a bounded executor's queue is full."""
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusy(f"{self.name} executor is at capacity")
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn` on the pool and await its result from the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+        }
+
+
+inference_executor = BoundedExecutor("inference", config.INFERENCE_WORKERS, config.INFERENCE_QUEUE_DEPTH)
+training_executor = BoundedExecutor("training", config.TRAINING_WORKERS, config.TRAINING_QUEUE_DEPTH)
@@ -0,0 +1,164 @@
+"""Binary columnar request decoding for `/deploy/predict`.
+
+JSON payloads are validated cell by cell by pydantic (including every
+float of every curve) and rebuilt row by row by pandas. This module
+decodes two binary formats straight into a DataFrame of scalar columns
+plus packed ragged curve buffers `(values, offsets)` that
+`CurveFeatureExtractor.transform(df, packed=...)` consumes directly:
+
+- Arrow IPC stream (`application/vnd.apache.arrow.stream`): list-typed
+  columns are curves; their child values and offsets buffers are used
+  without copying.
+- NumPy `.npz` (`application/x-npz`): 1-D arrays are scalar columns; a
+  curve column is either a pair `<col>.values` / `<col>.offsets` or a
+  2-D `(rows, points)` array of equal-length curves. Members stored
+  without compression are mapped onto the request body without copying.
+
+Optional request metadata (`curve_features`) can be placed in the Arrow
+schema metadata under the `curve_features` key as JSON.
+"""
+import io
+import json
+import struct
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+try:
+	import pyarrow as pa
+except Exception:  # pragma: no cover - pyarrow is optional
+	pa = None
+
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NPZ = "application/x-npz"
+COLUMNAR_CONTENT_TYPES = (ARROW_STREAM, NPZ)
+
+Packed = dict[str, tuple[np.ndarray, np.ndarray]]
+
+_NPY_HEADER_MAX = 1 << 16
+
+
+def decode_columnar(body: bytes, content_type: str) -> tuple[pd.DataFrame, Packed, dict]:
+	"""Decode a binary request body.
+
+	Returns `(frame, packed_curves, metadata)`; `frame` holds the scalar
+	columns and `packed_curves` maps each curve column to its buffers.
+	"""
+	if content_type == ARROW_STREAM:
+		return decode_arrow_stream(body)
+	if content_type == NPZ:
+		return decode_npz(body)
+	raise ValueError(f"Unsupported columnar content type: {content_type}")
+
+
+def decode_arrow_stream(body: bytes) -> tuple[pd.DataFrame, Packed, dict]:
+	if pa is None:
+		raise ImportError("pyarrow is required to decode Arrow IPC requests")
+	table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+	meta = table.schema.metadata or {}
+	metadata = {}
+	if b"curve_features" in meta:
+		metadata["curve_features"] = json.loads(meta[b"curve_features"])
+
+	packed: Packed = {}
+	scalar_cols = []
+	for field in table.schema:
+		if pa.types.is_list(field.type) or pa.types.is_large_list(field.type) or pa.types.is_fixed_size_list(field.type):
+			values, offsets = _arrow_list_buffers(table.column(field.name).combine_chunks())
+			packed[field.name] = (values, checked_offsets(field.name, values, offsets))
+		else:
+			scalar_cols.append(field.name)
+	frame = table.select(scalar_cols).to_pandas() if scalar_cols else pd.DataFrame(index=range(table.num_rows))
+	return frame, packed, metadata
+
+
+def _arrow_list_buffers(arr) -> tuple[np.ndarray, np.ndarray]:
+	if pa.types.is_fixed_size_list(arr.type):
+		width = arr.type.list_size
+		values = arr.flatten().to_numpy(zero_copy_only=arr.flatten().null_count == 0)
+		return values, np.arange(len(arr) + 1, dtype=np.int64) * width
+	offsets = arr.offsets.to_numpy()
+	child = arr.values
+	start, stop = int(offsets[0]), int(offsets[-1])
+	if start or stop != len(child):
+		child = child.slice(start, stop - start)
+	values = child.to_numpy(zero_copy_only=child.null_count == 0)
+	return values, offsets.astype(np.int64) - start
+
+
+def decode_npz(body: bytes) -> tuple[pd.DataFrame, Packed, dict]:
+	arrays = _npz_arrays(body)
+	packed: Packed = {}
+	scalars = {}
+	for name, arr in arrays.items():
+		if name.endswith(".offsets"):
+			continue
+		if name.endswith(".values"):
+			col = name[: -len(".values")]
+			offsets = arrays.get(f"{col}.offsets")
+			if offsets is None:
+				raise ValueError(f"npz curve column '{col}' has values but no offsets")
+			packed[col] = (arr, checked_offsets(col, arr, offsets))
+		elif arr.ndim == 2:
+			rows, width = arr.shape
+			packed[name] = (arr.reshape(-1), np.arange(rows + 1, dtype=np.int64) * width)
+		else:
+			scalars[name] = arr
+	rows = {name: len(arr) for name, arr in scalars.items()}
+	rows.update({col: len(offsets) - 1 for col, (_, offsets) in packed.items()})
+	if len(set(rows.values())) > 1:
+		lengths = ", ".join(f"{name}={n}" for name, n in rows.items())
+		raise ValueError(f"npz columns have mismatched row counts: {lengths}")
+	n_rows = next(iter(rows.values()), 0)
+	frame = pd.DataFrame(scalars, index=None if scalars else range(n_rows))
+	return frame, packed, {}
+
+
+def checked_offsets(col: str, values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+	"""Validate a ragged curve's offsets against its values; return them as int64.
+
+	Offsets must be a 1-D integer array starting at 0, non-decreasing and
+	ending at `len(values)`, so every row's slice lies inside `values`.
+	"""
+	if values.ndim != 1:
+		raise ValueError(f"curve column '{col}': values must be 1-D, got shape {values.shape}")
+	if offsets.ndim != 1 or not np.issubdtype(offsets.dtype, np.integer):
+		raise ValueError(f"curve column '{col}': offsets must be a 1-D integer array")
+	if len(offsets) == 0 or offsets[0] != 0:
+		raise ValueError(f"curve column '{col}': offsets must start at 0")
+	if (np.diff(offsets) < 0).any():
+		raise ValueError(f"curve column '{col}': offsets must be non-decreasing")
+	if offsets[-1] != len(values):
+		raise ValueError(f"curve column '{col}': offsets end at {offsets[-1]} but there are {len(values)} values")
+	return offsets.astype(np.int64, copy=False)
+
+
+def _npz_arrays(body: bytes) -> dict[str, np.ndarray]:
+	"""Read every array of an .npz archive, mapping stored members in place."""
+	view = memoryview(body)
+	out = {}
+	with zipfile.ZipFile(io.BytesIO(body)) as zf:
+		for info in zf.infolist():
+			name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+			if info.compress_type != zipfile.ZIP_STORED:
+				with zf.open(info) as fh:
+					out[name] = np.lib.format.read_array(fh, allow_pickle=False)
+				continue
+			# local header: 30 fixed bytes, then file name and extra field
+			name_len, extra_len = struct.unpack("<HH", body[info.header_offset + 26:info.header_offset + 30])
+			start = info.header_offset + 30 + name_len + extra_len
+			# only the (small) .npy header is copied to parse it
+			member = io.BytesIO(bytes(view[start:start + min(info.file_size, _NPY_HEADER_MAX)]))
+			version = np.lib.format.read_magic(member)
+			if version == (1, 0):
+				shape, fortran, dtype = np.lib.format.read_array_header_1_0(member)
+			else:
+				shape, fortran, dtype = np.lib.format.read_array_header_2_0(member)
+			if dtype.hasobject:
+				raise ValueError("object arrays are not accepted in npz requests")
+			count = int(np.prod(shape, dtype=np.int64))
+			arr = np.frombuffer(body, dtype=dtype, count=count, offset=start + member.tell())
+			out[name] = arr.reshape(shape, order="F" if fortran else "C")
+	return out
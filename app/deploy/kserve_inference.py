@@ -2,11 +2,18 @@
 and running a predictor's `predict` method.
 
 This module is intentionally small: integration layers can import
-`predict_from_request` to implement a server adapter.
+`predict_from_request` to implement a server adapter. The v2 (Open
+Inference Protocol) helpers below back `app.routers.kserve`.
 """
+import json
+import struct
 from typing import Any, Dict
+
+import numpy as np
 import pandas as pd
 
+from app.deploy.columnar import checked_offsets
+
 
 def payload_to_dataframe(payload: Dict[str, Any]) -> pd.DataFrame:
 	"""Convert a kserve-style JSON payload into a pandas DataFrame.
@@ -41,3 +48,176 @@ def predict_from_request(payload: Dict[str, Any], predictor) -> Dict[str, Any]:
 	preds = predictor.predict(df)
 	return {"predictions": preds}
 
+
+
+# ---------------------------------------------------------------------------
+# KServe v2 / Open Inference Protocol
+#
+# A v2 request carries named, typed, shaped tensors:
+#   {"inputs": [{"name", "shape", "datatype", "data"}], "outputs": [...], "parameters": {...}}
+# With the binary tensor extension the JSON header is followed by raw
+# tensor bytes; its length is sent in the `Inference-Header-Content-Length`
+# header and every binary input declares `parameters.binary_data_size`.
+#
+# Tensors map onto the same layout as `app.deploy.columnar`: 1-D tensors
+# (or `[n, 1]`) are scalar columns, 2-D `[n, points]` tensors are
+# equal-length curves and a `<col>.values` / `<col>.offsets` pair is a
+# ragged curve column. Binary tensors are viewed without copying.
+# ---------------------------------------------------------------------------
+INFERENCE_HEADER = "inference-header-content-length"
+
+V2_DATATYPES = {
+	"BOOL": np.dtype(np.bool_),
+	"UINT8": np.dtype("<u1"),
+	"UINT16": np.dtype("<u2"),
+	"UINT32": np.dtype("<u4"),
+	"UINT64": np.dtype("<u8"),
+	"INT8": np.dtype("<i1"),
+	"INT16": np.dtype("<i2"),
+	"INT32": np.dtype("<i4"),
+	"INT64": np.dtype("<i8"),
+	"FP16": np.dtype("<f2"),
+	"FP32": np.dtype("<f4"),
+	"FP64": np.dtype("<f8"),
+	"BYTES": np.dtype(object),
+}
+
+
+def v2_datatype(dtype: np.dtype) -> str:
+	"""Map a NumPy dtype onto a v2 tensor datatype name."""
+	dtype = np.dtype(dtype)
+	if dtype.kind in "OUS":
+		return "BYTES"
+	for name, candidate in V2_DATATYPES.items():
+		if name != "BYTES" and candidate == dtype.newbyteorder("<"):
+			return name
+	raise ValueError(f"dtype {dtype} has no v2 tensor datatype")
+
+
+def decode_v2_request(body: bytes, header_length: int | None = None) -> tuple[dict, dict[str, np.ndarray]]:
+	"""Split a v2 request into its JSON header and a dict of input tensors."""
+	header_bytes = body if header_length is None else body[:header_length]
+	request = json.loads(header_bytes)
+	offset = len(header_bytes)
+	tensors = {}
+	for spec in request.get("inputs", []):
+		name, shape, datatype = spec["name"], [int(d) for d in spec["shape"]], spec["datatype"]
+		if datatype not in V2_DATATYPES:
+			raise ValueError(f"input '{name}': unsupported datatype {datatype}")
+		size = (spec.get("parameters") or {}).get("binary_data_size")
+		if size is not None:
+			if header_length is None:
+				raise ValueError(f"input '{name}' is binary but no {INFERENCE_HEADER} header was sent")
+			if offset + size > len(body):
+				raise ValueError(f"input '{name}': binary data truncated")
+			tensors[name] = _binary_tensor(body, offset, size, shape, datatype)
+			offset += size
+		else:
+			tensors[name] = _json_tensor(spec.get("data", []), shape, datatype)
+	return request, tensors
+
+
+def _binary_tensor(body: bytes, offset: int, size: int, shape: list[int], datatype: str) -> np.ndarray:
+	if datatype == "BYTES":
+		# each element: 4-byte little-endian length, then the raw bytes
+		items, pos, end = [], offset, offset + size
+		while pos < end:
+			(n,) = struct.unpack_from("<I", body, pos)
+			items.append(bytes(body[pos + 4:pos + 4 + n]))
+			pos += 4 + n
+		return np.array(items, dtype=object).reshape(shape)
+	dtype = V2_DATATYPES[datatype]
+	count = size // dtype.itemsize
+	if count != int(np.prod(shape, dtype=np.int64)):
+		raise ValueError(f"binary data size {size} does not match shape {shape} of {datatype}")
+	return np.frombuffer(body, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def _json_tensor(data, shape: list[int], datatype: str) -> np.ndarray:
+	if datatype == "BYTES":
+		arr = np.array(data, dtype=object)
+	else:
+		arr = np.asarray(data, dtype=V2_DATATYPES[datatype])
+	return arr.reshape(shape)
+
+
+def v2_tensors_to_frame(tensors: dict[str, np.ndarray]) -> tuple[pd.DataFrame, dict[str, tuple[np.ndarray, np.ndarray]]]:
+	"""Build a column-major frame of scalar tensors plus packed curve buffers."""
+	packed = {}
+	scalars = {}
+	for name, arr in tensors.items():
+		if name.endswith(".offsets"):
+			continue
+		if name.endswith(".values"):
+			col = name[: -len(".values")]
+			offsets = tensors.get(f"{col}.offsets")
+			if offsets is None:
+				raise ValueError(f"curve tensor '{col}' has values but no offsets")
+			packed[col] = (arr.reshape(-1), checked_offsets(col, arr.reshape(-1), offsets.reshape(-1)))
+		elif arr.ndim == 2 and arr.shape[1] != 1:
+			rows, width = arr.shape
+			packed[name] = (arr.reshape(-1), np.arange(rows + 1, dtype=np.int64) * width)
+		elif arr.ndim <= 2:
+			scalars[name] = arr.reshape(-1)
+		else:
+			raise ValueError(f"input '{name}': tensors of rank {arr.ndim} are not supported")
+	curve_rows = {len(offsets) - 1 for _, offsets in packed.values()}
+	if len(curve_rows) > 1:
+		raise ValueError("curve inputs have different batch sizes")
+	n_rows = next(iter(curve_rows)) if packed else None
+	frame = pd.DataFrame(scalars, index=None if scalars else range(n_rows or 0))
+	if packed and len(frame) != n_rows:
+		raise ValueError("scalar and curve inputs have different batch sizes")
+	return frame, packed
+
+
+def encode_v2_response(
+	model_name: str,
+	outputs: dict[str, Any],
+	request: dict | None = None,
+	model_version: str | None = None,
+) -> tuple[dict, bytes | None]:
+	"""Encode `outputs` as v2 output tensors.
+
+	Returns `(header, binary)`; `binary` is None unless binary output was
+	requested (per output via `parameters.binary_data` or for all outputs
+	via the request-level `parameters.binary_data_output`).
+	"""
+	request = request or {}
+	binary_all = bool((request.get("parameters") or {}).get("binary_data_output"))
+	requested = {o["name"]: (o.get("parameters") or {}) for o in request.get("outputs", [])}
+	chunks = []
+	tensors = []
+	for name, value in outputs.items():
+		if requested and name not in requested:
+			continue
+		arr = np.asarray(value)
+		if arr.dtype.kind in "US":
+			arr = arr.astype(object)
+		datatype = v2_datatype(arr.dtype)
+		tensor = {"name": name, "shape": list(arr.shape), "datatype": datatype}
+		if requested.get(name, {}).get("binary_data", binary_all):
+			raw = _tensor_bytes(arr, datatype)
+			tensor["parameters"] = {"binary_data_size": len(raw)}
+			chunks.append(raw)
+		elif datatype == "BYTES":
+			tensor["data"] = [v.decode() if isinstance(v, bytes) else str(v) for v in arr.reshape(-1)]
+		else:
+			tensor["data"] = arr.reshape(-1).tolist()
+		tensors.append(tensor)
+	header = {"model_name": model_name, "outputs": tensors}
+	if model_version is not None:
+		header["model_version"] = model_version
+	if request.get("id") is not None:
+		header["id"] = request["id"]
+	return header, b"".join(chunks) if chunks else None
+
+
+def _tensor_bytes(arr: np.ndarray, datatype: str) -> bytes:
+	if datatype == "BYTES":
+		parts = []
+		for v in arr.reshape(-1):
+			raw = v if isinstance(v, bytes) else str(v).encode()
+			parts.append(struct.pack("<I", len(raw)) + raw)
+		return b"".join(parts)
+	return np.ascontiguousarray(arr, dtype=V2_DATATYPES[datatype]).tobytes()
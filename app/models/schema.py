@@ -6,6 +6,9 @@ Curve = List[float]
 class DatasetMetadata(BaseModel):
     curve_columns: List[str]
     label_column: str
+    # optional per-curve feature groups ("stats", "spectral", "shape");
+    # curve columns not listed here get the summary statistics only
+    curve_features: Dict[str, List[str]] = Field(default_factory=dict)
 class TrainingDataInput(BaseModel):
     data: List[Dict[str, Scalar | Curve]]
     metadata: DatasetMetadata
\ No newline at end of file
@@ -1,4 +1,4 @@
-from . import train, models, visualization, llm, deploy, knowledge
+from . import train, models, visualization, llm, deploy, knowledge, predict, kserve
 
 
-__all__ = ["train", "models", "visualization", "llm", "deploy", "knowledge"]
\ No newline at end of file
+__all__ = ["train", "models", "visualization", "llm", "deploy", "knowledge", "predict", "kserve"]
\ No newline at end of file
@@ -14,63 +14,167 @@ def deploy_info():
 	TODO: extend with model server metadata, version, and runtime stats.
 	"""
 	try:
-		from app.services.registry.model_registry import list_models
+		from app.services.registry.model_registry import count_models
 		import platform, os
-		models = list_models()
+		n_models = count_models()
 		server_info = {
 			"python_version": platform.python_version(),
 			"platform": platform.platform(),
 			"model_server_version": os.getenv("MODEL_SERVER_VERSION", "unknown"),
 		}
+		from app.services.feature.cache import feature_cache
+		from app.services.predictors.model_cache import model_cache
+		from app.services.predictors.batching import batchers
+		from app.services.predictors.result_cache import prediction_cache
+		from app.services.predictors.streaming import streams
+		from app.core.executors import inference_executor, training_executor
+		from app.services.training.jobs import training_jobs
 		return {
 			"status": "ok",
-			"registered_models": len(models),
+			"registered_models": n_models,
 			"server": server_info,
+			"feature_cache": feature_cache.stats() if feature_cache is not None else None,
+			"model_cache": model_cache.stats(),
+			"micro_batching": batchers.stats(),
+			"prediction_cache": prediction_cache.stats() if prediction_cache is not None else None,
+			"streams": streams.stats(),
+			"executors": {
+				"inference": inference_executor.stats(),
+				"training": training_executor.stats(),
+				"training_jobs": training_jobs.stats(),
+			},
 			"note": "registry inspected; provide MODEL_SERVER_VERSION env var for runtime version",
 		}
 	except Exception as e:
 		return {"status": "ok", "warning": f"failed to inspect registry: {e}"}
 
 
-from fastapi import Body, Query
+from fastapi import HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from app.models.schema import TrainingDataInput
 from app.core.enums import TaskType
 from app.services.predictors.factory import PredictorFactory
+from app.services.predictors.model_cache import model_cache
+from app.services.predictors.batching import batchers
+from app.services.predictors.result_cache import model_version, prediction_cache
+from app.services.predictors.streaming import streams
 from app.services.feature.curve_extractor import CurveFeatureExtractor
+from app.services.feature.cache import feature_cache
 from app.services.registry.model_registry import get_model
+from app.core.executors import inference_executor
+from app.deploy.columnar import ARROW_STREAM, COLUMNAR_CONTENT_TYPES, NPZ, decode_columnar
 
 
-@router.post("/predict")
-def deploy_predict(payload: TrainingDataInput = Body(...), run_id: str | None = Query(None), task_type: TaskType = Query(TaskType.TABULAR_REGRESSION)):
+_BINARY_BODY = {"schema": {"type": "string", "format": "binary"}}
+
+
+@router.post(
+	"/predict",
+	openapi_extra={
+		"requestBody": {
+			"required": True,
+			"content": {
+				"application/json": {"schema": TrainingDataInput.model_json_schema()},
+				ARROW_STREAM: _BINARY_BODY,
+				NPZ: _BINARY_BODY,
+			},
+		},
+	},
+)
+async def deploy_predict(
+	request: Request,
+	run_id: str | None = Query(None),
+	task_type: TaskType = Query(TaskType.TABULAR_REGRESSION),
+	curve_features: str | None = Query(None, description="JSON mapping curve column -> feature groups (binary bodies only)"),
+):
 	"""Predict using a model registered in `model_registry.json`.
 
 	- `run_id` (optional): if provided, the registry will be used to locate artifacts and load the model.
 	- `task_type`: determines which predictor implementation to use for loading.
+
+	The body is either `TrainingDataInput` JSON or a binary columnar batch
+	(Arrow IPC stream or `.npz`, see `app.deploy.columnar`) whose curves are
+	decoded straight into packed buffers, bypassing per-element validation.
+
+	Model loading, feature extraction and prediction run on the bounded
+	inference executor; the endpoint answers 503 when its queue is full.
 	"""
+	content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+	body = await request.body()
+	if content_type in COLUMNAR_CONTENT_TYPES:
+		return await inference_executor.run(_deploy_predict_columnar, body, content_type, curve_features, run_id, task_type)
+	try:
+		payload = TrainingDataInput.model_validate_json(body)
+	except ValidationError as e:
+		raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+	return await inference_executor.run(_deploy_predict_json, payload, run_id, task_type)
+
+
+def _deploy_predict_json(payload: TrainingDataInput, run_id: str | None, task_type: TaskType):
 	# convert payload to DataFrame
 	import pandas as pd
 	df = pd.DataFrame(payload.data)
+	curve_cols = payload.metadata.curve_columns if hasattr(payload, "metadata") else []
+	return _deploy_predict(df, None, curve_cols, payload.metadata.curve_features, run_id, task_type)
+
+
+def _deploy_predict_columnar(body: bytes, content_type: str, curve_features: str | None, run_id: str | None, task_type: TaskType):
+	import json
+	try:
+		df, packed, metadata = decode_columnar(body, content_type)
+	except Exception as e:
+		return {"error": f"failed to decode {content_type} body: {e}"}
+	if curve_features:
+		try:
+			metadata["curve_features"] = json.loads(curve_features)
+		except ValueError as e:
+			return {"error": f"invalid curve_features: {e}"}
+	return _deploy_predict(df, packed, list(packed), metadata.get("curve_features") or {}, run_id, task_type)
+
 
+# task types with one prediction per input row, safe for the row cache
+_ROW_CACHED_TASKS = (TaskType.TABULAR_REGRESSION, TaskType.ANOMALY_DETECTION)
+
+
+def _deploy_predict(df, packed, curve_cols: list[str], curve_features: dict, run_id: str | None, task_type: TaskType):
 	# load model from registry when run_id is provided
 	predictor = PredictorFactory.get_predictor(task_type)
+	batcher = None
+	entry = None
 	if run_id:
 		entry = get_model(run_id)
 		if not entry:
 			return {"error": "run_id not found in registry"}
 		artifact_path = entry.get("artifact_path")
 		try:
-			predictor = type(predictor).load(artifact_path)
+			predictor = model_cache.get(run_id, artifact_path, type(predictor))
 		except Exception as e:
 			return {"error": f"failed to load model: {e}"}
+		# concurrent single-row requests for this model share one predict call
+		batcher = batchers.get(run_id, predictor, entry.get("metadata"))
+		if not curve_features:
+			# extract the feature groups the model was trained with
+			curve_features = (entry.get("metadata") or {}).get("curve_features") or {}
 
 	# apply curve extractor if payload has curve columns
-	curve_cols = payload.metadata.curve_columns if hasattr(payload, "metadata") else []
 	if curve_cols:
-		extractor = CurveFeatureExtractor(curve_cols)
-		df = extractor.transform(df)
+		extractor = CurveFeatureExtractor(
+			curve_cols,
+			cache=feature_cache,
+			feature_sets=curve_features,
+		)
+		try:
+			df = extractor.transform(df, packed=packed)
+		except ValueError as e:
+			return {"error": f"feature extraction failed: {e}"}
 
 	try:
-		preds = predictor.predict(df)
+		predict_fn = batcher.predict if batcher is not None else predictor.predict
+		if entry is not None and prediction_cache is not None and task_type in _ROW_CACHED_TASKS:
+			# rows already predicted by this model version skip the predictor
+			preds = prediction_cache.predict(run_id, model_version(entry), df, predict_fn)
+		else:
+			preds = predict_fn(df)
 	except Exception as e:
 		msg = str(e)
 		if "Model not trained" in msg or "not trained" in msg:
@@ -84,3 +188,176 @@ def deploy_predict(payload: TrainingDataInput = Body(...), run_id: str | None =
 			return {"error": f"prediction failed: {e}"}
 
 	return {"predictions": preds}
+
+
+@router.post("/forecast")
+async def deploy_forecast(
+	request: Request,
+	run_id: str = Query(..., description="registered time-series model"),
+	sensitivity_factor: float = Query(1.0),
+	id_column: str = Query("item_id"),
+	timestamp_column: str = Query("timestamp"),
+):
+	"""Forecast many series in one model call, with dynamic thresholds.
+
+	The body is a long-format batch (`{"data": [records]}` JSON, or an Arrow
+	IPC stream / `.npz` of columns) holding every series' history. Series
+	whose last timestamp is unchanged since a previous call are served from
+	the model's forecast cache.
+	"""
+	content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+	body = await request.body()
+	return await inference_executor.run(
+		_deploy_forecast, body, content_type, run_id, sensitivity_factor, id_column, timestamp_column
+	)
+
+
+def _deploy_forecast(body: bytes, content_type: str, run_id: str, sensitivity_factor: float, id_column: str, timestamp_column: str):
+	import json
+	import pandas as pd
+	entry = get_model(run_id)
+	if not entry:
+		return {"error": "run_id not found in registry"}
+	try:
+		if content_type in COLUMNAR_CONTENT_TYPES:
+			history, _, _ = decode_columnar(body, content_type)
+		else:
+			history = pd.DataFrame(json.loads(body)["data"])
+		history[timestamp_column] = pd.to_datetime(history[timestamp_column])
+	except Exception as e:
+		return {"error": f"invalid forecast batch: {e}"}
+	try:
+		predictor_cls = type(PredictorFactory.get_predictor(TaskType.TIME_SERIES_FORECAST))
+		predictor = model_cache.get(run_id, entry.get("artifact_path"), predictor_cls)
+	except Exception as e:
+		return {"error": f"failed to load model: {e}"}
+	try:
+		forecast = predictor.predict_many(history, sensitivity_factor, id_column=id_column, timestamp_column=timestamp_column)
+	except Exception as e:
+		return {"error": f"forecast failed: {e}"}
+	forecast["timestamp"] = forecast["timestamp"].astype(str)
+	return {"forecast": forecast.to_dict(orient="list")}
+
+@router.post(
+	"/stream/{stream_id}",
+	openapi_extra={
+		"requestBody": {
+			"required": True,
+			"content": {
+				"application/json": {"schema": {
+					"type": "object",
+					"properties": {
+						"columns": {"type": "array", "items": {"type": "string"}},
+						"rows": {"type": "array", "items": {"type": "array", "items": {"type": "number"}}},
+					},
+				}},
+				ARROW_STREAM: _BINARY_BODY,
+				NPZ: _BINARY_BODY,
+			},
+		},
+	},
+)
+async def deploy_stream_append(
+	stream_id: str,
+	request: Request,
+	run_id: str | None = Query(None, description="registered anomaly model to start a new stream from"),
+	alpha: float | None = Query(None, gt=0, le=1),
+	k: float | None = Query(None, gt=0),
+	min_samples: int | None = Query(None, ge=0),
+):
+	"""Append samples to a streaming anomaly detector and score them.
+
+	Each sample is scored against the detector state before it and then
+	folded into the EWMA statistics. The body is `{"columns": [...], "rows":
+	[[...], ...]}` JSON or a columnar batch (Arrow IPC stream / `.npz`) of
+	scalar columns. `run_id`, `alpha`, `k` and `min_samples` only apply when
+	the stream is created.
+	"""
+	content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+	body = await request.body()
+	params = {"run_id": run_id, "alpha": alpha, "k": k, "min_samples": min_samples}
+	return await inference_executor.run(_stream_append, stream_id, body, content_type, params)
+
+
+@router.websocket("/stream/{stream_id}/ws")
+async def deploy_stream_ws(
+	websocket: WebSocket,
+	stream_id: str,
+	run_id: str | None = Query(None),
+	alpha: float | None = Query(None, gt=0, le=1),
+	k: float | None = Query(None, gt=0),
+	min_samples: int | None = Query(None, ge=0),
+):
+	"""Websocket variant of `POST /deploy/stream/{stream_id}`.
+
+	Text messages carry the JSON batch, binary messages an `.npz` batch;
+	every message is answered with its scores.
+	"""
+	await websocket.accept()
+	params = {"run_id": run_id, "alpha": alpha, "k": k, "min_samples": min_samples}
+	try:
+		while True:
+			message = await websocket.receive()
+			if message["type"] == "websocket.disconnect":
+				break
+			if message.get("bytes") is not None:
+				body, content_type = message["bytes"], NPZ
+			else:
+				body, content_type = message.get("text", "").encode(), "application/json"
+			await websocket.send_json(await inference_executor.run(_stream_append, stream_id, body, content_type, params))
+	except WebSocketDisconnect:
+		pass
+
+
+@router.post("/stream/{stream_id}/checkpoint")
+def deploy_stream_checkpoint(stream_id: str):
+	"""Write the stream's detector state to `STREAM_CHECKPOINT_DIR`."""
+	try:
+		return {"stream_id": stream_id, "path": streams.checkpoint(stream_id)}
+	except (KeyError, ValueError) as e:
+		raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/stream/{stream_id}")
+def deploy_stream_close(stream_id: str):
+	"""Checkpoint the stream and release its detector (frees a stream slot)."""
+	try:
+		return {"stream_id": stream_id, "path": streams.close(stream_id)}
+	except (KeyError, ValueError) as e:
+		raise HTTPException(status_code=404, detail=str(e))
+
+
+def _stream_append(stream_id: str, body: bytes, content_type: str, params: dict):
+	import json
+	import numpy as np
+	try:
+		if content_type in COLUMNAR_CONTENT_TYPES:
+			frame, _, _ = decode_columnar(body, content_type)
+			columns = [str(c) for c in frame.columns]
+			X = frame.to_numpy(dtype=float, na_value=np.nan)
+		else:
+			payload = json.loads(body)
+			columns = list(payload["columns"])
+			rows = payload["rows"]
+			X = np.asarray(rows, dtype=float) if len(rows) else np.empty((0, len(columns)))
+			if X.ndim != 2 or X.shape[1] != len(columns):
+				raise ValueError(f"rows must each have {len(columns)} values, got shape {X.shape}")
+		detector = streams.get(stream_id, columns, **params)
+	except Exception as e:
+		return {"error": f"invalid stream batch: {e}"}
+
+	if columns != detector.columns:
+		# align to the detector's feature order; absent features are missing
+		aligned = np.full((len(X), len(detector.columns)), np.nan)
+		position = {c: i for i, c in enumerate(columns)}
+		for j, col in enumerate(detector.columns):
+			if col in position:
+				aligned[:, j] = X[:, position[col]]
+		X = aligned
+	out = detector.update_array(X)
+	trigger = out["trigger_index"]
+	return {
+		"is_anomaly": out["is_anomaly"].tolist(),
+		"max_zscore": [float(z) if np.isfinite(z) else None for z in out["max_zscore"]],
+		"trigger_column": [detector.columns[t] if t >= 0 else None for t in trigger],
+	}
@@ -0,0 +1,116 @@
+"""KServe v2 (Open Inference Protocol) endpoints.
+
+Model names are registry run ids. Requests are decoded by
+`app.deploy.kserve_inference` straight into NumPy tensors and run through
+the same path as `/deploy/predict` (model cache, micro-batching, curve
+feature extraction) on the bounded inference executor.
+"""
+import json
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.core.enums import TaskType
+from app.core.executors import inference_executor
+from app.deploy.kserve_inference import INFERENCE_HEADER, decode_v2_request, encode_v2_response, v2_tensors_to_frame
+from app.routers.deploy import _deploy_predict
+from app.services.predictors.factory import PredictorFactory
+from app.services.predictors.model_cache import model_cache
+from app.services.predictors.warmup import warmup_state
+from app.services.registry.model_registry import get_model
+
+router = APIRouter(prefix="/v2", tags=["kserve"])
+# server liveness/readiness probes; mounted without auth, like /ready
+health_router = APIRouter(prefix="/v2/health", tags=["kserve"])
+
+
+@health_router.get("/live")
+def server_live():
+	return {"live": True}
+
+
+@health_router.get("/ready")
+def server_ready():
+	# same readiness as /ready: startup model warm-up has finished
+	ready = warmup_state.ready
+	return JSONResponse(status_code=200 if ready else 503, content={"ready": ready})
+
+
+def _entry(model_name: str) -> dict:
+	entry = get_model(model_name)
+	if not entry:
+		raise HTTPException(status_code=404, detail=f"model {model_name} not found in registry")
+	return entry
+
+
+@router.get("/models/{model_name}")
+def model_metadata(model_name: str):
+	metadata = _entry(model_name).get("metadata") or {}
+	return {
+		"name": model_name,
+		"versions": [],
+		"platform": metadata.get("task_type", TaskType.TABULAR_REGRESSION.value),
+		"inputs": [{"name": col, "datatype": "FP64", "shape": [-1, -1]} for col in metadata.get("curve_columns", [])],
+		"outputs": [{"name": "predictions", "datatype": "FP64", "shape": [-1]}],
+	}
+
+
+@router.get("/models/{model_name}/ready")
+def model_ready(model_name: str):
+	# ready once this model version is loaded (at warm-up or by a first
+	# inference); 404 for unknown models, 503 with the load error otherwise
+	entry = _entry(model_name)
+	task_type = TaskType((entry.get("metadata") or {}).get("task_type", TaskType.TABULAR_REGRESSION))
+	predictor_cls = type(PredictorFactory.get_predictor(task_type))
+	if model_cache.is_loaded(model_name, entry["artifact_path"], predictor_cls):
+		return {"name": model_name, "ready": True}
+	content = {"name": model_name, "ready": False}
+	error = warmup_state.as_dict()["errors"].get(model_name)
+	if error:
+		content["error"] = error
+	return JSONResponse(status_code=503, content=content)
+
+
+@router.post("/models/{model_name}/infer")
+async def model_infer(model_name: str, request: Request):
+	"""Run inference on v2 input tensors; binary tensor extension supported."""
+	header_length = request.headers.get(INFERENCE_HEADER)
+	if header_length is not None:
+		try:
+			header_length = int(header_length)
+		except ValueError:
+			return JSONResponse(status_code=400, content={"error": f"invalid {INFERENCE_HEADER} header: {header_length!r}"})
+		if header_length < 0:
+			return JSONResponse(status_code=400, content={"error": f"invalid {INFERENCE_HEADER} header: {header_length}"})
+	body = await request.body()
+	result = await inference_executor.run(_infer, model_name, body, header_length)
+	if isinstance(result, JSONResponse):
+		return result
+	header, binary = result
+	if binary is None:
+		return header
+	raw_header = json.dumps(header).encode()
+	return Response(
+		content=raw_header + binary,
+		media_type="application/octet-stream",
+		headers={"Inference-Header-Content-Length": str(len(raw_header))},
+	)
+
+
+def _infer(model_name: str, body: bytes, header_length: int | None):
+	entry = get_model(model_name)
+	if not entry:
+		return JSONResponse(status_code=404, content={"error": f"model {model_name} not found in registry"})
+	metadata = entry.get("metadata") or {}
+	try:
+		request, tensors = decode_v2_request(body, header_length)
+		df, packed = v2_tensors_to_frame(tensors)
+	except Exception as e:
+		return JSONResponse(status_code=400, content={"error": f"invalid inference request: {e}"})
+
+	curve_features = (request.get("parameters") or {}).get("curve_features") or metadata.get("curve_features") or {}
+	task_type = TaskType(metadata.get("task_type", TaskType.TABULAR_REGRESSION))
+	result = _deploy_predict(df, packed, list(packed), curve_features, model_name, task_type)
+	if "error" in result:
+		return JSONResponse(status_code=400, content={"error": result["error"]})
+	return encode_v2_response(model_name, {"predictions": result["predictions"]}, request)
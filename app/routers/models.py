@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
-from app.services.registry.model_registry import list_models, get_model
+from app.services.registry.model_registry import query_models, count_models, get_model
 from pathlib import Path
 import shutil
 import tempfile
@@ -10,10 +10,16 @@ router = APIRouter(prefix="/models", tags=["models"])
 
 
 @router.get("", response_model=dict)
-def models_list():
-    """Return registered models from the simple JSON registry."""
-    entries = list_models()
-    return {"models": entries}
+def models_list(
+    task_type: str | None = None,
+    label: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """Return a page of registered models, newest first."""
+    entries = query_models(task_type=task_type, label=label, limit=limit, offset=offset)
+    total = count_models(task_type=task_type, label=label)
+    return {"models": entries, "total": total, "limit": limit, "offset": offset}
 
 
 @router.get("/{run_id}/download")
@@ -1,27 +1,125 @@
+import os
+import threading
+import time
+
 import pandas as pd
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from app.services.predictors.unified import UnifiedPredictor
+from app.services.predictors.tabular import AutoGluonTabularPredictor
+from app.services.predictors.simple_tabular import SimpleTabularPredictor
+from app.services.predictors.model_cache import model_cache
+from app.services.registry.model_registry import get_model, query_models
 from app.models.schema import TrainingDataInput
+from app.core import config
 from app.core.enums import TaskType
+from app.core.executors import inference_executor
 
 router = APIRouter(prefix="/predict", tags=["predict"])
 
-# ⚠️ 示例：真实系统应从 run_id / model_path 加载
 _predictor = None
+_model = None
+_model_lock = threading.Lock()
+# registry lookups are reused this long (seconds), not repeated per request
+_RESOLVE_TTL_S = 1.0
+_resolved: tuple[float, tuple[str, str] | None] = (float("-inf"), None)
+# _get_predictor runs on inference-executor threads; separate from
+# _model_lock because it calls load_model
+_predictor_lock = threading.Lock()
 
-@router.post("")
-def predict(payload: TrainingDataInput):
+
+def _resolve_run() -> tuple[str, str] | None:
+    """(run_id, artifact_path) of the registry model /predict should serve."""
+    global _resolved
+
+    now = time.monotonic()
+    at, value = _resolved
+    if now - at < _RESOLVE_TTL_S:
+        return value
+    if config.PREDICT_RUN_ID == "latest":
+        latest = query_models(task_type=TaskType.TABULAR_REGRESSION.value, limit=1)
+        value = (latest[0]["run_id"], latest[0]["artifact_path"]) if latest else None
+    else:
+        entry = get_model(config.PREDICT_RUN_ID)
+        value = (config.PREDICT_RUN_ID, entry["artifact_path"]) if entry else None
+    _resolved = (now, value)
+    return value
+
+
+def _load_artifact(run_id: str, artifact_path: str):
+    # the fallback trainer saves a SimpleTabularPredictor .npz in its run directory
+    simple = os.path.join(artifact_path, "simple_model.npz")
+    if os.path.isfile(simple):
+        return model_cache.get(run_id, simple, SimpleTabularPredictor)
+    return model_cache.get(run_id, artifact_path, AutoGluonTabularPredictor)
+
+
+def load_model():
+    """Return the /predict model; called at startup and on every request.
+
+    An explicit `PREDICT_MODEL_PATH` is loaded once. Otherwise the model is
+    resolved from the registry (`PREDICT_RUN_ID`, "latest" by default) and
+    loaded through the deploy model cache, so a newly trained run is served
+    as soon as it is registered. Returns None when there is nothing to serve.
+    """
+    global _model
+
+    if config.PREDICT_MODEL_PATH:
+        with _model_lock:
+            if _model is None and os.path.exists(config.PREDICT_MODEL_PATH):
+                _model = AutoGluonTabularPredictor.load(config.PREDICT_MODEL_PATH)
+            return _model
+    resolved = _resolve_run()
+    if resolved is None:
+        return None
+    return _load_artifact(*resolved)
+
+
+def _get_predictor(payload: TrainingDataInput) -> UnifiedPredictor:
     global _predictor
 
+    with _predictor_lock:
+        if _predictor is None:
+            _predictor = UnifiedPredictor(
+                task_type=TaskType.TABULAR_REGRESSION,
+                curve_columns=payload.metadata.curve_columns,
+                curve_features=payload.metadata.curve_features,
+            )
+        # follow the registry: a newly registered run replaces the model
+        model = load_model()
+        if model is not None:
+            _predictor.predictor = model
+        return _predictor
+
+
+def _predict(payload: TrainingDataInput):
+    df = pd.DataFrame(payload.data)
+    return _get_predictor(payload).predict(df)
+
+
+def _predict_append(payload: TrainingDataInput, entity_column: str, reset: bool):
     df = pd.DataFrame(payload.data)
+    predictor = _get_predictor(payload)
+    if reset and predictor.incremental is not None:
+        predictor.incremental.reset(df[entity_column].unique())
+    return predictor.predict_appended(df, entity_column=entity_column)
+
+
+@router.post("")
+async def predict(payload: TrainingDataInput):
+    result = await inference_executor.run(_predict, payload)
+    return {"prediction": result}
+
 
-    if _predictor is None:
-        _predictor = UnifiedPredictor(
-            task_type=TaskType.TABULAR_REGRESSION,
-            curve_columns=payload.metadata.curve_columns,
-        )
-        # 这里未来换成 MLflow / 本地 load
-        _predictor.predictor.load("./artifacts/autogluon")
+@router.post("/append")
+async def predict_append(
+    payload: TrainingDataInput,
+    entity_column: str = Query("id"),
+    reset: bool = Query(False, description="start a new cycle for the entities in this request"),
+):
+    """Predict from curve samples appended since the previous call per entity.
 
-    result = _predictor.predict(df)
+    Each row holds an entity id plus only the new samples of every curve
+    column; features are updated incrementally instead of recomputed.
+    """
+    result = await inference_executor.run(_predict_append, payload, entity_column, reset)
     return {"prediction": result}
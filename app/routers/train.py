@@ -1,36 +1,163 @@
+import json
+import os
+import shutil
+import uuid
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
 from fastapi.responses import JSONResponse
 import mlflow
 from app.models.schema import TrainingDataInput
 from app.models.task_config import TabularConfig
-from app.services.training.training_service import TrainingService
+from app.core import config as settings
+from app.services.training.jobs import train_sweep_job, train_tabular_job, training_jobs
 
 
 router = APIRouter(prefix="/train", tags=["training"])
 
+# uploads are copied to disk in pieces of this size
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_SUFFIXES = (".csv", ".parquet", ".pq")
 
-@router.post("", response_model=dict)
-def train_tabular(payload: TrainingDataInput, config: TabularConfig):
+
+@router.post("", response_model=dict, status_code=202)
+def train_tabular(
+    payload: TrainingDataInput,
+    config: TabularConfig,
+    priority: int = Query(0, description="higher runs first"),
+):
+    """Queue a training job on the request payload and return its id.
+
+    The job runs in a worker process (see `app.services.training.jobs`);
+    poll `GET /train/{job_id}` for its state and, once it succeeded, the
+    MLflow run id. Returns 503 when the training queue is full.
+    """
     df = pd.DataFrame(payload.data)
 
 
-    service = TrainingService()
-    run_id = service.train_tabular(
+    job = training_jobs.submit(
+        train_tabular_job,
+        priority=priority,
         raw_df=df,
         label=payload.metadata.label_column,
         curve_columns=payload.metadata.curve_columns,
         config=config,
+        curve_features=payload.metadata.curve_features,
         )
 
 
-    return {"status": "success", "mlflow_run_id": run_id}
+    return {"status": "queued", **training_jobs.status(job.id)}
+
+
+@router.post("/sweep", response_model=dict, status_code=202)
+def train_sweep(
+    payload: TrainingDataInput,
+    configs: list[TabularConfig],
+    priority: int = Query(0, description="higher runs first"),
+):
+    """Queue one job that trains every config on shared curve features.
+
+    Features are extracted once; the configs then train in parallel
+    processes as nested MLflow runs and the best model is registered. The
+    job result holds the sweep run id, the best run id and per-config
+    scores.
+    """
+    if not configs:
+        raise HTTPException(status_code=400, detail="configs must not be empty")
+    df = pd.DataFrame(payload.data)
+    job = training_jobs.submit(
+        train_sweep_job,
+        priority=priority,
+        raw_df=df,
+        label=payload.metadata.label_column,
+        curve_columns=payload.metadata.curve_columns,
+        configs=configs,
+        curve_features=payload.metadata.curve_features,
+        )
+    return {"status": "queued", **training_jobs.status(job.id)}
+
+
+@router.post("/upload", response_model=dict, status_code=202)
+def train_tabular_upload(
+    file: UploadFile = File(..., description="CSV or Parquet training data"),
+    label_column: str = Form(...),
+    curve_columns: str = Form("", description="comma-separated or JSON list"),
+    curve_features: str = Form("{}", description="JSON object: curve column -> feature groups"),
+    presets: str = Form("medium_quality"),
+    time_limit: int = Form(60),
+    priority: int = Query(0, description="higher runs first"),
+):
+    """Queue a training job on an uploaded CSV or Parquet file.
+
+    The upload is streamed to `ARTIFACTS_DIR/uploads/` and the job reads it
+    back in row chunks, so the dataset never passes through a JSON body.
+    CSV curve columns hold JSON list strings, as in `data/sample_train.csv`.
+    The file is removed once the job finishes.
+    """
+    name = os.path.basename(file.filename or "")
+    suffix = os.path.splitext(name)[1].lower()
+    if suffix not in UPLOAD_SUFFIXES:
+        raise HTTPException(status_code=400, detail=f"expected a {', '.join(UPLOAD_SUFFIXES)} file, got {name!r}")
+    try:
+        curves = _parse_curve_columns(curve_columns)
+        features = json.loads(curve_features or "{}")
+        config = TabularConfig(presets=presets, time_limit=time_limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"invalid form field: {e}")
+
+    upload_dir = os.path.abspath(os.path.join(settings.ARTIFACTS_DIR, "uploads", uuid.uuid4().hex))
+    os.makedirs(upload_dir)
+    path = os.path.join(upload_dir, name)
+    try:
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file.file, out, UPLOAD_CHUNK_BYTES)
+        job = training_jobs.submit(
+            train_tabular_job,
+            priority=priority,
+            raw_df=path,
+            label=label_column,
+            curve_columns=curves,
+            config=config,
+            curve_features=features,
+            remove_input=True,
+        )
+    except BaseException:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
+
+    return {"status": "queued", **training_jobs.status(job.id)}
+
+
+def _parse_curve_columns(value: str) -> list[str]:
+    value = value.strip()
+    if value.startswith("["):
+        columns = json.loads(value)
+        if not isinstance(columns, list):
+            raise ValueError("curve_columns must be a list")
+        return [str(c) for c in columns]
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancel a queued or running training job."""
+    job = training_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return job
 
 
 
 @router.get("/{run_id}")
 def get_run_status(run_id: str):
-    """Return MLflow run info (status, metrics, start/end times) for a run_id."""
+    """Return a training job's state, or MLflow run info for a run_id.
+
+    Job ids report `state`, `queue_position` while queued and, once the job
+    succeeded, the MLflow run id as `result`. Any other id is looked up as
+    an MLflow run (status, metrics, start/end times).
+    """
+    job = training_jobs.status(run_id)
+    if job is not None:
+        return job
     try:
         client = mlflow.tracking.MlflowClient()
         run = client.get_run(run_id)
@@ -0,0 +1,14 @@
+"""Process-wide curve feature cache for the serving path.
+
+Edge gateways retry and re-send identical curves; `CurveFeatureExtractor`
+instances created with `cache=feature_cache` look each curve up by a
+digest of its bytes plus the extractor config and only extract the rows
+that miss. Set `CURVE_FEATURE_CACHE_BYTES=0` to disable.
+"""
+from app.core import config
+from app.core.cache import LRUCache
+
+
+feature_cache: LRUCache | None = (
+    LRUCache(config.CURVE_FEATURE_CACHE_BYTES) if config.CURVE_FEATURE_CACHE_BYTES > 0 else None
+)
@@ -0,0 +1,98 @@
+"""Chunked readers for raw datasets that do not fit in memory.
+
+CSV dumps store curves as JSON list strings (see `data/sample_train.csv`);
+Parquet files store them as list columns. Both are yielded as DataFrame
+chunks whose curve columns hold lists/arrays ready for
+`CurveFeatureExtractor`.
+"""
+import json
+import os
+import warnings
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - pyarrow is optional
+    pa = pacsv = pq = None
+
+
+def parse_curve_column(series: pd.Series) -> pd.Series:
+    """Decode JSON list strings in a curve column; other cells pass through.
+
+    Flat numeric lists (``"[0.1,0.2,...]"``) are parsed in one pass: the
+    cells are joined into a single one-value-per-line buffer, read by
+    pyarrow's CSV parser, and split back into per-row float arrays (views
+    of one buffer). Anything else falls back to `json.loads` per cell.
+    """
+    cells = series.tolist()
+    if not cells or not all(type(x) is str for x in cells):
+        return _parse_curve_cells(series)
+    inner = []
+    for x in cells:
+        x = x.strip()
+        if x[:1] != "[" or x[-1:] != "]":
+            return _parse_curve_cells(series)
+        inner.append(x[1:-1].strip())
+    lengths = np.fromiter((x.count(",") + 1 if x else 0 for x in inner), dtype=np.int64, count=len(inner))
+    values = _parse_floats("\n".join(x for x in inner if x).replace(",", "\n"))
+    if values is None or len(values) != lengths.sum():
+        # nested lists, null, quoted values, ...
+        return _parse_curve_cells(series)
+    return pd.Series(np.split(values, np.cumsum(lengths)[:-1]), index=series.index, name=series.name)
+
+
+def _parse_floats(text: str) -> np.ndarray | None:
+    """Parse one float per line; None if any line is not a plain number."""
+    if not text:
+        return np.empty(0)
+    try:
+        if pacsv is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                return np.fromstring(text, dtype=np.float64, sep="\n")
+        table = pacsv.read_csv(
+            pa.py_buffer(text.encode()),
+            read_options=pacsv.ReadOptions(column_names=["v"]),
+            parse_options=pacsv.ParseOptions(quote_char=False),
+            convert_options=pacsv.ConvertOptions(column_types={"v": pa.float64()}, null_values=[]),
+        )
+    except (ValueError, pa.ArrowInvalid if pa is not None else ValueError):
+        return None
+    return table.column("v").to_numpy()
+
+
+def _parse_curve_cells(series: pd.Series) -> pd.Series:
+    return series.map(lambda x: json.loads(x) if isinstance(x, str) else x)
+
+
+def iter_frame_chunks(df: pd.DataFrame, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive row slices of an in-memory DataFrame."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def read_chunks(
+    path: str | os.PathLike,
+    chunksize: int,
+    curve_columns: list[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of at most `chunksize` rows from a CSV or Parquet file."""
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet files")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col in curve_columns or []:
+            if col in chunk.columns:
+                chunk[col] = parse_curve_column(chunk[col])
+        yield chunk
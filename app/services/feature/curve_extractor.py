@@ -1,17 +1,188 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
 import pandas as pd
 import numpy as np
 from scipy.stats import skew, kurtosis
 
+from app.services.feature.chunks import read_chunks
+from app.services.feature.parallel import parallel_column_features
+from app.core.cache import LRUCache
+from app.services.feature.ragged import pack_curves, segment_digests, take_segments
+from app.services.feature.spectral import FEATURE_GROUPS, column_features, feature_names
+
 
 class CurveFeatureExtractor:
-    def __init__(self, curve_columns: list[str]):
+    """Turn curve columns (lists/arrays of floats) into summary features.
+
+    `engine="ragged"` (default) packs each curve column into one flat
+    buffer plus offsets and computes all statistics in a single vectorized
+    pass. `engine="scipy"` keeps the original row-by-row implementation
+    for reference. `dtype=np.float32` halves the packed buffer size.
+    With `n_jobs > 1` the (column, row-shard) work units of `shard_rows`
+    rows are spread over a process pool through shared memory. A single
+    `transform` starts and stops its own pool; `transform_stream` (and
+    any code inside `with extractor.worker_pool():`) reuses one pool for
+    every chunk.
+
+    `feature_sets` maps a curve column to the feature groups to compute for
+    it (see `app.services.feature.spectral`); columns not listed get the
+    six summary statistics. `n_points` and `n_bands` configure the
+    resampling grid and spectral bands of the optional groups.
+
+    When `cache` (an `LRUCache`) is given, features are looked up per curve
+    by a digest of its bytes plus the extractor config; only the rows that
+    miss are extracted, together as one batch.
+    """
+
+    def __init__(
+        self,
+        curve_columns: list[str],
+        engine: str = "ragged",
+        dtype=np.float64,
+        n_jobs: int = 1,
+        shard_rows: int = 250_000,
+        cache: LRUCache | None = None,
+        feature_sets: dict[str, list[str]] | None = None,
+        n_points: int = 128,
+        n_bands: int = 8,
+    ):
+        if engine not in ("ragged", "scipy"):
+            raise ValueError(f"Unsupported curve extraction engine: {engine}")
+        feature_sets = {col: list(groups) for col, groups in (feature_sets or {}).items()}
+        for groups in feature_sets.values():
+            unknown = set(groups) - set(FEATURE_GROUPS)
+            if unknown:
+                raise ValueError(f"Unknown curve feature groups: {sorted(unknown)}")
+            if engine == "scipy" and set(groups) != {"stats"}:
+                raise ValueError("The scipy engine only computes the 'stats' feature group")
+        if not 1 <= n_bands <= n_points // 2:
+            raise ValueError("n_bands must be between 1 and n_points // 2")
         self.curve_columns = curve_columns
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.engine = engine
+        self.dtype = np.dtype(dtype)
+        self.n_jobs = n_jobs
+        self.shard_rows = shard_rows
+        self.cache = cache
+        self.feature_sets = feature_sets
+        self.n_points = n_points
+        self.n_bands = n_bands
+        # process pool shared by transforms inside `worker_pool()`
+        self._pool: ProcessPoolExecutor | None = None
+
+    @contextmanager
+    def worker_pool(self):
+        """Reuse one process pool for every `transform` inside the block."""
+        if self.n_jobs <= 1 or self._pool is not None:
+            # nothing to pool, or an enclosing block already owns one
+            yield
+            return
+        self._pool = ProcessPoolExecutor(max_workers=self.n_jobs)
+        try:
+            yield
+        finally:
+            pool, self._pool = self._pool, None
+            pool.shutdown()
+
+    def _spec(self, col: str) -> tuple:
+        return (tuple(self.feature_sets.get(col, ["stats"])), self.n_points, self.n_bands)
+
+    def transform(self, df: pd.DataFrame, packed: dict[str, tuple[np.ndarray, np.ndarray]] | None = None) -> pd.DataFrame:
         """Transform curve columns into statistical features.
 
         For each curve column (list/array of floats) we compute basic
-        statistics and drop the original curve column.
+        statistics and drop the original curve column. Curve columns that
+        arrive already packed (e.g. decoded from an Arrow/npz request) can
+        be passed as `packed={col: (values, offsets)}` and need not be
+        present in `df`.
+        """
+        if self.engine == "scipy":
+            return self._transform_scipy(df)
+
+        given = packed or {}
+        packed = {
+            col: (given[col][0].astype(self.dtype, copy=False), given[col][1])
+            if col in given
+            else pack_curves(df[col], dtype=self.dtype)
+            for col in self.curve_columns
+        }
+        if self.cache is not None:
+            all_stats = self._cached_features(packed, len(df))
+        else:
+            all_stats = self._compute_features(packed)
+        del packed
+
+        features = {}
+        for col, stats in all_stats.items():
+            groups, _, n_bands = self._spec(col)
+            for name in feature_names(groups, n_bands):
+                features[f"{col}_{name}"] = stats[name]
+        out = df.drop(columns=[col for col in self.curve_columns if col in df.columns])
+        return pd.concat([out, pd.DataFrame(features, index=df.index)], axis=1)
+
+    def _compute_features(self, packed: dict[str, tuple[np.ndarray, np.ndarray]]) -> dict[str, dict[str, np.ndarray]]:
+        n_rows = max((len(offsets) - 1 for _, offsets in packed.values()), default=0)
+        n_units = len(packed) * -(-n_rows // self.shard_rows)
+        specs = {col: self._spec(col) for col in packed}
+        if self.n_jobs > 1 and n_units > 1:
+            return parallel_column_features(packed, specs, self.n_jobs, self.shard_rows, pool=self._pool)
+        return {col: column_features(*packed[col], *specs[col]) for col in packed}
+
+    def _cache_key(self, col: str) -> tuple:
+        return (self.engine, self.dtype.str, self._spec(col))
+
+    def _cached_features(self, packed: dict[str, tuple[np.ndarray, np.ndarray]], n_rows: int) -> dict[str, dict[str, np.ndarray]]:
+        keys, hits, misses = {}, {}, {}
+        for col, (values, offsets) in packed.items():
+            prefix = self._cache_key(col)
+            keys[col] = [(prefix, digest) for digest in segment_digests(values, offsets)]
+            hits[col] = self.cache.get_many(keys[col])
+            miss_rows = np.array([i for i, v in enumerate(hits[col]) if v is None], dtype=np.int64)
+            if len(miss_rows):
+                misses[col] = miss_rows
+        computed = self._compute_features(
+            {col: take_segments(*packed[col], rows) for col, rows in misses.items()}
+        )
+
+        all_stats = {}
+        for col in packed:
+            groups, _, n_bands = self._spec(col)
+            names = feature_names(groups, n_bands)
+            matrix = np.empty((n_rows, len(names)), dtype=self.dtype)
+            miss_rows = misses.get(col)
+            if miss_rows is not None:
+                matrix[miss_rows] = np.column_stack([computed[col][name] for name in names])
+                self.cache.put_many(
+                    (keys[col][i], matrix[i].copy(), matrix[i].nbytes + 64) for i in miss_rows.tolist()
+                )
+            for i, vec in enumerate(hits[col]):
+                if vec is not None:
+                    matrix[i] = vec
+            all_stats[col] = {name: matrix[:, j] for j, name in enumerate(names)}
+        return all_stats
+
+    def transform_stream(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Lazily transform an iterable of raw chunks, yielding one frame per chunk.
+
+        Nothing is kept between chunks: each raw chunk (and its curve
+        columns) is released once its features have been computed, so the
+        generator itself holds at most one raw chunk and its features.
+        Whatever the caller retains from the yielded frames is up to it.
+        With `n_jobs > 1` all chunks share one process pool.
         """
+        with self.worker_pool():
+            for chunk in chunks:
+                features = self.transform(chunk)
+                del chunk
+                yield features
+
+    def transform_file(self, path: str | os.PathLike, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Stream a CSV/Parquet file in `chunksize` row chunks and yield features."""
+        return self.transform_stream(read_chunks(path, chunksize, self.curve_columns))
+
+    def _transform_scipy(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.copy()
         for col in self.curve_columns:
             curves = df[col]
@@ -22,4 +193,4 @@ class CurveFeatureExtractor:
             df[f"{col}_skew"] = curves.apply(skew)
             df[f"{col}_kurt"] = curves.apply(kurtosis)
             df.drop(columns=[col], inplace=True)
-        return df
\ No newline at end of file
+        return df
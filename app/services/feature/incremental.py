@@ -0,0 +1,137 @@
+"""Incremental curve features for curves that grow during a process cycle.
+
+`CurveFeatureExtractor` recomputes every statistic over the full curve,
+so calling predict repeatedly while samples arrive costs O(n^2) over a
+cycle. `IncrementalCurveFeatureExtractor` instead keeps running moment
+state per (entity id, curve column) and merges the state of each newly
+appended segment into it, which costs O(k) for k new samples.
+
+Only the ``stats`` feature group is supported: spectral and shape
+features depend on the whole resampled curve.
+
+State is bounded: at most `max_entities` entities are kept (least
+recently updated evicted first) and entities not updated for
+`idle_ttl_s` seconds are dropped. An evicted entity's next segment
+starts a new curve.
+"""
+from collections import OrderedDict
+import threading
+import time
+from typing import Hashable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from app.core import config
+from app.services.feature.ragged import MOMENT_FIELDS, merge_moments, moments_to_stats, pack_curves, segment_moments
+
+
+class IncrementalCurveFeatureExtractor:
+    def __init__(
+        self,
+        curve_columns: list[str],
+        entity_column: str = "id",
+        dtype=np.float64,
+        max_entities: int | None = None,
+        idle_ttl_s: float | None = None,
+    ):
+        self.curve_columns = curve_columns
+        self.entity_column = entity_column
+        self.dtype = np.dtype(dtype)
+        self.max_entities = config.INCREMENTAL_MAX_ENTITIES if max_entities is None else max_entities
+        self.idle_ttl_s = config.INCREMENTAL_IDLE_TTL_S if idle_ttl_s is None else idle_ttl_s
+        # entity -> (last update, {curve column: moment state}), oldest first
+        self._state: "OrderedDict[Hashable, tuple[float, dict[str, np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Number of entities with accumulated state."""
+        return len(self._state)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Append the curve segments in `df` and return features of the full curves.
+
+        Each row carries an entity id in `entity_column` and, in every curve
+        column, only the samples appended since the previous call for that
+        entity. The result has the same columns as
+        `CurveFeatureExtractor.transform` applied to the accumulated curves.
+        Several rows for the same entity are applied in row order.
+        """
+        entities = df[self.entity_column].tolist()
+        # rows for the same entity must be merged one after another; each
+        # "wave" holds at most one row per entity and is merged vectorized
+        wave = df.groupby(self.entity_column, sort=False).cumcount().to_numpy()
+        merged = {col: np.empty((len(df), len(MOMENT_FIELDS))) for col in self.curve_columns}
+
+        # decode every segment before touching state: bad input must not
+        # leave an entity half-updated
+        segments = {col: segment_moments(*pack_curves(df[col], dtype=self.dtype)) for col in self.curve_columns}
+
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle(now)
+            # merged on copies; stored only once every column has merged
+            states = {}
+            for entity in dict.fromkeys(entities):
+                item = self._state.get(entity)
+                states[entity] = dict(item[1]) if item is not None else {}
+            for col in self.curve_columns:
+                for w in range(int(wave.max()) + 1 if len(df) else 0):
+                    rows = np.flatnonzero(wave == w)
+                    current = np.array([states[entities[i]].get(col, _EMPTY) for i in rows])
+                    new = merge_moments(current, segments[col][rows])
+                    for i, state in zip(rows, new):
+                        states[entities[i]][col] = state
+                    merged[col][rows] = new
+            # re-inserted at the end: most recently updated
+            for entity, state in states.items():
+                self._state.pop(entity, None)
+                self._state[entity] = (now, state)
+            while len(self._state) > self.max_entities:
+                self._state.popitem(last=False)
+                self.evictions += 1
+
+        features = {}
+        for col in self.curve_columns:
+            for name, values in moments_to_stats(merged[col], self.dtype).items():
+                features[f"{col}_{name}"] = values
+        out = df.drop(columns=self.curve_columns)
+        return pd.concat([out, pd.DataFrame(features, index=df.index)], axis=1)
+
+    def reset(self, entity_ids: Iterable[Hashable] | None = None) -> None:
+        """Forget accumulated curves for `entity_ids` (all entities when None)."""
+        with self._lock:
+            if entity_ids is None:
+                self._state.clear()
+                return
+            for entity in set(entity_ids):
+                self._state.pop(entity, None)
+
+    def evict_idle(self) -> int:
+        """Drop entities not updated for `idle_ttl_s`; return how many."""
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now: float) -> int:
+        dropped = 0
+        while self._state:
+            entity, (seen, _) = next(iter(self._state.items()))
+            if now - seen <= self.idle_ttl_s:
+                break
+            del self._state[entity]
+            dropped += 1
+        self.evictions += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entities": len(self._state),
+                "max_entities": self.max_entities,
+                "idle_ttl_s": self.idle_ttl_s,
+                "evictions": self.evictions,
+            }
+
+
+_EMPTY = np.array([0.0, 0.0, 0.0, 0.0, 0.0, np.inf, -np.inf])
@@ -0,0 +1,99 @@
+"""Process-pool execution of curve statistics over shared memory.
+
+Each curve column is packed once in the parent process and copied into a
+`multiprocessing.shared_memory` block. Work units are (column, row shard)
+pairs; workers attach to the block by name, compute the column's
+features for their row range and send back only the small per-row result
+arrays, which are reassembled in the original row order.
+
+A caller that extracts many batches (e.g. chunk after chunk of a stream)
+passes its own `pool` so worker processes are started once, not per call.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from app.services.feature.spectral import column_features
+
+
+def _to_shared(arr: np.ndarray) -> SharedMemory:
+    shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    return shm
+
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track` argument; pool workers share the
+        # parent's resource tracker, so the duplicate registration is
+        # released when the parent unlinks the block
+        return SharedMemory(name=name)
+
+
+def _shard_worker(unit: tuple) -> tuple:
+    col, spec, values_name, dtype, n_values, offsets_name, n_rows, start, stop = unit
+    values_shm = _attach(values_name)
+    offsets_shm = _attach(offsets_name)
+    try:
+        offsets = np.ndarray((n_rows + 1,), dtype=np.int64, buffer=offsets_shm.buf)
+        values = np.ndarray((n_values,), dtype=dtype, buffer=values_shm.buf)
+        seg_offsets = offsets[start:stop + 1] - offsets[start]
+        seg_values = values[offsets[start]:offsets[stop]]
+        stats = column_features(seg_values, seg_offsets, *spec)
+        del offsets, values, seg_values
+    finally:
+        values_shm.close()
+        offsets_shm.close()
+    return col, start, stop, stats
+
+
+def parallel_column_features(
+    packed: dict[str, tuple[np.ndarray, np.ndarray]],
+    specs: dict[str, tuple],
+    max_workers: int,
+    shard_rows: int = 250_000,
+    pool: Executor | None = None,
+) -> dict[str, dict[str, np.ndarray]]:
+    """Compute `column_features` for several packed columns on a process pool.
+
+    `packed` maps column name to `(values, offsets)` and `specs` maps it to
+    the extra `column_features` arguments `(groups, n_points, n_bands)`.
+    Returns a mapping of column name to the feature dict. Without `pool`
+    a pool of `max_workers` processes is started for this call only.
+    """
+    blocks: list[SharedMemory] = []
+    units = []
+    results: dict[str, dict[str, np.ndarray]] = {}
+    try:
+        for col, (values, offsets) in packed.items():
+            values_shm = _to_shared(values)
+            blocks.append(values_shm)
+            offsets_shm = _to_shared(offsets.astype(np.int64, copy=False))
+            blocks.append(offsets_shm)
+            n_rows = len(offsets) - 1
+            results[col] = {}
+            for start in range(0, max(n_rows, 1), shard_rows):
+                stop = min(start + shard_rows, n_rows)
+                units.append((col, specs[col], values_shm.name, values.dtype, len(values), offsets_shm.name, n_rows, start, stop))
+
+        if pool is None:
+            with ProcessPoolExecutor(max_workers=max_workers) as own:
+                _collect(own, units, packed, results)
+        else:
+            _collect(pool, units, packed, results)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return results
+
+
+def _collect(pool: Executor, units: list, packed: dict, results: dict) -> None:
+    for col, start, stop, stats in pool.map(_shard_worker, units):
+        n_rows = len(packed[col][1]) - 1
+        for name, arr in stats.items():
+            out = results[col].setdefault(name, np.empty(n_rows, dtype=arr.dtype))
+            out[start:stop] = arr
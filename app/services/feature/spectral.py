@@ -0,0 +1,124 @@
+"""Spectral and shape feature bank for ragged curves.
+
+Curves are resampled onto a fixed grid of `n_points` samples with
+vectorized linear interpolation and stacked into one `(n_rows, n_points)`
+matrix; every feature below is then a single matrix operation over the
+whole batch instead of a Python call per curve.
+
+Feature groups (selectable per curve column):
+
+- ``stats``: min/max/mean/std/skew/kurt on the raw samples (`segment_stats`)
+- ``spectral``: relative rFFT power in `n_bands` equal-width bands
+- ``shape``: peak and zero-crossing counts, time to 10%/90% of the range,
+  rise time and area under the curve (time normalised to [0, 1])
+"""
+import numpy as np
+
+from app.services.feature.ragged import STAT_NAMES, segment_stats
+
+
+FEATURE_GROUPS = ("stats", "spectral", "shape")
+SHAPE_NAMES = ("peaks", "zero_cross", "t10", "t90", "rise_time", "area")
+
+
+def feature_names(groups, n_bands: int) -> list[str]:
+    """Feature suffixes produced for `groups`, in output column order."""
+    names = []
+    for group in groups:
+        if group == "stats":
+            names.extend(STAT_NAMES)
+        elif group == "spectral":
+            names.extend(f"band{i}" for i in range(n_bands))
+        elif group == "shape":
+            names.extend(SHAPE_NAMES)
+        else:
+            raise ValueError(f"Unknown curve feature group: {group}")
+    return names
+
+
+def resample_curves(values: np.ndarray, offsets: np.ndarray, n_points: int) -> np.ndarray:
+    """Linearly resample every packed curve onto `n_points` evenly spaced samples.
+
+    Empty curves become rows of NaN; single-sample curves become constant.
+    """
+    lengths = np.diff(offsets)
+    n_rows = len(lengths)
+    grid = np.full((n_rows, n_points), np.nan, dtype=values.dtype)
+    valid = lengths > 0
+    if not valid.any():
+        return grid
+    lengths_v = lengths[valid]
+    pos = np.linspace(0.0, 1.0, n_points)[None, :] * (lengths_v - 1)[:, None]
+    lo = np.minimum(np.floor(pos).astype(np.int64), np.maximum(lengths_v - 2, 0)[:, None])
+    frac = (pos - lo).astype(values.dtype, copy=False)
+    idx = offsets[:-1][valid][:, None] + lo
+    hi = idx + (lengths_v > 1)[:, None]
+    grid[valid] = values[idx] * (1 - frac) + values[hi] * frac
+    return grid
+
+
+def spectral_features(grid: np.ndarray, n_bands: int) -> dict[str, np.ndarray]:
+    """Relative spectral power of the mean-removed curves in `n_bands` bands."""
+    centered = grid - grid.mean(axis=1, keepdims=True)
+    power = np.abs(np.fft.rfft(centered, axis=1)) ** 2
+    # skip the DC bin, which is zero after centering
+    power = power[:, 1:]
+    edges = np.linspace(0, power.shape[1], n_bands + 1).astype(np.int64)[:-1]
+    bands = np.add.reduceat(power, edges, axis=1)
+    total = power.sum(axis=1, keepdims=True)
+    with np.errstate(all="ignore"):
+        rel = np.where(total > 0, bands / total, 0.0)
+    rel[np.isnan(grid).any(axis=1)] = np.nan
+    return {f"band{i}": rel[:, i].astype(grid.dtype, copy=False) for i in range(n_bands)}
+
+
+def shape_features(grid: np.ndarray) -> dict[str, np.ndarray]:
+    """Peak/zero-crossing counts, threshold times, rise time and area."""
+    n_points = grid.shape[1]
+    dt = 1.0 / (n_points - 1)
+    left, mid, right = grid[:, :-2], grid[:, 1:-1], grid[:, 2:]
+    peaks = ((mid > left) & (mid >= right)).sum(axis=1)
+
+    centered = grid - grid.mean(axis=1, keepdims=True)
+    sign = np.signbit(centered)
+    zero_cross = (sign[:, 1:] != sign[:, :-1]).sum(axis=1)
+
+    lo = grid.min(axis=1, keepdims=True)
+    span = grid.max(axis=1, keepdims=True) - lo
+    with np.errstate(all="ignore"):
+        norm = np.where(span > 0, (grid - lo) / span, 1.0)
+    # index of the first sample reaching each threshold (argmax of a bool row)
+    t10 = (norm >= 0.1).argmax(axis=1) * dt
+    t90 = (norm >= 0.9).argmax(axis=1) * dt
+    area = (grid[:, :-1] + grid[:, 1:]).sum(axis=1) * 0.5 * dt
+
+    out = {
+        "peaks": peaks,
+        "zero_cross": zero_cross,
+        "t10": t10,
+        "t90": t90,
+        "rise_time": t90 - t10,
+        "area": area,
+    }
+    missing = np.isnan(grid).any(axis=1)
+    return {k: np.where(missing, np.nan, v).astype(grid.dtype, copy=False) for k, v in out.items()}
+
+
+def column_features(
+    values: np.ndarray,
+    offsets: np.ndarray,
+    groups=("stats",),
+    n_points: int = 128,
+    n_bands: int = 8,
+) -> dict[str, np.ndarray]:
+    """Compute the selected feature groups for one packed curve column."""
+    out: dict[str, np.ndarray] = {}
+    if "stats" in groups:
+        out.update(segment_stats(values, offsets))
+    if "spectral" in groups or "shape" in groups:
+        grid = resample_curves(values, offsets, n_points)
+        if "spectral" in groups:
+            out.update(spectral_features(grid, n_bands))
+        if "shape" in groups:
+            out.update(shape_features(grid))
+    return out
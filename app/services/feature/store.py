@@ -0,0 +1,379 @@
+"""On-disk curve feature store for training (opt-in via `FEATURE_STORE_DIR`).
+
+Retraining mostly sees the same history again. `FeatureStore` keeps the
+curve features of every row it has extracted as Parquet partitions under
+``<root>/<version>/rows/``, keyed by a 128-bit fingerprint of the row's
+raw curves. ``version`` hashes the extractor configuration (engine, dtype,
+curve columns and their feature groups) plus `FEATURE_VERSION`, so a
+config change never reads stale features.
+
+`transform_stream` is a drop-in for `CurveFeatureExtractor.transform_stream`
+that reads known rows back and extracts only new ones. Each stream also
+writes a manifest (its row keys, in order) under
+``<root>/<version>/datasets/<fingerprint>.parquet``; `load(fingerprint)`
+rebuilds that stream's curve features without extracting anything. The
+fingerprint covers every raw column (labels and scalars included), so it
+identifies the training data, not just its curves.
+
+Lookups go through a key index (sorted row keys -> partition, row) that
+is built once per store instance by reading only the key column, so a
+chunk costs O(k log n) plus reading the row groups that hold its hits,
+instead of a scan of the whole history. After a stream, partitions are
+compacted once there are more than `max_parts` of them; compaction also
+drops rows that none of the newest `keep_datasets` manifests reference,
+which bounds the store to the working set of recent training data.
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+from glob import glob
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - pyarrow is optional
+    pa = ds = pq = None
+
+try:
+    import fcntl
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from app.services.feature.curve_extractor import CurveFeatureExtractor
+from app.services.feature.ragged import pack_curves, segment_digests, take_segments
+from app.services.feature.spectral import feature_names
+
+# bump when the feature definitions in `spectral` / `ragged` change
+FEATURE_VERSION = 1
+
+_KEY = "row_key"
+_KEY_BYTES = 16
+_ROW_GROUP_ROWS = 65_536
+# index segments merged into the main sorted index beyond this many
+_MAX_SEGMENTS = 8
+
+
+class FeatureStore:
+    def __init__(
+        self,
+        root: str | os.PathLike,
+        extractor: CurveFeatureExtractor,
+        max_parts: int = 16,
+        keep_datasets: int = 0,
+    ):
+        if pa is None:
+            raise ImportError("pyarrow is required for the feature store")
+        if extractor.engine != "ragged":
+            raise ValueError("The feature store requires the ragged extraction engine")
+        self.extractor = extractor
+        self.max_parts = max_parts
+        # 0 keeps every dataset (and every row it references)
+        self.keep_datasets = keep_datasets
+        spec = [FEATURE_VERSION, extractor.engine, extractor.dtype.str]
+        for col in extractor.curve_columns:
+            groups, n_points, n_bands = extractor._spec(col)
+            spec.append([col, list(groups), n_points, n_bands])
+        self.version = hashlib.blake2b(json.dumps(spec).encode(), digest_size=8).hexdigest()
+        self.root = os.path.join(os.path.abspath(root), self.version)
+        self.columns = [
+            f"{col}_{name}"
+            for col in extractor.curve_columns
+            for name in feature_names(extractor._spec(col)[0], extractor.n_bands)
+        ]
+        # fingerprint of the last fully consumed `transform_stream`
+        self.fingerprint: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self._index: _KeyIndex | None = None
+
+    def transform_stream(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Like `CurveFeatureExtractor.transform_stream`, backed by the store.
+
+        Once the stream is exhausted `self.fingerprint` identifies the
+        dataset: a digest of the store version, every row key in order and
+        every non-curve column (names, dtypes and row values).
+        """
+        self.fingerprint = None
+        curves = hashlib.blake2b(digest_size=16)
+        scalars = hashlib.blake2b(digest_size=16)
+        schema_seen = False
+        datasets = os.path.join(self.root, "datasets")
+        os.makedirs(datasets, exist_ok=True)
+        tmp = os.path.join(datasets, f".{uuid.uuid4().hex}.tmp")
+        schema = pa.schema([(_KEY, pa.binary(_KEY_BYTES))])
+        done = False
+        lock = self._lock_shared()
+        try:
+            with self.extractor.worker_pool(), pq.ParquetWriter(tmp, schema) as manifest:
+                for chunk in chunks:
+                    rest = chunk.drop(columns=[c for c in self.extractor.curve_columns if c in chunk.columns])
+                    if not schema_seen:
+                        scalars.update(json.dumps([[str(c), str(t)] for c, t in rest.dtypes.items()]).encode())
+                        schema_seen = True
+                    scalars.update(_hash_rows(rest))
+                    keys, features = self._transform_chunk(chunk)
+                    del chunk, rest
+                    curves.update(b"".join(keys))
+                    manifest.write_table(pa.table({_KEY: pa.array(keys, pa.binary(_KEY_BYTES))}, schema=schema))
+                    yield features
+            digest = hashlib.blake2b(self.version.encode(), digest_size=16)
+            digest.update(curves.digest())
+            digest.update(scalars.digest())
+            fingerprint = digest.hexdigest()
+            os.replace(tmp, os.path.join(datasets, f"{fingerprint}.parquet"))
+            self.fingerprint = fingerprint
+            done = True
+        finally:
+            if not done and os.path.exists(tmp):
+                os.remove(tmp)
+            _unlock(lock)
+        self.maintain()
+
+    def load(self, fingerprint: str) -> pd.DataFrame:
+        """Curve features of a recorded dataset, in its original row order."""
+        path = os.path.join(self.root, "datasets", f"{fingerprint}.parquet")
+        if not os.path.exists(path):
+            raise KeyError(f"no dataset {fingerprint} in feature store version {self.version}")
+        keys = pq.read_table(path).column(_KEY).to_pylist()
+        pos, found = self._lookup(keys)
+        if (pos < 0).any():
+            raise KeyError(f"feature store is missing {int((pos < 0).sum())} rows of dataset {fingerprint}")
+        return pd.DataFrame(found[pos], columns=self.columns)
+
+    def stats(self) -> dict:
+        return {"version": self.version, "hits": self.hits, "misses": self.misses}
+
+    def maintain(self) -> bool:
+        """Expire old manifests and compact partitions when due.
+
+        Runs only when no other stream is using this store version (it
+        needs the exclusive store lock); returns whether it compacted.
+        """
+        lock = self._lock_exclusive()
+        if lock is False:
+            return False
+        try:
+            expired = self._expire_datasets()
+            parts = self._parts()
+            if len(parts) <= self.max_parts and not expired:
+                return False
+            self._compact(parts)
+            return True
+        finally:
+            _unlock(lock)
+
+    def _row_keys(self, packed: dict[str, tuple[np.ndarray, np.ndarray]], n_rows: int) -> list[bytes]:
+        per_column = [segment_digests(*packed[col]) for col in self.extractor.curve_columns]
+        rows = zip(*per_column) if per_column else [()] * n_rows
+        return [hashlib.blake2b(b"".join(parts), digest_size=_KEY_BYTES).digest() for parts in rows]
+
+    def _transform_chunk(self, chunk: pd.DataFrame) -> tuple[list[bytes], pd.DataFrame]:
+        ex = self.extractor
+        packed = {col: pack_curves(chunk[col], dtype=ex.dtype) for col in ex.curve_columns}
+        keys = self._row_keys(packed, len(chunk))
+        pos, found = self._lookup(keys)
+
+        matrix = np.empty((len(chunk), len(self.columns)), dtype=ex.dtype)
+        hit = pos >= 0
+        if hit.any():
+            matrix[hit] = found[pos[hit]]
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            computed = ex.transform(
+                pd.DataFrame(index=chunk.index[miss]),
+                packed={col: take_segments(*packed[col], miss) for col in packed},
+            )
+            matrix[miss] = computed[self.columns].to_numpy(dtype=ex.dtype)
+            self._write_rows([keys[i] for i in miss.tolist()], matrix[miss])
+        del packed
+        self.hits += int(hit.sum())
+        self.misses += len(miss)
+
+        out = chunk.drop(columns=[col for col in ex.curve_columns if col in chunk.columns])
+        features = pd.DataFrame(matrix, columns=self.columns, index=chunk.index)
+        return keys, pd.concat([out, features], axis=1)
+
+    def _lookup(self, keys: list[bytes]) -> tuple[np.ndarray, np.ndarray | None]:
+        """Row positions into the returned feature matrix (-1 for unknown keys)."""
+        pos = np.full(len(keys), -1, dtype=np.int64)
+        if not keys:
+            return pos, None
+        index = self._key_index()
+        part, row = index.locate(_key_array(keys))
+        blocks = []
+        offset = 0
+        for p in np.unique(part[part >= 0]).tolist():
+            sel = np.flatnonzero(part == p)
+            # one read per partition; duplicate keys in the chunk share rows
+            rows, inverse = np.unique(row[sel], return_inverse=True)
+            blocks.append(_read_rows(index.paths[p], rows, self.columns))
+            pos[sel] = offset + inverse
+            offset += len(rows)
+        if not blocks:
+            return pos, None
+        return pos, np.concatenate(blocks)
+
+    def _key_index(self) -> "_KeyIndex":
+        if self._index is None:
+            self._index = _KeyIndex()
+            for path in self._parts():
+                self._index.add(path, _read_keys(path))
+        return self._index
+
+    def _write_rows(self, keys: list[bytes], matrix: np.ndarray) -> None:
+        unique = ~pd.Index(keys).duplicated()
+        keys = [k for k, keep in zip(keys, unique) if keep]
+        matrix = matrix[unique]
+        path = self._write_part({_KEY: pa.array(keys, pa.binary(_KEY_BYTES)), **{c: matrix[:, j] for j, c in enumerate(self.columns)}})
+        self._key_index().add(path, _key_array(keys))
+
+    def _write_part(self, columns: dict) -> str:
+        rows = os.path.join(self.root, "rows")
+        os.makedirs(rows, exist_ok=True)
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        # write aside and rename so readers never see a partial partition
+        tmp = os.path.join(rows, f".{name}.tmp")
+        pq.write_table(pa.table(columns), tmp, row_group_size=_ROW_GROUP_ROWS)
+        path = os.path.join(rows, name)
+        os.replace(tmp, path)
+        return path
+
+    def _parts(self) -> list[str]:
+        return sorted(glob(os.path.join(self.root, "rows", "*.parquet")))
+
+    def _expire_datasets(self) -> int:
+        if not self.keep_datasets:
+            return 0
+        manifests = sorted(glob(os.path.join(self.root, "datasets", "*.parquet")), key=os.path.getmtime)
+        expired = manifests[: max(len(manifests) - self.keep_datasets, 0)]
+        for path in expired:
+            os.remove(path)
+        return len(expired)
+
+    def _compact(self, parts: list[str]) -> None:
+        """Rewrite all partitions as one: first copy of each key, oldest first."""
+        if not parts:
+            return
+        table = ds.dataset(parts, format="parquet").to_table(columns=[_KEY, *self.columns])
+        keys = _column_keys(table.column(_KEY))
+        keep = ~pd.Index(keys).duplicated()
+        if self.keep_datasets:
+            live = [_read_keys(p) for p in glob(os.path.join(self.root, "datasets", "*.parquet"))]
+            referenced = np.concatenate(live) if live else np.empty(0, dtype=f"S{_KEY_BYTES}")
+            keep &= np.isin(keys, referenced)
+        table = table.filter(pa.array(keep))
+        merged = self._write_part({name: table.column(name) for name in table.column_names})
+        for path in parts:
+            os.remove(path)
+        self._index = _KeyIndex()
+        self._index.add(merged, _column_keys(table.column(_KEY)))
+
+    def _lock_shared(self):
+        return _flock(os.path.join(self.root, ".lock"), shared=True)
+
+    def _lock_exclusive(self):
+        return _flock(os.path.join(self.root, ".lock"), shared=False)
+
+
+class _KeyIndex:
+    """Sorted row keys -> (partition, row), kept as a few sorted segments."""
+
+    def __init__(self):
+        self.paths: list[str] = []
+        # (sorted keys, partition ids, row numbers); the first is the merged main index
+        self._segments: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def add(self, path: str, keys: np.ndarray) -> None:
+        part = len(self.paths)
+        self.paths.append(path)
+        order = np.argsort(keys, kind="stable")
+        rows = np.arange(len(keys), dtype=np.int64)[order]
+        self._segments.append((keys[order], np.full(len(keys), part, dtype=np.int32), rows))
+        if len(self._segments) > _MAX_SEGMENTS:
+            keys_, parts_, rows_ = (np.concatenate(cols) for cols in zip(*self._segments))
+            # stable: an earlier partition's copy of a key wins
+            order = np.argsort(keys_, kind="stable")
+            self._segments = [(keys_[order], parts_[order], rows_[order])]
+
+    def locate(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        part = np.full(len(keys), -1, dtype=np.int32)
+        row = np.full(len(keys), -1, dtype=np.int64)
+        for seg_keys, seg_parts, seg_rows in self._segments:
+            todo = np.flatnonzero(part < 0)
+            if not len(todo) or not len(seg_keys):
+                continue
+            at = np.searchsorted(seg_keys, keys[todo])
+            at_ok = np.minimum(at, len(seg_keys) - 1)
+            found = (at < len(seg_keys)) & (seg_keys[at_ok] == keys[todo])
+            part[todo[found]] = seg_parts[at_ok[found]]
+            row[todo[found]] = seg_rows[at_ok[found]]
+        return part, row
+
+
+def _hash_rows(frame: pd.DataFrame) -> bytes:
+    """Per-row hashes of `frame`; array cells (unextracted curves) hash by content."""
+    frame = frame.copy(deep=False)
+    for col in frame.columns:
+        if frame[col].dtype == object:
+            frame[col] = [
+                np.asarray(v).tobytes() if isinstance(v, (np.ndarray, list, tuple)) else v for v in frame[col]
+            ]
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()
+
+
+def _key_array(keys: list[bytes]) -> np.ndarray:
+    return np.frombuffer(b"".join(keys), dtype=f"S{_KEY_BYTES}") if keys else np.empty(0, dtype=f"S{_KEY_BYTES}")
+
+
+def _column_keys(column) -> np.ndarray:
+    arr = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if not len(arr):
+        return np.empty(0, dtype=f"S{_KEY_BYTES}")
+    return np.frombuffer(arr.buffers()[1], dtype=f"S{_KEY_BYTES}", count=len(arr), offset=arr.offset * _KEY_BYTES)
+
+
+def _read_keys(path: str) -> np.ndarray:
+    return _column_keys(pq.read_table(path, columns=[_KEY]).column(_KEY))
+
+
+def _read_rows(path: str, rows: np.ndarray, columns: list[str]) -> np.ndarray:
+    """Feature matrix of sorted `rows` of a partition, reading only their row groups."""
+    pf = pq.ParquetFile(path)
+    sizes = [pf.metadata.row_group(i).num_rows for i in range(pf.metadata.num_row_groups)]
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    groups = np.unique(np.searchsorted(starts, rows, side="right") - 1)
+    table = pf.read_row_groups(groups.tolist(), columns=columns)
+    # position of each wanted row inside the concatenated row groups
+    base = np.concatenate([[0], np.cumsum([sizes[g] for g in groups])])
+    group_of = np.searchsorted(starts, rows, side="right") - 1
+    local = base[np.searchsorted(groups, group_of)] + rows - starts[group_of]
+    if not columns:
+        return np.empty((len(rows), 0))
+    return np.column_stack([table.column(c).to_numpy()[local] for c in columns])
+
+
+def _flock(path: str, shared: bool):
+    """Take the store lock; None without fcntl, False if exclusive is busy."""
+    if fcntl is None:
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fh = open(path, "a")
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        fh.close()
+        return False
+    return fh
+
+
+def _unlock(fh) -> None:
+    if fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        fh.close()
@@ -1,8 +1,12 @@
+import os
+import threading
 import typing
 import pandas as pd
 import numpy as np
+from scipy.signal import lfilter
 
 from app.models.predictor_base import BasePredictor
+from app.services.feature.chunks import iter_frame_chunks, read_chunks
 
 
 class PyTorchAnomalyPredictor(BasePredictor):
@@ -11,6 +15,10 @@ class PyTorchAnomalyPredictor(BasePredictor):
     This implementation computes per-feature mean and std on `train`, then
     flags rows as anomalous when any feature exceeds `k * std` from the mean.
     It's intentionally simple — replace with a real PyTorch model when needed.
+
+    Scoring broadcasts the stored means/stds over the whole numeric feature
+    matrix. `score` also reports each row's max |z| and the column that
+    triggered; `score_chunks` / `score_file` score frames chunk by chunk.
     """
 
     def __init__(self, k: float = 3.0):
@@ -26,18 +34,59 @@ class PyTorchAnomalyPredictor(BasePredictor):
         }
 
     def predict(self, data: pd.DataFrame):
+        return self.score(data)["is_anomaly"]
+
+    def score(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Score rows: `is_anomaly`, `max_zscore`, `trigger_index`, `trigger_column`.
+
+        A row is anomalous when any feature lies more than `k * std` from its
+        mean; features missing from `data` (or non-numeric) count as 0.0.
+        The trigger is the exceeding feature with the largest |z| (-1/NaN
+        for normal rows).
+        """
         if self.stats is None:
             raise RuntimeError("Model not trained. Call `train` first.")
+        cols = list(self.stats)
+        means = np.array([self.stats[c][0] for c in cols], dtype=float)
+        stds = np.array([self.stats[c][1] for c in cols], dtype=float)
+
         numeric = data.select_dtypes(include=[np.number])
-        anomalies = []
-        for _, row in numeric.iterrows():
-            is_anom = False
-            for col, (m, s) in self.stats.items():
-                if abs(row.get(col, 0.0) - m) > self.k * s:
-                    is_anom = True
-                    break
-            anomalies.append(is_anom)
-        return pd.Series(anomalies, index=data.index, name="is_anomaly")
+        X = np.zeros((len(data), len(cols)))
+        for j, col in enumerate(cols):
+            if col in numeric.columns:
+                X[:, j] = numeric[col].to_numpy(dtype=float, na_value=np.nan)
+
+        dev = np.abs(X - means)
+        exceed = dev > self.k * stds
+        with np.errstate(all="ignore"):
+            z = dev / stds
+        is_anomaly = exceed.any(axis=1)
+        # NaN features (missing values, NaN std) are ignored by fmax
+        max_z = np.fmax.reduce(z, axis=1) if cols else np.full(len(data), np.nan)
+        trigger = np.where(exceed, z, -np.inf).argmax(axis=1) if cols else np.zeros(len(data), dtype=np.int64)
+        trigger = np.where(is_anomaly, trigger, -1)
+        return pd.DataFrame(
+            {
+                "is_anomaly": is_anomaly,
+                "max_zscore": max_z,
+                "trigger_index": trigger,
+                "trigger_column": pd.Categorical.from_codes(trigger, categories=cols),
+            },
+            index=data.index,
+        )
+
+    def score_chunks(self, chunks: typing.Iterable[pd.DataFrame]) -> typing.Iterator[pd.DataFrame]:
+        """Lazily score an iterable of DataFrame chunks."""
+        for chunk in chunks:
+            yield self.score(chunk)
+
+    def score_frame(self, data: pd.DataFrame, chunksize: int = 1_000_000) -> pd.DataFrame:
+        """Score a large in-memory frame in row chunks to bound temporaries."""
+        return pd.concat(list(self.score_chunks(iter_frame_chunks(data, chunksize)))) if len(data) else self.score(data)
+
+    def score_file(self, path: str | os.PathLike, chunksize: int = 1_000_000) -> typing.Iterator[pd.DataFrame]:
+        """Stream a CSV/Parquet file in `chunksize` row chunks and yield scores."""
+        return self.score_chunks(read_chunks(path, chunksize))
 
     def save(self, path: str):
         if self.stats is None:
@@ -58,3 +107,159 @@ class PyTorchAnomalyPredictor(BasePredictor):
         obj = cls(k=k)
         obj.stats = {cols[i]: (float(means[i]), float(stds[i])) for i in range(len(cols))}
         return obj
+
+
+# below this many rows the per-sample loop beats `lfilter`'s call overhead
+_FILTER_MIN_ROWS = 8
+
+
+class StreamingAnomalyDetector:
+    """Online anomaly detector with exponentially weighted statistics.
+
+    Keeps an EWMA mean and variance per feature (`alpha` is the weight of
+    the newest sample). Each sample is scored against the state before it
+    (same `k * std` rule as `PyTorchAnomalyPredictor`) and then folded in,
+    in O(1) time and memory per feature. Rows are never flagged before a
+    feature has seen `min_samples` samples. Missing (NaN or absent)
+    features neither score nor update.
+
+    `update` applies a batch in order; when it is large enough and has no
+    missing values the recursions run as one `lfilter` call per statistic
+    instead of a Python loop. `save` checkpoints to the same `.npz` keys as
+    `PyTorchAnomalyPredictor` (plus the streaming state), so either class
+    can load the other's files.
+    """
+
+    def __init__(self, columns: typing.Sequence[str], alpha: float = 0.01, k: float = 3.0, min_samples: int = 30):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.columns = list(columns)
+        self.alpha = alpha
+        self.k = k
+        self.min_samples = min_samples
+        self.means = np.zeros(len(self.columns))
+        self.vars = np.zeros(len(self.columns))
+        self.counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_predictor(cls, predictor: PyTorchAnomalyPredictor, **kwargs) -> "StreamingAnomalyDetector":
+        """Start from a batch-trained model's statistics (treated as warmed up)."""
+        if predictor.stats is None:
+            raise RuntimeError("Model not trained. Call `train` first.")
+        obj = cls(list(predictor.stats), k=kwargs.pop("k", predictor.k), **kwargs)
+        obj.means = np.array([m for m, _ in predictor.stats.values()], dtype=float)
+        obj.vars = np.array([s for _, s in predictor.stats.values()], dtype=float) ** 2
+        obj.counts[:] = obj.min_samples
+        return obj
+
+    def update(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Score every row against the state before it, then update the state."""
+        X = np.full((len(data), len(self.columns)), np.nan)
+        for j, col in enumerate(self.columns):
+            if col in data.columns:
+                X[:, j] = data[col].to_numpy(dtype=float, na_value=np.nan)
+        out = self.update_array(X)
+        out["trigger_column"] = pd.Categorical.from_codes(out["trigger_index"], categories=self.columns)
+        return pd.DataFrame(out, index=data.index)
+
+    def update_array(self, X: np.ndarray) -> dict[str, np.ndarray]:
+        """`update` for a float matrix whose columns follow `self.columns`."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != len(self.columns):
+            raise ValueError(f"expected a (rows, {len(self.columns)}) matrix, got shape {X.shape}")
+        with self._lock:
+            if len(X) < _FILTER_MIN_ROWS or np.isnan(X).any():
+                dev, std, ready = self._update_loop(X)
+            else:
+                dev, std, ready = self._update_filter(X)
+            self.samples += len(X)
+        exceed = (dev > self.k * std) & ready
+        with np.errstate(all="ignore"):
+            z = np.where(ready, dev / std, np.nan)
+        is_anomaly = exceed.any(axis=1)
+        if self.columns:
+            max_z = np.fmax.reduce(z, axis=1)
+            trigger = np.where(is_anomaly, np.where(exceed, z, -np.inf).argmax(axis=1), -1)
+        else:
+            max_z = np.full(len(X), np.nan)
+            trigger = np.full(len(X), -1)
+        return {"is_anomaly": is_anomaly, "max_zscore": max_z, "trigger_index": trigger}
+
+    def _update_filter(self, X: np.ndarray):
+        # m_t = (1 - a) m_{t-1} + a x_t and v_t = (1 - a) (v_{t-1} + a d_t^2)
+        # with d_t = x_t - m_{t-1} are first-order linear recursions
+        a = self.alpha
+        n = len(X)
+        if n == 0:
+            return np.empty_like(X), np.empty_like(X), np.zeros(X.shape, dtype=bool)
+        fresh = self.counts == 0
+        self.means[fresh] = X[0, fresh]
+        M, _ = lfilter([a], [1.0, a - 1.0], X, axis=0, zi=((1 - a) * self.means)[None, :])
+        d = X - np.vstack([self.means[None, :], M[:-1]])
+        V, _ = lfilter([(1 - a) * a], [1.0, a - 1.0], d * d, axis=0, zi=((1 - a) * self.vars)[None, :])
+        std = np.sqrt(np.vstack([self.vars[None, :], V[:-1]]))
+        ready = (self.counts + np.arange(n)[:, None]) >= self.min_samples
+        self.means, self.vars = M[-1].copy(), V[-1].copy()
+        self.counts += n
+        return np.abs(d), std, ready
+
+    def _update_loop(self, X: np.ndarray):
+        a = self.alpha
+        dev = np.empty_like(X)
+        std = np.empty_like(X)
+        ready = np.empty(X.shape, dtype=bool)
+        for i, x in enumerate(X):
+            seen = ~np.isnan(x)
+            fresh = seen & (self.counts == 0)
+            self.means[fresh] = x[fresh]
+            d = x - self.means
+            dev[i] = np.abs(d)
+            std[i] = np.sqrt(self.vars)
+            ready[i] = seen & (self.counts >= self.min_samples)
+            self.means[seen] += a * d[seen]
+            self.vars[seen] = (1 - a) * (self.vars[seen] + a * d[seen] ** 2)
+            self.counts[seen] += 1
+        return dev, std, ready
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "columns": len(self.columns),
+                "samples": self.samples,
+                "alpha": self.alpha,
+                "k": self.k,
+                "warmed_up": bool((self.counts >= self.min_samples).all()),
+            }
+
+    def save(self, path: str):
+        with self._lock:
+            np.savez(
+                path,
+                cols=self.columns,
+                means=self.means,
+                stds=np.sqrt(self.vars),
+                k=np.array([self.k]),
+                alpha=np.array([self.alpha]),
+                vars=self.vars,
+                counts=self.counts,
+                min_samples=np.array([self.min_samples]),
+            )
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "StreamingAnomalyDetector":
+        """Load a streaming checkpoint or a `PyTorchAnomalyPredictor` file."""
+        data = np.load(path, allow_pickle=True)
+        if "alpha" not in data.files:
+            return cls.from_predictor(PyTorchAnomalyPredictor.load(path), **kwargs)
+        obj = cls(
+            list(data["cols"]),
+            alpha=float(data["alpha"][0]),
+            k=float(data["k"][0]),
+            min_samples=int(data["min_samples"][0]),
+        )
+        obj.means = data["means"].astype(float)
+        obj.vars = data["vars"].astype(float)
+        obj.counts = data["counts"].astype(np.int64)
+        return obj
@@ -0,0 +1,201 @@
+"""Dynamic micro-batching for online inference.
+
+Many sensors send single-row requests; calling `predictor.predict` once
+per request wastes the fixed per-call overhead of AutoGluon and pandas.
+A `MicroBatcher` owns one loaded predictor and a worker thread that
+collects queued requests until `max_batch_rows` rows are pending or
+`max_wait_ms` has passed since the first one arrived, runs a single
+`predict` on the concatenated frame and hands each caller its slice of
+the result. Only requests with the same columns and dtypes are
+concatenated; if a combined call fails, each request is retried alone so
+that only the bad one fails.
+
+A closed batcher (its model was reloaded or reconfigured) still answers
+every request it had accepted before stopping; requests that reach it
+afterwards are predicted directly instead of being queued.
+"""
+from concurrent.futures import Future
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from app.core import config
+
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_fn: Callable[[pd.DataFrame], Any],
+        max_batch_rows: int = 512,
+        max_wait_ms: float = 5.0,
+        timeout_s: float | None = None,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.timeout_s = config.MICRO_BATCH_TIMEOUT_S if timeout_s is None else timeout_s
+        self._queue: "queue.Queue" = queue.Queue()
+        # guards `_closed` so nothing is queued behind `_STOP`
+        self._state_lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.rows = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, df: pd.DataFrame) -> Future:
+        """Queue `df` for prediction; the Future resolves to its own predictions."""
+        future: Future = Future()
+        with self._state_lock:
+            if not self._closed:
+                self._queue.put((df, future))
+                return future
+        # closed: the worker is draining or gone, predict on the caller's thread
+        try:
+            future.set_result(self.predict_fn(df))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def predict(self, df: pd.DataFrame):
+        return self.submit(df).result(timeout=self.timeout_s or None)
+
+    def close(self) -> None:
+        """Stop after the requests already queued have been answered."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            rows = len(item[0])
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            stop = False
+            while rows < self.max_batch_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: list) -> None:
+        # only frames with the same columns and dtypes share a predict call:
+        # concatenating different schemas would NaN-fill the missing columns
+        groups: dict[tuple, list] = {}
+        for df, future in batch:
+            groups.setdefault(_schema(df), []).append((df, future))
+        for group in groups.values():
+            if len(group) == 1 or not self._predict_group(group):
+                # alone, or the shared call failed: one bad request must not
+                # fail its neighbours, so each frame is retried on its own
+                for item in group:
+                    self._predict_group([item])
+
+    def _predict_group(self, group: list) -> bool:
+        frames = [df for df, _ in group]
+        try:
+            combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            preds = self.predict_fn(combined)
+            parts = _split(preds, frames)
+        except BaseException as e:
+            if len(group) > 1:
+                return False
+            group[0][1].set_exception(e)
+            return True
+        self.batches += 1
+        self.rows += len(combined)
+        for (_, f), part in zip(group, parts):
+            f.set_result(part)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_rows": self.max_batch_rows,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+def _schema(df: pd.DataFrame) -> tuple:
+    return tuple((c, str(t)) for c, t in df.dtypes.items())
+
+
+def _split(preds, frames: list[pd.DataFrame]) -> list:
+    """Slice batch predictions back into per-request results."""
+    if len(frames) == 1:
+        return [preds]
+    bounds = np.cumsum([0] + [len(df) for df in frames])
+    if isinstance(preds, (pd.Series, pd.DataFrame)):
+        parts = []
+        for df, start, stop in zip(frames, bounds[:-1], bounds[1:]):
+            part = preds.iloc[start:stop]
+            part.index = df.index
+            parts.append(part)
+        return parts
+    if isinstance(preds, (np.ndarray, list)):
+        return [preds[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+    raise TypeError(f"Cannot split batched predictions of type {type(preds).__name__}")
+
+
+class BatcherRegistry:
+    """One `MicroBatcher` per deployed model (run id + loaded instance)."""
+
+    def __init__(self):
+        self._batchers: dict[str, tuple[int, MicroBatcher]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, run_id: str, predictor, metadata: dict | None = None) -> MicroBatcher | None:
+        """Return the batcher for `run_id`, or None when batching is disabled.
+
+        Per-model settings come from `metadata["batching"]` and default to
+        `MICRO_BATCH_MAX_ROWS` / `MICRO_BATCH_MAX_WAIT_MS`.
+        """
+        settings = (metadata or {}).get("batching") or {}
+        max_rows = int(settings.get("max_batch_rows", config.MICRO_BATCH_MAX_ROWS))
+        max_wait = float(settings.get("max_wait_ms", config.MICRO_BATCH_MAX_WAIT_MS))
+        if max_wait <= 0 or max_rows <= 1:
+            return None
+        with self._lock:
+            current = self._batchers.get(run_id)
+            if current is not None:
+                owner, batcher = current
+                if owner == id(predictor) and batcher.max_batch_rows == max_rows and batcher.max_wait_ms == max_wait:
+                    return batcher
+                # model was reloaded or reconfigured
+                batcher.close()
+            batcher = MicroBatcher(predictor.predict, max_batch_rows=max_rows, max_wait_ms=max_wait)
+            self._batchers[run_id] = (id(predictor), batcher)
+            return batcher
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {run_id: batcher.stats() for run_id, (_, batcher) in self._batchers.items()}
+
+
+batchers = BatcherRegistry()
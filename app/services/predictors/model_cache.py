@@ -0,0 +1,154 @@
+"""Process-wide cache of loaded predictors for the deploy path.
+
+Loading an AutoGluon model deserializes the whole artifact directory, so
+`/deploy/predict` keeps loaded predictors keyed by run id, predictor class
+and artifact mtime (the newest mtime anywhere in the artifact tree).
+Concurrent requests for a model that is not loaded yet wait on a single
+load (single-flight). Entries are evicted LRU-first once their estimated
+resident size (the on-disk artifact size) exceeds the
+`MODEL_CACHE_MAX_BYTES` budget. A model larger than the whole budget is
+pinned outside the LRU (with a warning) rather than being reloaded from
+disk on every request, but only one such model is held at a time:
+pinning another replaces it, so memory stays within the budget plus the
+single largest model.
+"""
+from concurrent.futures import Future
+import logging
+import os
+import threading
+import time
+
+from app.core import config
+from app.core.cache import LRUCache
+
+# a directory scan is reused for this long (seconds): walking a few hundred
+# artifact files costs about a millisecond, too much for every request
+MTIME_SCAN_TTL_S = 1.0
+_scans: dict[str, tuple[float, int]] = {}
+
+
+def artifact_mtime(path: str) -> int:
+    """Newest modification time (ns) of an artifact file or anywhere in its tree.
+
+    Rewriting a nested file does not touch the run directory's own mtime,
+    so every file and directory below it is checked. Directory results are
+    reused for `MTIME_SCAN_TTL_S`.
+    """
+    if not os.path.isdir(path):
+        return os.stat(path).st_mtime_ns
+    now = time.monotonic()
+    cached = _scans.get(path)
+    if cached is not None and now - cached[0] < MTIME_SCAN_TTL_S:
+        return cached[1]
+    newest = os.stat(path).st_mtime_ns
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+            except OSError:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+    _scans[path] = (now, newest)
+    return newest
+
+
+def artifact_size(path: str) -> int:
+    """Total on-disk size of an artifact file or directory tree."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class ModelCache:
+    def __init__(self, max_bytes: int):
+        self._cache = LRUCache(max_bytes)
+        self._inflight: dict[tuple, Future] = {}
+        # (key, model) of the one model too large for the LRU budget
+        self._pinned: tuple[tuple, object] | None = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, run_id: str, artifact_path: str, predictor_cls):
+        """Return the loaded predictor for `run_id`, loading it at most once."""
+        key = (run_id, predictor_cls.__name__, artifact_mtime(artifact_path))
+        pinned = self._pinned
+        if pinned is not None and pinned[0] == key:
+            return pinned[1]
+        model = self._cache.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            model = predictor_cls.load(artifact_path)
+            self.loads += 1
+            # a new mtime means the artifacts were replaced; drop stale versions
+            self._cache.discard_where(lambda k: k[0] == run_id and k != key)
+            size = artifact_size(artifact_path)
+            if size > self._cache.max_bytes:
+                logging.warning(
+                    "Model %s (%d bytes) exceeds MODEL_CACHE_MAX_BYTES (%d); pinning it outside the LRU"
+                    " in place of any previously pinned model",
+                    run_id, size, self._cache.max_bytes,
+                )
+                with self._lock:
+                    self._pinned = (key, model)
+            else:
+                with self._lock:
+                    if self._pinned is not None and self._pinned[0][0] == run_id:
+                        self._pinned = None
+                self._cache.put(key, model, size)
+            future.set_result(model)
+            return model
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def is_loaded(self, run_id: str, artifact_path: str, predictor_cls) -> bool:
+        """Whether the current version of the model is loaded (no load is started)."""
+        key = (run_id, predictor_cls.__name__, artifact_mtime(artifact_path))
+        pinned = self._pinned
+        return (pinned is not None and pinned[0] == key) or key in self._cache
+
+    def invalidate(self, run_id: str | None = None) -> None:
+        with self._lock:
+            if run_id is None or (self._pinned is not None and self._pinned[0][0] == run_id):
+                self._pinned = None
+        if run_id is None:
+            self._cache.clear()
+        else:
+            self._cache.discard_where(lambda k: k[0] == run_id)
+
+    def stats(self) -> dict:
+        out = self._cache.stats()
+        out["loads"] = self.loads
+        out["loading"] = len(self._inflight)
+        out["pinned"] = [] if self._pinned is None else [self._pinned[0][0]]
+        return out
+
+
+model_cache = ModelCache(config.MODEL_CACHE_MAX_BYTES)
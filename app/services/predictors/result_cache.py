@@ -0,0 +1,138 @@
+"""Per-row prediction cache for the deploy path.
+
+Dashboards and PLC polling loops send the same feature rows for the same
+model many times a minute. `PredictionCache.predict` hashes every row of
+the post-extraction feature frame, serves the rows it has seen before and
+sends only the remaining rows to the predictor, as one batch.
+
+Keys are `(run_id, model version, column signature, row hash)`; the model
+version combines the artifact mtime with a fingerprint of the registry
+entry, so re-training, re-registering or editing the entry's metadata
+invalidates the run's cached rows. Entries are evicted LRU-first under
+`PREDICTION_CACHE_BYTES` and expire after `PREDICTION_CACHE_TTL_S`.
+"""
+import hashlib
+import json
+import threading
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.core import config
+from app.core.cache import LRUCache
+from app.services.predictors.model_cache import artifact_mtime
+
+# rough per-entry bookkeeping cost (key tuple, OrderedDict node)
+_ENTRY_OVERHEAD = 200
+
+
+def model_version(entry: dict) -> tuple:
+    """Version of a registry entry: artifact mtime plus an entry fingerprint."""
+    fingerprint = hashlib.blake2b(json.dumps(entry, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+    return artifact_mtime(entry["artifact_path"]), fingerprint
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of every row's values (index excluded)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class PredictionCache:
+    """Row cache for predictors whose output has one entry per input row.
+
+    The output container is rebuilt the same way on every path (all rows
+    cached, some, or none): a Series keeps its name and dtype, a DataFrame
+    its columns and dtypes, an ndarray or list stays one, always aligned to
+    the input index. Outputs that are not row-aligned (a dict, a forecast
+    frame with its own rows) are returned as they are and never cached.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float | None = None):
+        self._cache = LRUCache(max_bytes, ttl=ttl)
+        self._versions: dict[str, tuple] = {}
+        # output container of each run's current version, see `_template`
+        self._templates: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def predict(self, run_id: str, version: tuple, df: pd.DataFrame, predict_fn: Callable[[pd.DataFrame], object]):
+        """Predict `df`, calling `predict_fn` only on rows not cached for this model version."""
+        self._check_version(run_id, version)
+        columns = tuple((str(c), str(t)) for c, t in df.dtypes.items())
+        keys = [(run_id, version, columns, h) for h in row_hashes(df).tolist()]
+        rows = self._cache.get_many(keys)
+        missing = [i for i, row in enumerate(rows) if row is None]
+        template = self._templates.get(run_id)
+        if missing:
+            batch = df.iloc[missing] if len(missing) < len(df) else df
+            preds = predict_fn(batch)
+            template = _template(preds, len(batch))
+            if template is None:
+                # not one output per row: nothing to cache or merge
+                return preds if len(missing) == len(df) else predict_fn(df)
+            self._templates[run_id] = template
+            values = np.asarray(preds)
+            self._cache.put_many(
+                (keys[i], values[j], values[j].nbytes + _ENTRY_OVERHEAD) for j, i in enumerate(missing)
+            )
+            for j, i in enumerate(missing):
+                rows[i] = values[j]
+        if template is None:
+            # a concurrent version change dropped the template: predict afresh
+            return predict_fn(df)
+        return _rebuild(template, rows, df.index)
+
+    def _check_version(self, run_id: str, version: tuple) -> None:
+        with self._lock:
+            if self._versions.get(run_id) == version:
+                return
+            self._versions[run_id] = version
+            self._templates.pop(run_id, None)
+        # the registry entry or artifacts changed: drop the run's old rows
+        self._cache.discard_where(lambda k: k[0] == run_id and k[1] != version)
+
+    def invalidate(self, run_id: str | None = None) -> None:
+        with self._lock:
+            if run_id is None:
+                self._versions.clear()
+                self._templates.clear()
+            else:
+                self._versions.pop(run_id, None)
+                self._templates.pop(run_id, None)
+        if run_id is None:
+            self._cache.clear()
+        else:
+            self._cache.discard_where(lambda k: k[0] == run_id)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def _template(preds, n_rows: int) -> tuple | None:
+    """How to rebuild `preds` from per-row values, or None if not row-aligned."""
+    if isinstance(preds, pd.Series) and len(preds) == n_rows:
+        return ("series", preds.name, preds.dtype)
+    if isinstance(preds, pd.DataFrame) and len(preds) == n_rows:
+        return ("frame", preds.columns, preds.dtypes)
+    if isinstance(preds, (np.ndarray, list)) and len(preds) == n_rows:
+        values = np.asarray(preds)
+        if values.ndim >= 1 and values.dtype != object:
+            return ("array" if isinstance(preds, np.ndarray) else "list", None, values.dtype)
+    return None
+
+
+def _rebuild(template: tuple, rows: list, index: pd.Index):
+    kind, meta, dtype = template
+    if kind == "frame":
+        return pd.DataFrame(list(rows), columns=meta, index=index).astype(dtype.to_dict())
+    if kind == "series":
+        return pd.Series(list(rows), index=index, name=meta, dtype=dtype)
+    values = np.array(rows, dtype=dtype) if rows else np.empty(0, dtype=dtype)
+    return values if kind == "array" else values.tolist()
+
+
+prediction_cache: PredictionCache | None = (
+    PredictionCache(config.PREDICTION_CACHE_BYTES, ttl=config.PREDICTION_CACHE_TTL_S or None)
+    if config.PREDICTION_CACHE_BYTES > 0
+    else None
+)
@@ -1,10 +1,19 @@
+import json
 import typing
+from typing import Iterable
 import numpy as np
 import pandas as pd
 import os
+import scipy.sparse as sp
+from scipy.sparse.linalg import lsmr
 
 from app.models.predictor_base import BasePredictor
 
+# dtypes that `pd.get_dummies` one-hot encodes
+_CATEGORICAL_DTYPES = ["object", "string", "category"]
+# below this many rows dict lookups beat `Index.get_indexer`
+_SMALL_BATCH = 64
+
 
 class SimpleTabularPredictor(BasePredictor):
     """Very small, dependency-light tabular predictor for MVP use.
@@ -13,12 +22,56 @@ class SimpleTabularPredictor(BasePredictor):
     - Fits linear regression via `np.linalg.lstsq`
     - Saves/loads coefficients with `np.savez`
     This is intentionally minimal and not intended for production accuracy.
+
+    `train` also records an encoding plan (numeric column order and the
+    categorical vocabularies), saved next to `coef`. `predict` uses it to
+    fill one preallocated design matrix directly; models saved without a
+    plan fall back to the `get_dummies` path.
+
+    The fit keeps its sufficient statistics (X'X and X'y, intercept first)
+    and saves them too. `partial_fit` adds a chunk of new rows to them and
+    re-solves, so updates cost O(new rows) and memory only depends on the
+    number of features; `train_chunks` fits from scratch that way over any
+    number of chunks. Categorical levels first seen in a later chunk get
+    new (zero so far) columns. `ridge > 0` adds an L2 penalty on all
+    coefficients but the intercept.
+
+    `sparse=True` builds the design matrix as a SciPy CSR matrix (one
+    non-zero per categorical per row) and keeps X'X sparse, solving it with
+    LSMR, so memory follows the non-zero count instead of rows x levels.
+    `hash_buckets > 0` hashes every categorical column into that many
+    columns instead of keeping a vocabulary (no baseline is dropped; the
+    solver returns the minimum-norm coefficients).
     """
 
-    def __init__(self):
+    def __init__(self, ridge: float = 0.0, sparse: bool = False, hash_buckets: int = 0):
         self.coef_: np.ndarray | None = None
         self.columns_: list[str] | None = None
         self.intercept_: float = 0.0
+        self.ridge = ridge
+        self.sparse = sparse
+        self.hash_buckets = hash_buckets
+        # {"numeric": [col, ...], "categorical": [[col, [level, ...]], ...],
+        #  "baseline": {col: dropped first level}, "hashed": {col: n_buckets}}
+        self.encoding_: dict | None = None
+        self._plan = None
+        # (plan, flattened weights) for `predict_row`
+        self._row_plan = None
+        # sufficient statistics of the fit
+        self.xtx_: np.ndarray | None = None
+        self.xty_: np.ndarray | None = None
+        self.n_rows_: int = 0
+
+    @property
+    def input_columns_(self) -> list[str] | None:
+        """Raw input columns expected by `predict` (None without a plan)."""
+        if self.encoding_ is None:
+            return None
+        return (
+            list(self.encoding_["numeric"])
+            + [col for col, _ in self.encoding_["categorical"]]
+            + list(self.encoding_.get("hashed", {}))
+        )
 
     def _prepare_X_y(self, df: pd.DataFrame, label: str):
         y = df[label].astype(float).to_numpy()
@@ -30,20 +83,295 @@ class SimpleTabularPredictor(BasePredictor):
         X_mat = np.hstack([np.ones((X_mat.shape[0], 1)), X_mat])
         return X_mat, y, ["__intercept__"] + cols
 
+    @staticmethod
+    def _levels(s: pd.Series) -> list:
+        levels = list(s.cat.categories) if isinstance(s.dtype, pd.CategoricalDtype) else list(pd.factorize(s, sort=True)[1])
+        return [v.item() if isinstance(v, np.generic) else v for v in levels]
+
+    @classmethod
+    def _vocabulary(cls, X: pd.DataFrame, hash_buckets: int = 0) -> dict:
+        """Encoding plan matching `get_dummies(X, drop_first=True)`."""
+        categorical = list(X.select_dtypes(include=_CATEGORICAL_DTYPES).columns)
+        numeric = [c for c in X.columns if c not in categorical]
+        if hash_buckets > 0:
+            return {"numeric": numeric, "categorical": [], "baseline": {}, "hashed": {col: hash_buckets for col in categorical}}
+        vocab, baseline = [], {}
+        for col in categorical:
+            levels = cls._levels(X[col])
+            vocab.append([col, levels[1:]])
+            if levels:
+                baseline[col] = levels[0]
+        return {"numeric": numeric, "categorical": vocab, "baseline": baseline}
+
+    @classmethod
+    def _build_encoding(cls, X: pd.DataFrame, columns: list[str]) -> dict | None:
+        """Vocabularies matching what `get_dummies(drop_first=True)` produced."""
+        encoding = cls._vocabulary(X)
+        # only keep plans that reproduce the trained columns and survive JSON
+        if cls._feature_names(encoding) != columns[1:]:
+            return None
+        try:
+            if json.loads(json.dumps(encoding)) != encoding:
+                return None
+        except (TypeError, ValueError):
+            return None
+        return encoding
+
+    @staticmethod
+    def _feature_names(encoding: dict) -> list[str]:
+        return (
+            list(encoding["numeric"])
+            + [f"{col}_{level}" for col, levels in encoding["categorical"] for level in levels]
+            + [f"{col}__hash{i}" for col, buckets in encoding.get("hashed", {}).items() for i in range(buckets)]
+        )
+
     def train(self, data: pd.DataFrame, config: typing.Any = None):
         # Expect the caller to pass a dataframe that already contains the label column
         if getattr(config, "label", None) is None:
             raise ValueError("`config.label` must be set for SimpleTabularPredictor")
         label = config.label
+        if self.sparse or self.hash_buckets > 0:
+            # get_dummies would densify; fit on the plan instead
+            self.train_chunks([data], config)
+            return
         X, y, cols = self._prepare_X_y(data, label)
-        coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+        self.xtx_ = X.T @ X
+        self.xty_ = X.T @ y
+        self.n_rows_ = len(y)
+        if self.ridge > 0:
+            coef = self._solve()
+        else:
+            coef, *_ = np.linalg.lstsq(X, y, rcond=None)
         self.coef_ = coef
         self.columns_ = cols
         self.intercept_ = float(coef[0])
+        self.encoding_ = self._build_encoding(data.drop(columns=[label]), cols)
+        self._plan = None
+
+    def train_chunks(self, chunks: Iterable[pd.DataFrame], config: typing.Any = None):
+        """Fit from scratch over DataFrame chunks, holding one chunk at a time."""
+        label = self._label(config)
+        self.coef_ = self.columns_ = self.encoding_ = self._plan = None
+        self.xtx_ = self.xty_ = None
+        self.n_rows_ = 0
+        for chunk in chunks:
+            self._accumulate(chunk, label)
+        if self.encoding_ is None:
+            raise ValueError("no training data")
+        self._set_coef(self._solve())
+        return self
+
+    def partial_fit(self, data: pd.DataFrame, config: typing.Any = None):
+        """Add `data` (which contains the label column) to the fit and re-solve."""
+        label = self._label(config)
+        if self.coef_ is not None and (self.xtx_ is None or self.encoding_ is None):
+            raise RuntimeError("model has no saved fit statistics or encoding plan; retrain it to update incrementally")
+        self._accumulate(data, label)
+        self._set_coef(self._solve())
+        return self
+
+    @staticmethod
+    def _label(config) -> str:
+        if getattr(config, "label", None) is None:
+            raise ValueError("`config.label` must be set for SimpleTabularPredictor")
+        return config.label
+
+    def _accumulate(self, data: pd.DataFrame, label: str) -> None:
+        X = data.drop(columns=[label])
+        if self.encoding_ is None:
+            self.encoding_ = self._vocabulary(X, self.hash_buckets)
+            width = len(self._feature_names(self.encoding_)) + 1
+            self.xtx_ = sp.csr_matrix((width, width)) if self.sparse else np.zeros((width, width))
+            self.xty_ = np.zeros(width)
+        else:
+            self._extend_encoding(X)
+        design = self._design_matrix(X)
+        y = data[label].to_numpy(dtype=float)
+        sums = np.asarray(design.sum(axis=0)).ravel()
+        if self.sparse:
+            self.xtx_ = self.xtx_ + sp.bmat([
+                [sp.csr_matrix([[len(y)]]), sp.csr_matrix(sums[None, :])],
+                [sp.csr_matrix(sums[:, None]), design.T @ design],
+            ], format="csr")
+        else:
+            self.xtx_[0, 0] += len(y)
+            self.xtx_[0, 1:] += sums
+            self.xtx_[1:, 0] += sums
+            self.xtx_[1:, 1:] += design.T @ design
+        self.xty_[0] += y.sum()
+        self.xty_[1:] += design.T @ y
+        self.n_rows_ += len(y)
+
+    def _extend_encoding(self, X: pd.DataFrame) -> None:
+        """Add columns for categorical levels not seen so far."""
+        before = self._feature_names(self.encoding_)
+        baseline = self.encoding_.setdefault("baseline", {})
+        grown = False
+        for entry in self.encoding_["categorical"]:
+            col, levels = entry
+            if col not in X:
+                continue
+            known = set(levels)
+            if col in baseline:
+                known.add(baseline[col])
+            new = [v for v in self._levels(X[col]) if v not in known]
+            if not new:
+                continue
+            if col not in baseline:
+                # column was all-null so far: its first level becomes the dropped baseline
+                baseline[col], new = new[0], new[1:]
+            entry[1] = levels + new
+            grown = grown or bool(new)
+        if not grown:
+            return
+        after = self._feature_names(self.encoding_)
+        # old statistics move to their new positions; new columns were zero for all past rows
+        index = {name: i for i, name in enumerate(after, start=1)}
+        pos = np.array([0] + [index[name] for name in before])
+        if sp.issparse(self.xtx_):
+            move = sp.csr_matrix((np.ones(len(pos)), (pos, np.arange(len(pos)))), shape=(len(after) + 1, len(pos)))
+            xtx = (move @ self.xtx_ @ move.T).tocsr()
+        else:
+            xtx = np.zeros((len(after) + 1, len(after) + 1))
+            xtx[np.ix_(pos, pos)] = self.xtx_
+        xty = np.zeros(len(after) + 1)
+        xty[pos] = self.xty_
+        self.xtx_, self.xty_ = xtx, xty
+        self._plan = None
+
+    def _solve(self) -> np.ndarray:
+        if sp.issparse(self.xtx_):
+            penalty = np.full(self.xtx_.shape[0], float(self.ridge))
+            penalty[0] = 0.0
+            A = (self.xtx_ + sp.diags(penalty)).tocsr()
+            # LSMR converges to the minimum-norm solution of singular systems too
+            return lsmr(A, self.xty_, atol=1e-12, btol=1e-12, maxiter=10 * A.shape[0])[0]
+        A = self.xtx_.copy()
+        if self.ridge > 0:
+            idx = np.arange(1, len(A))
+            A[idx, idx] += self.ridge
+        # lstsq rather than solve: dummies of never-seen levels and collinear
+        # columns leave X'X singular; this yields the minimum-norm solution
+        coef, *_ = np.linalg.lstsq(A, self.xty_, rcond=None)
+        return coef
+
+    def _set_coef(self, coef: np.ndarray) -> None:
+        self.coef_ = coef
+        self.columns_ = ["__intercept__"] + self._feature_names(self.encoding_)
+        self.intercept_ = float(coef[0])
+        self._plan = None
+
+    def _compile(self):
+        if self._plan is None:
+            offset = len(self.encoding_["numeric"])
+            categorical = []
+            for col, levels in self.encoding_["categorical"]:
+                categorical.append((col, offset, {v: i for i, v in enumerate(levels)}, pd.Index(levels)))
+                offset += len(levels)
+            for col, buckets in self.encoding_.get("hashed", {}).items():
+                categorical.append((col, offset, None, buckets))
+                offset += buckets
+            self._plan = (list(enumerate(self.encoding_["numeric"])), categorical, offset)
+        return self._plan
+
+    def _design_matrix(self, data: pd.DataFrame):
+        """Encode `data` with the plan into an (n_rows, n_features) matrix, no intercept.
+
+        Dense ndarray by default, CSR with `sparse=True`.
+        """
+        numeric, categorical, width = self._compile()
+        n = len(data)
+        X = np.zeros((n, len(numeric) if self.sparse else width))
+        columns = self._input_arrays(data)
+        for j, col in numeric:
+            if col in columns:
+                X[:, j] = columns[col]
+        rows = np.arange(n)
+        hit_rows, hit_cols = [], []
+        for col, offset, lookup, index in categorical:
+            if col not in columns:
+                continue
+            if lookup is None:
+                pos = _hash_buckets(columns[col], index)
+            elif n <= _SMALL_BATCH:
+                pos = np.fromiter((lookup.get(v, -1) for v in columns[col]), dtype=np.int64, count=n)
+            else:
+                pos = index.get_indexer(columns[col])
+            hit = pos >= 0
+            # unseen and dropped-first levels leave the row's dummies at zero
+            hit_rows.append(rows[hit])
+            hit_cols.append(offset + pos[hit])
+        if not self.sparse:
+            for r, c in zip(hit_rows, hit_cols):
+                X[r, c] = 1.0
+            return X
+        num_rows, num_cols = np.nonzero(X)
+        r = np.concatenate([num_rows, *hit_rows])
+        c = np.concatenate([num_cols, *hit_cols])
+        values = np.concatenate([X[num_rows, num_cols], np.ones(len(r) - len(num_rows))])
+        return sp.csr_matrix((values, (r, c)), shape=(n, width))
 
     def predict(self, data: pd.DataFrame):
         if self.coef_ is None or self.columns_ is None:
             raise RuntimeError("Model not trained. Call `train` first.")
+        if self.encoding_ is None:
+            return self._predict_legacy(data)
+        preds = self._design_matrix(data) @ self.coef_[1:]
+        preds += self.intercept_
+        return pd.Series(preds, index=data.index, name="prediction")
+
+    def predict_row(self, row: typing.Mapping[str, typing.Any]) -> float:
+        """Predict one row given as a column -> value mapping.
+
+        Skips the DataFrame entirely: the plan is flattened once into
+        per-column weights (numeric) and per-level weights (categorical),
+        so a row costs one dict lookup per input column. Absent columns
+        and unseen levels contribute zero, as in `predict`.
+        """
+        if self.coef_ is None or self.columns_ is None:
+            raise RuntimeError("Model not trained. Call `train` first.")
+        if self.encoding_ is None:
+            return float(self._predict_legacy(pd.DataFrame([row])).iloc[0])
+        numeric, categorical, hashed = self._row_weights()
+        total = self.intercept_
+        for col, weight in numeric:
+            if col in row:
+                value = row[col]
+                # None is missing (NaN), like in a DataFrame
+                total += weight * (np.nan if value is None else float(value))
+        for col, weights in categorical:
+            total += weights.get(row.get(col), 0.0)
+        for col, (buckets, weights) in hashed.items():
+            if col in row:
+                pos = _hash_buckets([row[col]], buckets)[0]
+                if pos >= 0:
+                    total += weights[pos]
+        return float(total)
+
+    def _row_weights(self):
+        plan = self._compile()
+        if self._row_plan is None or self._row_plan[0] is not plan:
+            numeric, categorical, _ = plan
+            weights = self.coef_[1:].tolist()
+            per_level, hashed = [], {}
+            for col, offset, lookup, index in categorical:
+                if lookup is None:
+                    hashed[col] = (index, weights[offset:offset + index])
+                else:
+                    per_level.append((col, {v: weights[offset + i] for v, i in lookup.items()}))
+            self._row_plan = (plan, ([(col, weights[j]) for j, col in numeric], per_level, hashed))
+        return self._row_plan[1]
+
+    def _input_arrays(self, data: pd.DataFrame) -> dict:
+        """Values of the plan's input columns present in `data`."""
+        wanted = self.input_columns_
+        if len(data) <= _SMALL_BATCH:
+            # per-column Series access dominates small batches: box once
+            values = data.to_numpy(dtype=object)
+            return {c: values[:, i] for i, c in enumerate(data.columns) if c in wanted}
+        return {c: data[c] for c in wanted if c in data}
+
+    def _predict_legacy(self, data: pd.DataFrame):
         X = data.copy()
         X = pd.get_dummies(X, drop_first=True)
         # ensure same columns
@@ -59,7 +387,17 @@ class SimpleTabularPredictor(BasePredictor):
         if self.coef_ is None or self.columns_ is None:
             raise RuntimeError("Model not trained. Nothing to save.")
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        np.savez(path, coef=self.coef_, columns=self.columns_)
+        extra = {} if self.encoding_ is None else {"encoding": json.dumps(self.encoding_)}
+        if self.xtx_ is not None:
+            extra.update(xty=self.xty_, n_rows=self.n_rows_, ridge=self.ridge)
+            if sp.issparse(self.xtx_):
+                xtx = self.xtx_.tocoo()
+                extra.update(xtx_data=xtx.data, xtx_row=xtx.row, xtx_col=xtx.col)
+            else:
+                extra.update(xtx=self.xtx_)
+        if self.sparse or self.hash_buckets:
+            extra.update(sparse=self.sparse, hash_buckets=self.hash_buckets)
+        np.savez(path, coef=self.coef_, columns=self.columns_, **extra)
 
     @classmethod
     def load(cls, path: str):
@@ -70,4 +408,26 @@ class SimpleTabularPredictor(BasePredictor):
         obj.coef_ = coef
         obj.columns_ = columns
         obj.intercept_ = float(coef[0])
+        if "encoding" in data.files:
+            obj.encoding_ = json.loads(str(data["encoding"]))
+        if "sparse" in data.files:
+            obj.sparse = bool(data["sparse"])
+            obj.hash_buckets = int(data["hash_buckets"])
+        if "xty" in data.files:
+            width = len(data["xty"])
+            if "xtx_data" in data.files:
+                obj.xtx_ = sp.csr_matrix((data["xtx_data"], (data["xtx_row"], data["xtx_col"])), shape=(width, width))
+            else:
+                obj.xtx_ = data["xtx"]
+            obj.xty_ = data["xty"]
+            obj.n_rows_ = int(data["n_rows"])
+            obj.ridge = float(data["ridge"])
         return obj
+
+
+def _hash_buckets(values, buckets: int) -> np.ndarray:
+    """Stable bucket of every value (-1 for missing), independent of the process."""
+    values = pd.Series(values, dtype=object)
+    pos = (pd.util.hash_array(values.astype(str).to_numpy(dtype=object)) % np.uint64(buckets)).astype(np.int64)
+    pos[values.isna().to_numpy()] = -1
+    return pos
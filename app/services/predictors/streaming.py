@@ -0,0 +1,98 @@
+"""Named streaming anomaly detectors for the `/deploy/stream` endpoints.
+
+Each stream id owns one `StreamingAnomalyDetector`. A stream is restored
+from its checkpoint in `STREAM_CHECKPOINT_DIR` when one exists, otherwise
+it starts from a registered anomaly model (`run_id`) or from scratch with
+the columns of its first batch. Checkpoints are written on request and at
+shutdown.
+
+At most `STREAM_MAX_STREAMS` detectors are held at once; creating another
+fails until a stream is closed (`close` checkpoints it and frees its slot).
+"""
+import os
+import re
+import threading
+
+from app.core import config
+from app.services.predictors.anomaly import StreamingAnomalyDetector
+from app.services.registry.model_registry import get_model
+
+_STREAM_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+class StreamRegistry:
+    def __init__(self, checkpoint_dir: str, max_streams: int = 1000):
+        self.checkpoint_dir = checkpoint_dir
+        self.max_streams = max_streams
+        self._streams: dict[str, StreamingAnomalyDetector] = {}
+        self._lock = threading.Lock()
+
+    def path(self, stream_id: str) -> str:
+        if not _STREAM_ID.match(stream_id):
+            raise ValueError(f"invalid stream id: {stream_id!r}")
+        return os.path.join(self.checkpoint_dir, f"{stream_id}.npz")
+
+    def get(
+        self,
+        stream_id: str,
+        columns: list[str] | None = None,
+        run_id: str | None = None,
+        **params,
+    ) -> StreamingAnomalyDetector:
+        """Return the stream's detector, creating it on first use.
+
+        `params` (`alpha`, `k`, `min_samples`) only apply when the detector
+        is created; None values fall back to the detector defaults.
+        """
+        params = {k: v for k, v in params.items() if v is not None}
+        path = self.path(stream_id)
+        with self._lock:
+            detector = self._streams.get(stream_id)
+            if detector is not None:
+                return detector
+            if len(self._streams) >= self.max_streams:
+                raise ValueError(f"stream limit reached ({self.max_streams} open streams)")
+            if os.path.exists(path):
+                detector = StreamingAnomalyDetector.load(path)
+            elif run_id:
+                entry = get_model(run_id)
+                if not entry:
+                    raise KeyError(f"run_id {run_id} not found in registry")
+                detector = StreamingAnomalyDetector.load(entry["artifact_path"], **params)
+            elif columns:
+                detector = StreamingAnomalyDetector(columns, **params)
+            else:
+                raise ValueError("a new stream needs columns or a run_id")
+            self._streams[stream_id] = detector
+            return detector
+
+    def checkpoint(self, stream_id: str) -> str:
+        path = self.path(stream_id)
+        with self._lock:
+            detector = self._streams.get(stream_id)
+        if detector is None:
+            raise KeyError(f"stream {stream_id} not found")
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp = path[: -len(".npz")] + ".tmp.npz"
+        detector.save(tmp)
+        os.replace(tmp, path)
+        return path
+
+    def close(self, stream_id: str) -> str:
+        """Checkpoint the stream and drop its detector; return the checkpoint path."""
+        path = self.checkpoint(stream_id)
+        with self._lock:
+            self._streams.pop(stream_id, None)
+        return path
+
+    def checkpoint_all(self) -> list[str]:
+        with self._lock:
+            stream_ids = list(self._streams)
+        return [self.checkpoint(stream_id) for stream_id in stream_ids]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {stream_id: detector.stats() for stream_id, detector in self._streams.items()}
+
+
+streams = StreamRegistry(config.STREAM_CHECKPOINT_DIR, config.STREAM_MAX_STREAMS)
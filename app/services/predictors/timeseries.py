@@ -1,17 +1,47 @@
+import os
+import time
+
 import pandas as pd
 import numpy as np
-from autogluon.timeseries import TimeSeriesPredictor
+from scipy.stats import norm
+
+try:
+    from autogluon.timeseries import TimeSeriesDataFrame, TimeSeriesPredictor
+except Exception:  # pragma: no cover - autogluon may not be installed in dev env
+    TimeSeriesDataFrame = None
+    TimeSeriesPredictor = None
+
+from app.core import config as settings
+from app.core.cache import LRUCache
 from app.models.predictor_base import BasePredictor
 
 
 class AutoGluonTimeSeriesPredictor(BasePredictor):
+    """AutoGluon TimeSeriesPredictor with dynamic forecast thresholds.
+
+    `predict_many` forecasts many series given as one long-format frame
+    (`item_id`, `timestamp`, target) in a single model call. Forecasts are
+    cached per (item_id, last timestamp, model version), so series whose
+    history has not grown since the previous call are served from cache.
+    """
+
+    def __init__(self):
+        self.model = None
+        self.freq = None
+        # changes whenever the underlying model is (re)trained or loaded
+        self.version: str | None = None
+        self.cache = LRUCache(settings.FORECAST_CACHE_BYTES) if settings.FORECAST_CACHE_BYTES > 0 else None
+
     def train(self, data: pd.DataFrame, config):
+        if TimeSeriesPredictor is None:
+            raise ImportError("autogluon.timeseries is required for AutoGluonTimeSeriesPredictor")
         self.freq = data.index.freq
         self.model = TimeSeriesPredictor(
         prediction_length=config.prediction_length,
         freq=self.freq
         )
         self.model.fit(data)
+        self.version = f"trained-{time.time_ns()}"
 
 
     def predict(self, data: pd.DataFrame, sensitivity_factor: float = 1.0):
@@ -21,9 +51,75 @@ class AutoGluonTimeSeriesPredictor(BasePredictor):
         return self.generate_dynamic_threshold(forecast, sensitivity_factor)
 
 
+    def predict_many(
+        self,
+        data: pd.DataFrame,
+        sensitivity_factor: float = 1.0,
+        id_column: str = "item_id",
+        timestamp_column: str = "timestamp",
+    ) -> pd.DataFrame:
+        """Forecast every series of a long-format frame in one model call.
+
+        Returns a long frame with `item_id`, `timestamp`, `mean`, `upper` and
+        `lower` columns. Only series missing from the forecast cache are sent
+        to the model; thresholds are computed over the whole batch at once.
+        """
+        if self.model is None:
+            raise RuntimeError("Model not trained. Call `train` first.")
+        data = data.rename(columns={id_column: "item_id", timestamp_column: "timestamp"})
+        last = data.groupby("item_id", sort=False)["timestamp"].max()
+        keys = [(item, ts, self.version) for item, ts in last.items()]
+        cached = self.cache.get_many(keys) if self.cache is not None else [None] * len(keys)
+        missing = [key[0] for key, hit in zip(keys, cached) if hit is None]
+
+        parts = [hit for hit in cached if hit is not None]
+        if missing:
+            history = data[data["item_id"].isin(missing)]
+            forecast = self._forecast_frame(self.model.predict(self._to_model_input(history)))
+            if self.cache is not None:
+                by_item = dict(tuple(forecast.groupby("item_id", sort=False)))
+                self.cache.put_many(
+                    ((item, last[item], self.version), part, int(part.memory_usage(index=False).sum()))
+                    for item, part in by_item.items()
+                )
+            parts.append(forecast)
+        if not parts:
+            return pd.DataFrame(columns=["item_id", "timestamp", "mean", "upper", "lower"])
+        forecast = pd.concat(parts, ignore_index=True)
+        # restore the input's series order (cached series were collected first)
+        order = forecast["item_id"].map({item: i for i, item in enumerate(last.index)}).to_numpy()
+        forecast = forecast.iloc[np.argsort(order, kind="stable")]
+        thresholds = self.generate_dynamic_threshold(forecast, sensitivity_factor)
+        return pd.DataFrame({
+            "item_id": forecast["item_id"].to_numpy(),
+            "timestamp": forecast["timestamp"].to_numpy(),
+            **{name: values.to_numpy() for name, values in thresholds.items()},
+        })
+
+
+    @staticmethod
+    def _to_model_input(history: pd.DataFrame):
+        if TimeSeriesDataFrame is None:
+            raise ImportError("autogluon.timeseries is required for AutoGluonTimeSeriesPredictor")
+        return TimeSeriesDataFrame.from_data_frame(history, id_column="item_id", timestamp_column="timestamp")
+
+
+    @staticmethod
+    def _forecast_frame(forecast: pd.DataFrame) -> pd.DataFrame:
+        """Flatten a model forecast to columns item_id, timestamp, mean, std."""
+        flat = forecast.reset_index()
+        std = forecast_std(forecast)
+        return pd.DataFrame({
+            "item_id": flat["item_id"].to_numpy(),
+            "timestamp": flat["timestamp"].to_numpy(),
+            "mean": flat["mean"].to_numpy(dtype=float),
+            "std": np.asarray(std, dtype=float),
+        })
+
+
     def generate_dynamic_threshold(self, forecast_df, k: float):
         mean = forecast_df["mean"]
-        std = forecast_df["std"]
+        std = forecast_std(forecast_df)
         return {
         "mean": mean,
         "upper": mean + k * std,
@@ -37,6 +133,32 @@ class AutoGluonTimeSeriesPredictor(BasePredictor):
 
     @classmethod
     def load(cls, path: str):
+        if TimeSeriesPredictor is None:
+            raise ImportError("autogluon.timeseries is required to load saved models")
         obj = cls()
         obj.model = TimeSeriesPredictor.load(path)
-        return obj
\ No newline at end of file
+        obj.freq = obj.model.freq
+        obj.version = f"{os.path.abspath(path)}@{os.stat(path).st_mtime_ns}"
+        return obj
+
+
+def forecast_std(forecast_df: pd.DataFrame) -> pd.Series:
+    """Forecast std: the `std` column, else estimated from the widest quantile pair.
+
+    AutoGluon forecasts carry `mean` plus quantile columns ("0.1" ... "0.9");
+    for a normal forecast distribution std = (q_hi - q_lo) / (z_hi - z_lo).
+    """
+    if "std" in forecast_df.columns:
+        return forecast_df["std"]
+    levels = {}
+    for col in forecast_df.columns:
+        try:
+            level = float(col)
+        except (TypeError, ValueError):
+            continue
+        if 0.0 < level < 1.0:
+            levels[level] = col
+    if len(levels) < 2:
+        raise ValueError("forecast has neither a `std` column nor two quantile columns")
+    lo, hi = min(levels), max(levels)
+    return (forecast_df[levels[hi]] - forecast_df[levels[lo]]) / (norm.ppf(hi) - norm.ppf(lo))
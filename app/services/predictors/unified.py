@@ -1,21 +1,47 @@
+import threading
+
 import pandas as pd
 from app.services.feature.curve_extractor import CurveFeatureExtractor
+from app.services.feature.cache import feature_cache
+from app.services.feature.incremental import IncrementalCurveFeatureExtractor
 from app.services.predictors.factory import PredictorFactory
 
 
 class UnifiedPredictor:
 
 
-    def __init__(self, task_type, curve_columns: list[str]):
+    def __init__(self, task_type, curve_columns: list[str], curve_features: dict[str, list[str]] | None = None):
         self.predictor = PredictorFactory.get_predictor(task_type)
-        self.extractor = CurveFeatureExtractor(curve_columns)
+        self.extractor = CurveFeatureExtractor(curve_columns, cache=feature_cache, feature_sets=curve_features)
+        self.incremental = None
+        # predict_appended runs on inference-executor threads
+        self._incremental_lock = threading.Lock()
 
 
     def train(self, raw_df: pd.DataFrame, config):
-        df = self.extractor.transform(raw_df)
+        df = CurveFeatureExtractor(
+            self.extractor.curve_columns, feature_sets=self.extractor.feature_sets
+        ).transform(raw_df)
         return self.predictor.train(df, config)
 
 
     def predict(self, raw_df: pd.DataFrame):
         df = self.extractor.transform(raw_df)
-        return self.predictor.predict(df)
\ No newline at end of file
+        return self.predictor.predict(df)
+
+
+    def predict_appended(self, segment_df: pd.DataFrame, entity_column: str = "id"):
+        """Predict from only the curve samples appended since the last call.
+
+        Rows carry an entity id and the new samples of each curve; running
+        statistics per entity are kept by an `IncrementalCurveFeatureExtractor`
+        (summary statistics only). Call `self.incremental.reset(ids)` when a
+        cycle ends.
+        """
+        with self._incremental_lock:
+            incremental = self.incremental
+            if incremental is None or incremental.entity_column != entity_column:
+                incremental = IncrementalCurveFeatureExtractor(self.extractor.curve_columns, entity_column)
+                self.incremental = incremental
+        df = incremental.update(segment_df)
+        return self.predictor.predict(df)
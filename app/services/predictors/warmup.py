@@ -0,0 +1,154 @@
+"""Startup model preloading and warm-up.
+
+`main.py` runs `warm_up_models` from the FastAPI lifespan so the first
+requests after a deploy or restart don't pay for lazy loading. Every run
+id in `PRELOAD_RUN_IDS` is loaded into the deploy model cache and gets
+one synthetic `predict` call (a single all-zero row built from the
+model's input schema) to initialise lazily created state. `warmup_state`
+backs the `/ready` endpoint, which answers 503 until warm-up finishes.
+
+A model that fails to preload does not keep the replica out of rotation:
+its error is recorded in `warmup_state.errors`, the replica still turns
+ready (status "degraded"), and the model is retried in the background.
+"""
+import functools
+import logging
+import threading
+import time
+from typing import Callable
+
+import pandas as pd
+
+from app.core import config
+from app.core.enums import TaskType
+from app.services.predictors.model_cache import model_cache
+from app.services.registry.model_registry import get_model, list_models
+
+
+class WarmupState:
+    def __init__(self):
+        self.status = "pending"
+        self.models: dict[str, str] = {}
+        # latest error of every model that has not loaded yet
+        self.errors: dict[str, str] = {}
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "degraded")
+
+    def record(self, name: str, result: str) -> None:
+        with self._lock:
+            self.models[name] = result
+            self.errors.pop(name, None)
+            if self.status == "degraded" and not self.errors:
+                self.status = "ready"
+
+    def record_error(self, name: str, error: str) -> None:
+        with self._lock:
+            self.models[name] = f"error: {error}"
+            self.errors[name] = error
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "status": self.status,
+                "models": dict(self.models),
+                "errors": dict(self.errors),
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+warmup_state = WarmupState()
+
+
+def synthetic_frame(predictor) -> pd.DataFrame | None:
+    """Build a one-row frame matching the predictor's input schema, if known."""
+    model = getattr(predictor, "model", None)
+    # AutoGluon TabularPredictor: raw feature types recorded at fit time
+    type_map = getattr(getattr(model, "feature_metadata_in", None), "type_map_raw", None)
+    if type_map:
+        return pd.DataFrame({
+            col: ["" if raw in ("object", "category", "text") else 0.0] for col, raw in type_map.items()
+        })
+    # predictors that record their input columns, or PyTorchAnomalyPredictor
+    columns = getattr(predictor, "input_columns_", None)
+    if columns is None and getattr(predictor, "stats", None):
+        columns = list(predictor.stats)
+    if columns:
+        return pd.DataFrame({col: [0.0] for col in columns})
+    return None
+
+
+def warm_up(predictor) -> str:
+    frame = synthetic_frame(predictor)
+    if frame is None:
+        return "loaded"
+    predictor.predict(frame)
+    return "warm"
+
+
+def _preload_run_ids() -> list[str]:
+    if config.PRELOAD_RUN_IDS == ["*"]:
+        return [m["run_id"] for m in list_models()]
+    return list(config.PRELOAD_RUN_IDS)
+
+
+def _load_registered(run_id: str):
+    # imported lazily: the factory pulls in every predictor backend
+    from app.services.predictors.factory import PredictorFactory
+
+    entry = get_model(run_id)
+    if not entry:
+        raise KeyError(f"run_id {run_id} not found in registry")
+    task_type = TaskType((entry.get("metadata") or {}).get("task_type", TaskType.TABULAR_REGRESSION))
+    predictor_cls = type(PredictorFactory.get_predictor(task_type))
+    return model_cache.get(run_id, entry["artifact_path"], predictor_cls)
+
+
+def _attempt(name: str, loader: Callable[[], object]) -> bool:
+    try:
+        predictor = loader()
+        warmup_state.record(name, "skipped" if predictor is None else warm_up(predictor))
+        return True
+    except Exception as e:
+        logging.exception("Failed to preload %s", name)
+        warmup_state.record_error(name, str(e))
+        return False
+
+
+_stop_retries = threading.Event()
+
+
+def stop_retries() -> None:
+    """Stop background retries of failed preloads (server shutdown)."""
+    _stop_retries.set()
+
+
+def retry_failed(pending: dict[str, Callable[[], object]], delay: float, max_delay: float) -> None:
+    """Retry failed loaders with doubling delays until all load or `stop_retries`."""
+    while pending and not _stop_retries.wait(delay):
+        pending = {name: loader for name, loader in pending.items() if not _attempt(name, loader)}
+        delay = min(delay * 2, max_delay)
+
+
+def warm_up_models(extra: dict[str, Callable[[], object]] | None = None) -> None:
+    """Preload and warm up configured models; `extra` maps names to loaders."""
+    warmup_state.status = "running"
+    warmup_state.started_at = time.time()
+    loaders = {run_id: functools.partial(_load_registered, run_id) for run_id in _preload_run_ids()}
+    loaders.update(extra or {})
+    failed = {name: loader for name, loader in loaders.items() if not _attempt(name, loader)}
+    warmup_state.finished_at = time.time()
+    # one bad model must not take the whole replica out of rotation
+    warmup_state.status = "degraded" if failed else "ready"
+    if failed and config.WARMUP_RETRY_S > 0:
+        threading.Thread(
+            target=retry_failed,
+            args=(failed, config.WARMUP_RETRY_S, config.WARMUP_RETRY_MAX_S),
+            name="warmup-retry",
+            daemon=True,
+        ).start()
@@ -1,49 +1,166 @@
+import copy
 import json
+from contextlib import contextmanager
 from pathlib import Path
 import threading
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, Iterator, List
 import os
 
+try:
+    import fcntl
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from app.services.registry.sqlite_registry import SQLiteRegistry
+
 _lock = threading.Lock()
 REGISTRY_FILE = Path(os.getenv("MODEL_REGISTRY_FILE", "./model_registry.json"))
+# "json" (REGISTRY_FILE) or "sqlite" (REGISTRY_DB, see scripts/migrate_registry.py)
+REGISTRY_BACKEND = os.getenv("MODEL_REGISTRY_BACKEND", "json").lower()
+REGISTRY_DB = Path(os.getenv("MODEL_REGISTRY_DB", "./model_registry.db"))
+
+_sqlite: SQLiteRegistry | None = None
+# ((path, inode, mtime_ns, size), entries) of the last parsed registry file
+_snapshot: tuple | None = None
+
+
+def _db() -> SQLiteRegistry | None:
+    """The SQLite backend, or None when the JSON file is in use."""
+    global _sqlite
+    if REGISTRY_BACKEND != "sqlite":
+        return None
+    if _sqlite is None:
+        with _lock:
+            if _sqlite is None:
+                _sqlite = SQLiteRegistry(REGISTRY_DB)
+    return _sqlite
 
 
 def _load() -> Dict[str, Any]:
-    if not REGISTRY_FILE.exists():
-        return {}
+    """The registry as of the file on disk; shared and read-only, do not mutate.
+
+    Parsed once per file version: the cached snapshot is reused until the
+    file's inode, mtime or size changes (`_save` always swaps in a new
+    inode), so most reads are a stat and a dict lookup without any lock.
+    """
+    global _snapshot
     try:
-        return json.loads(REGISTRY_FILE.read_text())
-    except Exception:
+        with open(REGISTRY_FILE, "rb") as fh:
+            st = os.fstat(fh.fileno())
+            key = (str(REGISTRY_FILE), st.st_ino, st.st_mtime_ns, st.st_size)
+            snapshot = _snapshot
+            if snapshot is not None and snapshot[0] == key:
+                return snapshot[1]
+            try:
+                data = json.loads(fh.read())
+            except Exception:
+                data = {}
+    except FileNotFoundError:
         return {}
+    _snapshot = (key, data)
+    return data
 
 
 def _save(data: Dict[str, Any]):
     tmp = REGISTRY_FILE.with_suffix(".tmp")
-    tmp.write_text(json.dumps(data, indent=2))
+    with open(tmp, "w") as fh:
+        fh.write(json.dumps(data, indent=2))
+        fh.flush()
+        os.fsync(fh.fileno())
     tmp.replace(REGISTRY_FILE)
 
 
+@contextmanager
+def update_registry() -> Iterator[Dict[str, Any]]:
+    """Atomic read-modify-write of the JSON registry.
+
+    Holds an exclusive `flock` on ``<registry>.lock`` so other uvicorn
+    workers and `scripts/repair_registry.py` cannot interleave, yields a
+    private copy of the current entries and saves it on a clean exit.
+    """
+    lock_path = REGISTRY_FILE.with_suffix(".lock")
+    with _lock, open(lock_path, "a") as lock_fh:
+        if fcntl is not None:
+            fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX)
+        try:
+            data = copy.deepcopy(_load())
+            yield data
+            _save(data)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_fh.fileno(), fcntl.LOCK_UN)
+
+
 def register_model(run_id: str, artifact_path: str, metadata: Dict[str, Any] | None = None):
     """Register a model by MLflow run id and artifact path."""
-    with _lock:
-        data = _load()
+    db = _db()
+    if db is not None:
+        db.register(run_id, artifact_path, metadata)
+        return
+    with update_registry() as data:
         data[run_id] = {
             "artifact_path": str(artifact_path),
             "metadata": metadata or {},
+            "created_at": data.get(run_id, {}).get("created_at") or time.time(),
         }
-        _save(data)
+
+
+def replace_artifact_path(run_id: str, old: str | None, new: str) -> bool:
+    """Point a run at `new` if its artifact path is still `old` (compare-and-set).
+
+    Returns False when the run is gone or was re-registered meanwhile.
+    """
+    db = _db()
+    if db is not None:
+        return db.replace_artifact_path(run_id, old, new)
+    with update_registry() as data:
+        if run_id not in data or data[run_id].get("artifact_path") != old:
+            return False
+        data[run_id]["artifact_path"] = new
+        return True
 
 
 def list_models() -> List[Dict[str, Any]]:
-    with _lock:
-        data = _load()
-        return [
-            {"run_id": k, "artifact_path": v.get("artifact_path"), "metadata": v.get("metadata", {})}
-            for k, v in data.items()
-        ]
+    return query_models()
+
+
+def query_models(
+    task_type: str | None = None,
+    label: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
+    """Registered models matching the filters, newest first, paginated."""
+    db = _db()
+    if db is not None:
+        return db.query(task_type, label, limit, offset)
+    entries = _filtered(task_type, label)
+    return entries[offset:None if limit is None else offset + limit]
+
+
+def count_models(task_type: str | None = None, label: str | None = None) -> int:
+    db = _db()
+    if db is not None:
+        return db.count(task_type, label)
+    return len(_filtered(task_type, label))
+
+
+def _filtered(task_type: str | None, label: str | None) -> List[Dict[str, Any]]:
+    data = _load()
+    entries = [
+        {"run_id": k, "artifact_path": v.get("artifact_path"), "metadata": v.get("metadata", {}), "created_at": v.get("created_at")}
+        for k, v in data.items()
+        if (task_type is None or v.get("metadata", {}).get("task_type") == task_type)
+        and (label is None or v.get("metadata", {}).get("label") == label)
+    ]
+    # newest first; entries written before created_at existed go last, in reverse file order
+    order = sorted(range(len(entries)), key=lambda i: (-(entries[i]["created_at"] or 0.0), -i))
+    return [entries[i] for i in order]
 
 
 def get_model(run_id: str) -> Dict[str, Any] | None:
-    with _lock:
-        data = _load()
-        return data.get(run_id)
+    db = _db()
+    if db is not None:
+        return db.get(run_id)
+    return _load().get(run_id)
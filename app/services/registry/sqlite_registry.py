@@ -0,0 +1,140 @@
+"""SQLite backend for the model registry.
+
+One row per run in a WAL-mode database, so readers never block the
+writer and a predict-path `get` is a primary-key lookup instead of a JSON
+parse of the whole registry. `task_type`, `label` and `created_at` are
+copied out of the metadata into indexed columns for filtered, paginated
+listing; the full metadata is kept as JSON.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    run_id        TEXT PRIMARY KEY,
+    artifact_path TEXT NOT NULL,
+    metadata      TEXT NOT NULL,
+    task_type     TEXT,
+    label         TEXT,
+    created_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_models_created_at ON models (created_at);
+CREATE INDEX IF NOT EXISTS idx_models_task_type ON models (task_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_models_label ON models (label, created_at);
+"""
+
+# re-registering a run updates it in place and keeps its created_at
+_UPSERT = """
+INSERT INTO models (run_id, artifact_path, metadata, task_type, label, created_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (run_id) DO UPDATE SET
+    artifact_path = excluded.artifact_path,
+    metadata = excluded.metadata,
+    task_type = excluded.task_type,
+    label = excluded.label
+"""
+
+
+class SQLiteRegistry:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # one connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def register(self, run_id: str, artifact_path: str, metadata: Dict[str, Any] | None = None, created_at: float | None = None):
+        """Insert or update a run; `created_at` of an existing run is kept."""
+        self.register_many([{"run_id": run_id, "artifact_path": artifact_path, "metadata": metadata, "created_at": created_at}])
+
+    def register_many(self, entries: List[Dict[str, Any]]) -> int:
+        """Upsert `{"run_id", "artifact_path", "metadata", "created_at"}` dicts in one transaction."""
+        now = time.time()
+        rows = [
+            _row(e["run_id"], e["artifact_path"], e.get("metadata") or {}, e.get("created_at") or now)
+            for e in entries
+        ]
+        with self._connect() as conn:
+            conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def replace_artifact_path(self, run_id: str, old: str | None, new: str) -> bool:
+        """Point a run at `new` if its artifact path is still `old`."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE models SET artifact_path = ? WHERE run_id = ? AND artifact_path IS ?",
+                (new, run_id, old),
+            )
+        return cur.rowcount > 0
+
+    def get(self, run_id: str) -> Dict[str, Any] | None:
+        row = self._connect().execute(
+            "SELECT artifact_path, metadata, created_at FROM models WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"artifact_path": row["artifact_path"], "metadata": json.loads(row["metadata"]), "created_at": row["created_at"]}
+
+    def query(
+        self,
+        task_type: str | None = None,
+        label: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Registered runs matching the filters, newest first."""
+        where, params = _where(task_type, label)
+        sql = f"SELECT run_id, artifact_path, metadata, created_at FROM models{where} ORDER BY created_at DESC, run_id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return [
+            {
+                "run_id": row["run_id"],
+                "artifact_path": row["artifact_path"],
+                "metadata": json.loads(row["metadata"]),
+                "created_at": row["created_at"],
+            }
+            for row in self._connect().execute(sql, params)
+        ]
+
+    def count(self, task_type: str | None = None, label: str | None = None) -> int:
+        where, params = _where(task_type, label)
+        return self._connect().execute(f"SELECT COUNT(*) FROM models{where}", params).fetchone()[0]
+
+
+def _row(run_id: str, artifact_path: str, metadata: Dict[str, Any], created_at: float) -> tuple:
+    return (
+        run_id,
+        str(artifact_path),
+        json.dumps(metadata),
+        metadata.get("task_type"),
+        metadata.get("label"),
+        created_at,
+    )
+
+
+def _where(task_type: str | None, label: str | None) -> tuple[str, list]:
+    clauses, params = [], []
+    if task_type is not None:
+        clauses.append("task_type = ?")
+        params.append(task_type)
+    if label is not None:
+        clauses.append("label = ?")
+        params.append(label)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
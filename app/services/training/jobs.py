@@ -0,0 +1,286 @@
+"""Background training jobs run in worker processes.
+
+`POST /train` only enqueues a job and returns its id; `GET /train/{id}`
+reports its state and queue position. Up to `TRAINING_WORKERS` jobs run
+at once, each in its own process (spawned, so the API process's threads
+and locks are never inherited) with its own artifact directory under
+`ARTIFACTS_DIR/jobs/<job id>`. Queued jobs start highest priority first,
+FIFO within a priority. At most `TRAINING_QUEUE_DEPTH` jobs may wait;
+beyond that `submit` raises `ExecutorBusy` (HTTP 503).
+
+Cancelling a queued job removes it from the queue; cancelling a running
+job terminates its process. A job submitted with `remove_input=True`
+owns its `raw_df` upload file: the queue deletes the file's directory
+once the job ends, however it ends (finished, failed, cancelled while
+queued or running, or cancelled at shutdown). On POSIX every worker leads its own process
+group, so the signal also reaches the process pools a job starts (sweep
+members, curve extraction) and nothing keeps training after a cancel.
+"""
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import threading
+import time
+import traceback
+import uuid
+
+from app.core import config
+from app.core.executors import ExecutorBusy
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+_mp = multiprocessing.get_context("spawn")
+
+
+class Job:
+    def __init__(self, job_id: str, fn, args: tuple, kwargs: dict, priority: int, artifact_dir: str):
+        self.id = job_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.artifact_dir = artifact_dir
+        self.state = QUEUED
+        self.result = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.process = None
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "priority": self.priority,
+            "result": self.result,
+            "error": self.error,
+            "artifact_dir": self.artifact_dir,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _run_in_worker(conn, fn, args, kwargs):
+    if hasattr(os, "setsid"):
+        # lead a new process group that the job's own pools inherit
+        os.setsid()
+    try:
+        conn.send(("ok", fn(*args, **kwargs)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+    finally:
+        conn.close()
+
+
+class JobQueue:
+    def __init__(self, max_workers: int, max_queue: int, artifacts_dir: str, keep_finished: int = 1000):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.artifacts_dir = artifacts_dir
+        self.keep_finished = keep_finished
+        self._jobs: dict[str, Job] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, priority: int = 0, **kwargs) -> Job:
+        """Queue `fn(*args, **kwargs)`; `fn` must be importable (picklable).
+
+        When `fn` accepts an `artifact_dir` keyword it is passed the job's
+        private artifact directory.
+        """
+        with self._lock:
+            if self._queued() >= self.max_queue + max(self.max_workers - self._running, 0):
+                raise ExecutorBusy("training queue is full")
+            job_id = uuid.uuid4().hex
+            artifact_dir = os.path.abspath(os.path.join(self.artifacts_dir, "jobs", job_id))
+            job = Job(job_id, fn, args, kwargs, priority, artifact_dir)
+            self._jobs[job_id] = job
+            heapq.heappush(self._heap, (-priority, next(self._seq), job_id))
+            self._dispatch()
+            self._prune()
+            return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            out = job.as_dict()
+            out["queue_position"] = self._position(job_id) if job.state == QUEUED else None
+            return out
+
+    def cancel(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state == QUEUED:
+                # its heap entry is skipped when popped
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                _remove_input(job)
+            elif job.state == RUNNING:
+                job.state = CANCELLED
+                _signal_job(job.process, signal.SIGTERM)
+                # the worker may be killed before its own cleanup runs
+                _remove_input(job)
+            return job.as_dict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._queued(),
+                "jobs": len(self._jobs),
+            }
+
+    def shutdown(self) -> None:
+        """Cancel every queued and running job."""
+        with self._lock:
+            job_ids = [j.id for j in self._jobs.values() if j.state not in FINISHED_STATES]
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def _queued(self) -> int:
+        return sum(1 for _, _, job_id in self._heap if self._jobs[job_id].state == QUEUED)
+
+    def _position(self, job_id: str) -> int:
+        live = sorted(entry for entry in self._heap if self._jobs[entry[2]].state == QUEUED)
+        return next(i for i, entry in enumerate(live) if entry[2] == job_id)
+
+    def _dispatch(self) -> None:
+        # caller holds the lock
+        while self._running < self.max_workers and self._heap:
+            _, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs[job_id]
+            if job.state != QUEUED:
+                continue
+            self._start(job)
+
+    def _start(self, job: Job) -> None:
+        os.makedirs(job.artifact_dir, exist_ok=True)
+        kwargs = dict(job.kwargs)
+        # handled by the queue, see `_remove_input`
+        kwargs.pop("remove_input", None)
+        if getattr(job.fn, "accepts_artifact_dir", False):
+            kwargs["artifact_dir"] = job.artifact_dir
+        parent, child = _mp.Pipe(duplex=False)
+        # not a daemon: jobs may start process pools of their own
+        job.process = _mp.Process(target=_run_in_worker, args=(child, job.fn, job.args, kwargs))
+        job.state = RUNNING
+        job.started_at = time.time()
+        self._running += 1
+        try:
+            job.process.start()
+        except BaseException as e:
+            self._finish(job, ("error", f"failed to start worker: {e}"))
+            return
+        finally:
+            child.close()
+        threading.Thread(target=self._watch, args=(job, parent), daemon=True, name=f"job-{job.id[:8]}").start()
+
+    def _watch(self, job: Job, conn) -> None:
+        outcome = None
+        try:
+            # the result is sent just before the worker exits
+            if conn.poll(None):
+                outcome = conn.recv()
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+        job.process.join()
+        if job.state == CANCELLED:
+            # pool processes that outlived the worker's SIGTERM
+            _signal_job(job.process, getattr(signal, "SIGKILL", signal.SIGTERM), group_only=True)
+        with self._lock:
+            if outcome is None:
+                outcome = ("error", f"worker exited with code {job.process.exitcode}")
+            self._finish(job, outcome)
+            self._dispatch()
+
+    def _finish(self, job: Job, outcome: tuple) -> None:
+        # caller holds the lock
+        self._running -= 1
+        job.finished_at = time.time()
+        _remove_input(job)
+        if job.state == CANCELLED:
+            return
+        kind, value = outcome
+        if kind == "ok":
+            job.state, job.result = SUCCEEDED, value
+        else:
+            job.state, job.error = FAILED, value
+            logging.error("Training job %s failed: %s", job.id, value)
+
+    def _prune(self) -> None:
+        # caller holds the lock; forget the oldest finished jobs
+        finished = [j for j in self._jobs.values() if j.state in FINISHED_STATES]
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[: max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job.id]
+
+
+def _remove_input(job: Job) -> None:
+    """Delete the upload directory of a job submitted with `remove_input`."""
+    raw = job.kwargs.get("raw_df")
+    if job.kwargs.get("remove_input") and isinstance(raw, (str, os.PathLike)):
+        shutil.rmtree(os.path.dirname(os.path.abspath(raw)), ignore_errors=True)
+
+
+def _signal_job(process, signum: int, group_only: bool = False) -> None:
+    """Signal a worker's process group, falling back to the worker alone."""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signum)
+            return
+        except (ProcessLookupError, PermissionError):
+            # the worker has not called setsid yet, or its group is gone
+            pass
+    if not group_only:
+        process.terminate()
+
+
+def train_tabular_job(artifact_dir: str | None = None, **kwargs) -> str:
+    """Worker-process entry point: run `TrainingService.train_tabular`.
+
+    Submit with `remove_input=True` to have the queue delete a `raw_df`
+    upload once the job ends.
+    """
+    from app.services.training.training_service import TrainingService
+
+    return TrainingService().train_tabular(artifact_dir=artifact_dir, **kwargs)
+
+
+train_tabular_job.accepts_artifact_dir = True
+
+
+def train_sweep_job(artifact_dir: str | None = None, **kwargs) -> dict:
+    """Worker-process entry point: run `TrainingService.train_sweep`."""
+    from app.services.training.training_service import TrainingService
+
+    return TrainingService().train_sweep(artifact_dir=artifact_dir, **kwargs)
+
+
+train_sweep_job.accepts_artifact_dir = True
+
+
+training_jobs = JobQueue(config.TRAINING_WORKERS, config.TRAINING_QUEUE_DEPTH, config.ARTIFACTS_DIR)
@@ -1,5 +1,10 @@
+import math
+import multiprocessing
 import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+import numpy as np
 import pandas as pd
 import mlflow
 # 已移除: import mlflow.autogluon
@@ -9,7 +14,11 @@ except Exception:  # pragma: no cover - autogluon may not be installed
     TabularPredictor = None
 from app.services.predictors.simple_tabular import SimpleTabularPredictor
 from app.services.feature.curve_extractor import CurveFeatureExtractor
+from app.services.feature.chunks import iter_frame_chunks, read_chunks
+from app.services.feature.store import FeatureStore
 from app.models.task_config import TabularConfig
+from app.core.enums import TaskType
+from app.core import config as settings
 from app.services.registry.model_registry import register_model
 import logging
 
@@ -26,74 +35,361 @@ class TrainingService:
 
     def train_tabular(
         self,
-        raw_df: pd.DataFrame,
+        raw_df: pd.DataFrame | Iterable[pd.DataFrame] | str | os.PathLike,
         label: str,
         curve_columns: list[str],
         config: TabularConfig,
+        chunksize: int | None = None,
+        curve_features: dict[str, list[str]] | None = None,
+        artifact_dir: str | os.PathLike | None = None,
     ) -> str:
+        """Train a tabular model and return its MLflow run id.
+
+        `raw_df` may be an in-memory DataFrame, an iterable of DataFrame
+        chunks, or a CSV/Parquet path. Chunks and files are streamed through
+        the curve extractor. AutoGluon needs the feature frame in full; the
+        fallback `SimpleTabularPredictor` fits straight from the feature
+        chunks, so then no more than one chunk is held at a time.
+        `curve_features` selects extra feature groups per curve column.
+        Model files are written under `artifact_dir` (default: a fresh
+        `ARTIFACTS_DIR/runs/<run name>` directory, so runs never overwrite
+        each other).
+        """
         run_name = f"tabular-train-{uuid.uuid4().hex[:8]}"
+        artifact_dir = os.path.abspath(artifact_dir or os.path.join(settings.ARTIFACTS_DIR, "runs", run_name))
 
-        extractor = CurveFeatureExtractor(curve_columns)
-        train_df = extractor.transform(raw_df)
+        extractor = CurveFeatureExtractor(
+            curve_columns,
+            n_jobs=settings.CURVE_EXTRACT_JOBS,
+            shard_rows=settings.CURVE_EXTRACT_SHARD_ROWS,
+            feature_sets=curve_features,
+        )
+        store = _feature_store(extractor)
+        train_data = self._training_chunks(raw_df, extractor, chunksize, store)
+        if TabularPredictor is not None:
+            train_data = pd.concat(train_data, ignore_index=True)
 
         with mlflow.start_run(run_name=run_name):
             mlflow.log_params({
                 "task_type": config.task_type,
                 "presets": config.presets,
                 "time_limit": config.time_limit,
+                "curve_features": curve_features or {},
+            })
+
+            model_dir, _ = _fit_model(train_data, label, config, artifact_dir)
+            # after the fit: streamed features are only fingerprinted once consumed
+            _log_feature_store(store)
+            run_id = mlflow.active_run().info.run_id
+            _register_run(run_id, _artifact_path(model_dir), {
+                "label": label,
+                "task_type": TaskType(config.task_type).value,
+                "curve_columns": curve_columns,
+                "curve_features": curve_features or {},
+                "feature_fingerprint": store.fingerprint if store is not None else None,
             })
 
-            if TabularPredictor is not None:
-                predictor = TabularPredictor(label=label)
-                predictor.fit(
-                    train_df,
-                    presets=config.presets,
-                    time_limit=config.time_limit,
-                )
-
-                leaderboard = predictor.leaderboard(silent=True)
-                best_row = leaderboard.iloc[0].to_dict()
-
-                for k, v in best_row.items():
-                    if isinstance(v, (int, float)):
-                        mlflow.log_metric(k, float(v))
-                model_dir = os.path.abspath("./artifacts/autogluon")
-                predictor.save(model_dir)
-            else:
-                # Fallback lightweight trainer for MVP when AutoGluon isn't installed
-                from types import SimpleNamespace
-
-                cfg = SimpleNamespace(label=label, presets=getattr(config, "presets", None), time_limit=getattr(config, "time_limit", None))
-                predictor = SimpleTabularPredictor()
-                predictor.train(train_df.assign(**{label: train_df[label]}), cfg)
-                model_dir = os.path.abspath("./artifacts/simple")
-                # Save to a single file path under model_dir
-                os.makedirs(model_dir, exist_ok=True)
-                save_path = os.path.join(model_dir, "simple_model.npz")
-                predictor.save(save_path)
-            mlflow.log_artifacts(
-                local_dir=model_dir,
-                artifact_path="model"
+            return run_id
+
+    def train_sweep(
+        self,
+        raw_df: pd.DataFrame | Iterable[pd.DataFrame] | str | os.PathLike,
+        label: str,
+        curve_columns: list[str],
+        configs: list[TabularConfig],
+        chunksize: int | None = None,
+        curve_features: dict[str, list[str]] | None = None,
+        artifact_dir: str | os.PathLike | None = None,
+        max_workers: int | None = None,
+    ) -> dict:
+        """Train one model per config on shared features; register the best.
+
+        Curve features are extracted once and written to
+        `<artifact_dir>/features.parquet`. The configs then run in parallel
+        worker processes, each pinned to its own slice of the CPUs (passed
+        to AutoGluon as `num_cpus`) and logged as a nested MLflow run under
+        one sweep run. The member with the highest `score_val` is registered.
+        Returns the sweep run id, the best run id and one entry per config.
+        """
+        if not configs:
+            raise ValueError("`configs` must not be empty")
+        run_name = f"tabular-sweep-{uuid.uuid4().hex[:8]}"
+        artifact_dir = os.path.abspath(artifact_dir or os.path.join(settings.ARTIFACTS_DIR, "runs", run_name))
+
+        extractor = CurveFeatureExtractor(
+            curve_columns,
+            n_jobs=settings.CURVE_EXTRACT_JOBS,
+            shard_rows=settings.CURVE_EXTRACT_SHARD_ROWS,
+            feature_sets=curve_features,
+        )
+        store = _feature_store(extractor)
+        train_df = self._build_training_frame(raw_df, extractor, chunksize, store)
+        os.makedirs(artifact_dir, exist_ok=True)
+        features_path = os.path.join(artifact_dir, "features.parquet")
+        train_df.to_parquet(features_path, index=False)
+        del train_df
+
+        slots = _cpu_slots(min(len(configs), max_workers or settings.SWEEP_WORKERS or len(configs)))
+        with mlflow.start_run(run_name=run_name) as sweep_run:
+            mlflow.log_params({
+                "task_type": configs[0].task_type,
+                "sweep_size": len(configs),
+                "sweep_workers": len(slots),
+                "curve_features": curve_features or {},
+            })
+            _log_feature_store(store)
+            members = _run_sweep(
+                slots,
+                features_path,
+                label,
+                configs,
+                artifact_dir,
+                sweep_run.info.run_id,
+                sweep_run.info.experiment_id,
             )
+            scored = [m for m in members if m["error"] is None and not math.isnan(m["score_val"])]
+            if not scored:
+                errors = "; ".join(m["error"] or "no score" for m in members)
+                raise RuntimeError(f"every sweep configuration failed: {errors}")
+            best = max(scored, key=lambda m: m["score_val"])
+            mlflow.log_metric("best_score_val", best["score_val"])
+            mlflow.set_tag("best_run_id", best["run_id"])
+            _register_run(best["run_id"], best["artifact_path"], {
+                "label": label,
+                "task_type": TaskType(configs[0].task_type).value,
+                "curve_columns": curve_columns,
+                "curve_features": curve_features or {},
+                "feature_fingerprint": store.fingerprint if store is not None else None,
+                "sweep_run_id": sweep_run.info.run_id,
+                "presets": best["presets"],
+                "time_limit": best["time_limit"],
+            })
+            return {
+                "sweep_run_id": sweep_run.info.run_id,
+                "best_run_id": best["run_id"],
+                "runs": members,
+            }
 
-            run_id = mlflow.active_run().info.run_id
-            # Prefer to register the MLflow artifact URI (local file path) so
-            # that downloads point to the actual stored artifacts.
-            try:
-                # this returns an artifact URI like file:///abs/path/mlruns/.../artifacts/model
-                artifact_uri = mlflow.get_artifact_uri("model")
-                if artifact_uri.startswith("file://"):
-                    artifact_path = artifact_uri[len("file://"):]
-                else:
-                    artifact_path = os.path.abspath(model_dir)
-            except Exception:
-                artifact_path = os.path.abspath(model_dir)
-
-            # register the saved artifact path in the simple registry
+    @staticmethod
+    def _build_training_frame(
+        raw,
+        extractor: CurveFeatureExtractor,
+        chunksize: int | None,
+        store: FeatureStore | None = None,
+    ) -> pd.DataFrame:
+        return pd.concat(TrainingService._training_chunks(raw, extractor, chunksize, store), ignore_index=True)
+
+    @staticmethod
+    def _training_chunks(
+        raw,
+        extractor: CurveFeatureExtractor,
+        chunksize: int | None,
+        store: FeatureStore | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Feature chunks of `raw`, extracted lazily as they are consumed."""
+        transform_stream = store.transform_stream if store is not None else extractor.transform_stream
+        if isinstance(raw, (str, os.PathLike)):
+            return transform_stream(read_chunks(raw, chunksize or 100_000, extractor.curve_columns))
+        if isinstance(raw, pd.DataFrame):
+            if chunksize is None and store is None:
+                return iter([extractor.transform(raw)])
+            return transform_stream(iter_frame_chunks(raw, chunksize) if chunksize else [raw])
+        return transform_stream(raw)
+
+
+def _fit_model(train_df: pd.DataFrame | Iterable[pd.DataFrame], label: str, config: TabularConfig, artifact_dir: str, num_cpus: int | None = None):
+    """Fit, log metrics and artifacts to the active run; return (model_dir, score_val).
+
+    `train_df` may also be an iterable of feature chunks when AutoGluon is
+    not installed; the fallback trainer consumes it in one pass.
+    """
+    if TabularPredictor is not None:
+        predictor = TabularPredictor(label=label)
+        predictor.fit(
+            train_df,
+            presets=config.presets,
+            time_limit=config.time_limit,
+            **({"num_cpus": num_cpus} if num_cpus else {}),
+        )
+
+        leaderboard = predictor.leaderboard(silent=True)
+        best_row = leaderboard.iloc[0].to_dict()
+
+        for k, v in best_row.items():
+            if isinstance(v, (int, float)):
+                mlflow.log_metric(k, float(v))
+        score = float(best_row.get("score_val", math.nan))
+        model_dir = os.path.join(artifact_dir, "autogluon")
+        predictor.save(model_dir)
+    else:
+        # Fallback lightweight trainer for MVP when AutoGluon isn't installed
+        from types import SimpleNamespace
+
+        cfg = SimpleNamespace(label=label, presets=getattr(config, "presets", None), time_limit=getattr(config, "time_limit", None))
+        predictor = SimpleTabularPredictor(
+            ridge=settings.SIMPLE_RIDGE,
+            sparse=settings.SIMPLE_SPARSE,
+            hash_buckets=settings.SIMPLE_HASH_BUCKETS,
+        )
+        chunks = [train_df] if isinstance(train_df, pd.DataFrame) else train_df
+        yy = [0.0]
+
+        def fit_chunks():
+            for chunk in chunks:
+                for part in iter_frame_chunks(chunk, settings.SIMPLE_FIT_CHUNK_ROWS):
+                    y = part[label].to_numpy(dtype=float)
+                    yy[0] += float(y @ y)
+                    yield part
+
+        # chunked normal equations in a single pass: no dense design matrix
+        # over all rows, and streamed feature chunks are never concatenated
+        predictor.train_chunks(fit_chunks(), cfg)
+        # in-sample -RMSE from the fit statistics (higher is better like
+        # AutoGluon's score_val): SSE = y'y - 2 b'X'y + b'X'X b
+        coef = predictor.coef_
+        sse = max(yy[0] - 2 * float(coef @ predictor.xty_) + float(coef @ (predictor.xtx_ @ coef)), 0.0)
+        score = -float(np.sqrt(sse / max(predictor.n_rows_, 1)))
+        mlflow.log_metric("score_val", score)
+        model_dir = os.path.join(artifact_dir, "simple")
+        # Save to a single file path under model_dir
+        os.makedirs(model_dir, exist_ok=True)
+        save_path = os.path.join(model_dir, "simple_model.npz")
+        predictor.save(save_path)
+    mlflow.log_artifacts(
+        local_dir=model_dir,
+        artifact_path="model"
+    )
+    return model_dir, score
+
+
+def _feature_store(extractor: CurveFeatureExtractor) -> FeatureStore | None:
+    if not settings.FEATURE_STORE_DIR or extractor.engine != "ragged":
+        return None
+    return FeatureStore(
+        settings.FEATURE_STORE_DIR,
+        extractor,
+        max_parts=settings.FEATURE_STORE_MAX_PARTS,
+        keep_datasets=settings.FEATURE_STORE_KEEP_DATASETS,
+    )
+
+
+def _log_feature_store(store: FeatureStore | None) -> None:
+    """Record which stored feature set the active run trained on."""
+    if store is None:
+        return
+    mlflow.log_params({
+        "feature_store_version": store.version,
+        "feature_fingerprint": store.fingerprint,
+    })
+    mlflow.log_metrics({
+        "feature_store_hits": store.hits,
+        "feature_store_misses": store.misses,
+    })
+
+
+def _artifact_path(model_dir: str) -> str:
+    # Prefer to register the MLflow artifact URI (local file path) so
+    # that downloads point to the actual stored artifacts.
+    try:
+        # this returns an artifact URI like file:///abs/path/mlruns/.../artifacts/model
+        artifact_uri = mlflow.get_artifact_uri("model")
+        if artifact_uri.startswith("file://"):
+            return artifact_uri[len("file://"):]
+    except Exception:
+        pass
+    return os.path.abspath(model_dir)
+
+
+def _register_run(run_id: str, artifact_path: str, metadata: dict) -> None:
+    # register the saved artifact path in the simple registry
+    try:
+        register_model(run_id, artifact_path, metadata=metadata)
+    except Exception:
+        # registry failures shouldn't break training result delivery
+        logging.exception("Failed to register model %s in registry", run_id)
+
+
+def _cpu_slots(n: int) -> list[list[int]]:
+    """Split the CPUs this process may use into `n` contiguous slices."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:  # pragma: no cover - macOS / Windows
+        cpus = list(range(os.cpu_count() or 1))
+    n = max(1, min(n, len(cpus)))
+    return [cpus[len(cpus) * i // n:len(cpus) * (i + 1) // n] for i in range(n)]
+
+
+# CPUs of the current sweep worker (set by `_pin_sweep_worker`)
+_worker_cpus: int | None = None
+
+
+def _pin_sweep_worker(slots) -> None:
+    """Pool initializer: claim one CPU slot and pin this worker to it."""
+    global _worker_cpus
+    cpus = slots.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    _worker_cpus = len(cpus)
+
+
+def _run_sweep(slots, features_path, label, configs, artifact_dir, parent_run_id, experiment_id) -> list[dict]:
+    ctx = multiprocessing.get_context("spawn")
+    free = ctx.Queue()
+    for slot in slots:
+        free.put(slot)
+    tracking_uri = mlflow.get_tracking_uri()
+    with ProcessPoolExecutor(len(slots), mp_context=ctx, initializer=_pin_sweep_worker, initargs=(free,)) as pool:
+        futures = [
+            pool.submit(
+                _train_sweep_member,
+                features_path,
+                label,
+                config,
+                os.path.join(artifact_dir, f"member-{i}"),
+                parent_run_id,
+                experiment_id,
+                tracking_uri,
+            )
+            for i, config in enumerate(configs)
+        ]
+        members = []
+        for config, future in zip(configs, futures):
             try:
-                register_model(run_id, artifact_path, metadata={"label": label})
-            except Exception:
-                # registry failures shouldn't break training result delivery
-                logging.exception("Failed to register model %s in registry", run_id)
+                members.append(future.result())
+            except Exception as e:
+                logging.exception("Sweep member %s failed", config)
+                members.append({
+                    "run_id": None,
+                    "presets": config.presets,
+                    "time_limit": config.time_limit,
+                    "score_val": math.nan,
+                    "artifact_path": None,
+                    "error": f"{type(e).__name__}: {e}",
+                })
+    return members
+
 
-            return run_id
\ No newline at end of file
+def _train_sweep_member(features_path, label, config, artifact_dir, parent_run_id, experiment_id, tracking_uri) -> dict:
+    """Sweep worker: fit one config as a nested run of the sweep run."""
+    mlflow.set_tracking_uri(tracking_uri)
+    train_df = pd.read_parquet(features_path)
+    with mlflow.start_run(
+        run_name=f"tabular-sweep-member-{uuid.uuid4().hex[:8]}",
+        experiment_id=experiment_id,
+        tags={"mlflow.parentRunId": parent_run_id},
+    ) as run:
+        mlflow.log_params({
+            "task_type": config.task_type,
+            "presets": config.presets,
+            "time_limit": config.time_limit,
+            "num_cpus": _worker_cpus,
+        })
+        model_dir, score = _fit_model(train_df, label, config, artifact_dir, num_cpus=_worker_cpus)
+        return {
+            "run_id": run.info.run_id,
+            "presets": config.presets,
+            "time_limit": config.time_limit,
+            "score_val": score,
+            "artifact_path": _artifact_path(model_dir),
+            "error": None,
+        }
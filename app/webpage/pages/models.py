@@ -10,20 +10,38 @@ def render():
     TOKEN = st.secrets.get("AUTH_TOKEN", "")
     headers = {"X-API-TOKEN": TOKEN} if TOKEN else {}
 
+    # page through /models (it returns at most `limit` entries per call)
+    col_size, col_page = st.columns(2)
+    with col_size:
+        limit = int(st.number_input("Models per page", min_value=1, max_value=1000, value=100, step=10))
+    with col_page:
+        page = int(st.number_input("Page", min_value=1, value=1, step=1))
+    offset = (page - 1) * limit
+
     if st.button("Refresh models list"):
+        st.session_state["models_loaded"] = True
+    # keep showing the list when only the page controls change
+    if st.session_state.get("models_loaded"):
         try:
-            r = requests.get(f"{API_BASE}/models", headers=headers, timeout=10)
+            r = requests.get(f"{API_BASE}/models", headers=headers, params={"limit": limit, "offset": offset}, timeout=10)
             data = r.json()
         except Exception as e:
             st.error(f"Failed to fetch models: {e}")
             return
 
         models = data.get("models", []) if isinstance(data, dict) else []
+        total = data.get("total", len(models)) if isinstance(data, dict) else len(models)
         if not models:
-            st.info("No models found in registry")
+            if total:
+                st.info(f"Page {page} is past the end: {total} model(s), {-(-total // limit)} page(s)")
+            else:
+                st.info("No models found in registry")
             return
 
-        st.write(f"Found {len(models)} model(s)")
+        st.write(
+            f"Showing {offset + 1}-{offset + len(models)} of {total} model(s)"
+            f" (page {page} of {-(-total // limit)})"
+        )
         import io
 
         for entry in models:
@@ -1,11 +1,39 @@
-from fastapi import FastAPI, Depends
-from fastapi.responses import HTMLResponse # 引入 HTMLResponse
-from app.core.auth import api_token_auth
-from app.routers import train, models, visualization, llm, deploy, knowledge
 from dotenv import load_dotenv
+# load .env before importing app modules: app.core.config reads env at import
 load_dotenv()
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import HTMLResponse, JSONResponse # 引入 HTMLResponse
+from app.core.auth import api_token_auth
+from app.core.executors import ExecutorBusy
+from app.routers import train, models, visualization, llm, deploy, knowledge, predict, kserve
+from app.services.predictors.streaming import streams
+from app.services.training.jobs import training_jobs
+from app.services.predictors.warmup import stop_retries, warm_up_models, warmup_state
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # preload + warm up in the background: the server answers liveness
+    # checks right away while /ready stays 503 until warm-up has finished
+    task = asyncio.create_task(asyncio.to_thread(warm_up_models, {"predict": predict.load_model}))
+    yield
+    if not task.done():
+        task.cancel()
+    stop_retries()
+    # worker processes must not outlive the server
+    training_jobs.shutdown()
+    # keep streaming detector state across restarts
+    try:
+        streams.checkpoint_all()
+    except Exception:
+        logging.exception("Failed to checkpoint streaming detectors")
+
 
-app = FastAPI(title="Industrial AI Platform")
+app = FastAPI(title="Industrial AI Platform", lifespan=lifespan)
 @app.get("/", include_in_schema=False) # include_in_schema=False 表示不将此路径包含在文档中
 async def root():
     # 可以返回一个简单的 HTML 欢迎页面
@@ -23,12 +51,31 @@ async def root():
         </html>
         """
     )
+
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    # readiness probe: 503 until startup model warm-up is done; models that
+    # failed to preload are listed under "errors" and retried in the background
+    state = warmup_state.as_dict()
+    return JSONResponse(status_code=200 if warmup_state.ready else 503, content=state)
+
+
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request: Request, exc: ExecutorBusy):
+    # bounded executor queue is full: ask the client to retry later
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 app.include_router(train.router, dependencies=[Depends(api_token_auth)])
 app.include_router(models.router, dependencies=[Depends(api_token_auth)])
 app.include_router(visualization.router, dependencies=[Depends(api_token_auth)])
 app.include_router(llm.router, dependencies=[Depends(api_token_auth)])
 app.include_router(deploy.router, dependencies=[Depends(api_token_auth)])
 app.include_router(knowledge.router, dependencies=[Depends(api_token_auth)])
+app.include_router(predict.router, dependencies=[Depends(api_token_auth)])
+app.include_router(kserve.router, dependencies=[Depends(api_token_auth)])
+app.include_router(kserve.health_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,108 @@
+"""Benchmark per-request predict vs. micro-batched predict.
+
+Usage:
+    python scripts/bench_micro_batching.py --clients 32 --seconds 5
+
+Simulates many sensors that each send single-row requests in a loop. A
+`SimpleTabularPredictor` trained on synthetic data is used, plus an
+optional fixed per-call overhead (`--overhead-ms`) that stands in for
+AutoGluon's per-`predict` cost. The overhead is a pure-Python busy loop,
+so like AutoGluon's pandas/Python glue it holds the GIL and calls from
+concurrent clients are serialized (a `time.sleep` would overlap across
+threads and hide the cost batching amortizes). For each mode the script reports
+throughput and latency percentiles; batching settings are swept so the
+throughput gain can be read off at a p99 no worse than the direct path.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from app.services.predictors.batching import MicroBatcher  # noqa: E402
+from app.services.predictors.simple_tabular import SimpleTabularPredictor  # noqa: E402
+
+
+def _make_model(overhead_ms: float):
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame({
+        "temperature": rng.normal(30, 2, n),
+        "pressure": rng.normal(100, 5, n),
+        "line": rng.choice(["a", "b", "c"], n),
+    })
+    df["label"] = 0.5 * df["temperature"] + 0.1 * df["pressure"] + rng.normal(size=n)
+    model = SimpleTabularPredictor()
+    model.train(df, SimpleNamespace(label="label"))
+
+    def predict(frame):
+        if overhead_ms:
+            # GIL-bound per-call cost: concurrent calls cannot overlap it
+            end = time.perf_counter() + overhead_ms / 1000.0
+            while time.perf_counter() < end:
+                pass
+        return model.predict(frame)
+
+    return predict, df.drop(columns=["label"])
+
+
+def _run(call, rows: pd.DataFrame, clients: int, seconds: float):
+    latencies: list[list[float]] = [[] for _ in range(clients)]
+    stop_at = time.perf_counter() + seconds
+
+    def client(i):
+        row = rows.iloc[[i % len(rows)]]
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            call(row)
+            latencies[i].append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lat = np.concatenate([np.asarray(x) for x in latencies]) * 1000.0
+    return len(lat) / seconds, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--overhead-ms", type=float, default=2.0, help="simulated fixed cost per predict call")
+    parser.add_argument("--max-rows", type=int, default=256)
+    parser.add_argument("--waits", default="0.5,1,2,5", help="comma-separated max_wait_ms values to try")
+    args = parser.parse_args()
+
+    predict, rows = _make_model(args.overhead_ms)
+    print(f"{'mode':<28}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+    base_tput, base_p50, base_p99 = _run(predict, rows, args.clients, args.seconds)
+    print(f"{'direct':<28}{base_tput:>10.0f}{base_p50:>10.2f}{base_p99:>10.2f}")
+
+    best = None
+    for wait in (float(w) for w in args.waits.split(",")):
+        batcher = MicroBatcher(predict, max_batch_rows=args.max_rows, max_wait_ms=wait)
+        tput, p50, p99 = _run(batcher.predict, rows, args.clients, args.seconds)
+        batcher.close()
+        label = f"batched wait={wait}ms"
+        print(f"{label:<28}{tput:>10.0f}{p50:>10.2f}{p99:>10.2f}  (mean batch {batcher.stats()['mean_batch_rows']:.1f} rows)")
+        if p99 <= base_p99 and (best is None or tput > best[0]):
+            best = (tput, wait)
+
+    if best is None:
+        print("no batching setting met the direct-path p99")
+    else:
+        print(f"throughput gain at p99 <= {base_p99:.2f} ms: {best[0] / base_tput:.1f}x (max_wait_ms={best[1]})")
+
+
+if __name__ == "__main__":
+    main()
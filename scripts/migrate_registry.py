@@ -0,0 +1,49 @@
+"""One-shot migration of model_registry.json into the SQLite registry.
+
+Entries written before `created_at` was recorded get increasing timestamps
+in file order, so "newest first" listing matches the old append order.
+Safe to re-run: runs already in the database are updated in place.
+
+    python scripts/migrate_registry.py [--json model_registry.json] [--db model_registry.db]
+
+Then start the API with MODEL_REGISTRY_BACKEND=sqlite.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from app.services.registry.sqlite_registry import SQLiteRegistry  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", default=os.getenv("MODEL_REGISTRY_FILE", "./model_registry.json"))
+    parser.add_argument("--db", default=os.getenv("MODEL_REGISTRY_DB", "./model_registry.db"))
+    args = parser.parse_args()
+
+    source = Path(args.json)
+    if not source.exists():
+        print('registry not found:', source)
+        return
+    data = json.loads(source.read_text())
+    base = time.time() - len(data)
+    entries = [
+        {
+            "run_id": run_id,
+            "artifact_path": entry.get("artifact_path", ""),
+            "metadata": entry.get("metadata") or {},
+            "created_at": entry.get("created_at") or base + i,
+        }
+        for i, (run_id, entry) in enumerate(data.items())
+    ]
+    n = SQLiteRegistry(args.db).register_many(entries)
+    print(f'migrated {n} entries from {source} to {args.db}')
+
+
+if __name__ == '__main__':
+    main()
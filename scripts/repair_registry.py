@@ -1,24 +1,19 @@
 """Repair registry entries by pointing artifact_path to mlruns artifacts if possible.
 
 Run this after training runs to fix artifact paths that point to missing locations.
+Works with either registry backend (MODEL_REGISTRY_BACKEND=json or sqlite).
+Each update is a compare-and-set through the backend (the JSON file lock or
+a conditional SQL UPDATE), so it is safe to run next to live API workers.
 """
-import json
 from pathlib import Path
 import os
+import sys
 
-REGISTRY = Path(os.getenv("MODEL_REGISTRY_FILE", "./model_registry.json"))
-MLRUNS = Path(os.getenv("MLFLOW_RUNS_DIR", "./mlruns"))
-
+sys.path.insert(0, str(Path(__file__).parents[1]))
 
-def load():
-    if not REGISTRY.exists():
-        print('registry not found')
-        return {}
-    return json.loads(REGISTRY.read_text())
+from app.services.registry import model_registry  # noqa: E402
 
-
-def save(data):
-    REGISTRY.write_text(json.dumps(data, indent=2))
+MLRUNS = Path(os.getenv("MLFLOW_RUNS_DIR", "./mlruns"))
 
 
 def find_mlruns_path_for(run_id: str):
@@ -33,26 +28,28 @@ def find_mlruns_path_for(run_id: str):
 
 
 def main():
-    data = load()
-    changed = False
-    for run_id, entry in list(data.items()):
-        path = entry.get('artifact_path')
+    # search mlruns without holding any lock, then apply each fix as a
+    # compare-and-set so entries re-registered meanwhile are left alone
+    repairs = {}
+    for entry in model_registry.list_models():
+        run_id, path = entry['run_id'], entry.get('artifact_path')
         if path and Path(path).exists():
             continue
         print('trying to repair', run_id)
         newp = find_mlruns_path_for(run_id)
         if newp:
-            data[run_id]['artifact_path'] = newp
-            print('updated', run_id, '->', newp)
-            changed = True
+            repairs[run_id] = (path, newp)
         else:
             print('no mlruns artifact found for', run_id)
-    if changed:
-        save(data)
-        print('registry updated')
-    else:
+    if not repairs:
         print('no changes')
-
+        return
+    for run_id, (old, newp) in repairs.items():
+        if model_registry.replace_artifact_path(run_id, old, newp):
+            print('updated', run_id, '->', newp)
+        else:
+            print('skipped', run_id, '(changed meanwhile)')
+    print('registry updated')
 
 if __name__ == '__main__':
     main()
@@ -3,12 +3,14 @@
 Usage:
     python scripts/run_sample_training.py
 
-Reads `data/sample_train.csv`, converts `signal` JSON strings to lists,
-and posts to `http://localhost:8000/train` using `AUTH_TOKEN` from env if set.
+Uploads `data/sample_train.csv` (or `--file`, CSV or Parquet) to
+`http://localhost:8000/train/upload` using `AUTH_TOKEN` from env if set.
+The file is sent as-is; the server parses the `signal` curve column.
+Training runs as a background job; the script polls `GET /train/{job_id}`
+until it finishes (pass `--no-wait` to return right after queueing).
 """
 import os
-import json
-import pandas as pd
+import time
 import requests
 from pathlib import Path
 
@@ -20,6 +22,9 @@ def main():
     parser.add_argument("--api", help="API base URL", default=os.getenv("API_BASE", "http://localhost:8000"))
     parser.add_argument("--presets", help="AutoGluon presets", default="medium_quality")
     parser.add_argument("--time_limit", type=int, help="Time limit in seconds", default=60)
+    parser.add_argument("--file", help="CSV or Parquet training file", default=None)
+    parser.add_argument("--priority", type=int, help="Job priority (higher runs first)", default=0)
+    parser.add_argument("--no-wait", action="store_true", help="Do not wait for the training job to finish")
     args = parser.parse_args()
 
     api_base = args.api
@@ -29,44 +34,44 @@ def main():
         raise SystemExit(2)
     headers = {"X-API-TOKEN": token}
 
-    sample_path = Path(__file__).parents[1] / "data" / "sample_train.csv"
+    sample_path = Path(args.file) if args.file else Path(__file__).parents[1] / "data" / "sample_train.csv"
     if not sample_path.exists():
-        print("sample_train.csv not found at", sample_path)
+        print("training file not found at", sample_path)
         raise SystemExit(1)
 
-    df = pd.read_csv(sample_path)
-    # try to parse signal column
-    if "signal" in df.columns:
-        def _to_list(x):
-            if isinstance(x, str):
-                try:
-                    return json.loads(x)
-                except Exception:
-                    return []
-            return x
-        df["signal"] = df["signal"].apply(_to_list)
-
-    payload = {
-        "data": df.to_dict(orient="records"),
-        "metadata": {"curve_columns": ["signal"], "label_column": "label"},
-    }
-
-    params = {
-        "task_type": "tabular_regression",
+    form = {
+        "label_column": "label",
+        "curve_columns": "signal",
         "presets": args.presets,
-        "time_limit": args.time_limit,
+        "time_limit": str(args.time_limit),
     }
 
     url = f"{api_base}/train"
-    print("Posting to", url)
-    # The FastAPI endpoint expects both `payload` and `config` as body params
-    body = {"payload": payload, "config": params}
-    r = requests.post(url, json=body, headers=headers, timeout=600)
+    print("Uploading", sample_path, "to", f"{url}/upload")
+    with open(sample_path, "rb") as fh:
+        r = requests.post(
+            f"{url}/upload",
+            files={"file": (sample_path.name, fh)},
+            data=form,
+            headers=headers,
+            params={"priority": args.priority},
+            timeout=600,
+        )
     try:
         print("Response:", r.status_code)
-        print(r.json())
+        job = r.json()
+        print(job)
     except Exception:
         print(r.text)
+        return
+
+    if args.no_wait or "job_id" not in job:
+        return
+    while job.get("state") in ("queued", "running"):
+        time.sleep(2)
+        job = requests.get(f"{url}/{job['job_id']}", headers=headers, timeout=30).json()
+        print("Job state:", job.get("state"), "queue position:", job.get("queue_position"))
+    print(job)
 
 
 if __name__ == "__main__":
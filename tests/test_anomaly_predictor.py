@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from app.services.predictors.anomaly import PyTorchAnomalyPredictor
+
+
+def _legacy_predict(model, data):
+    numeric = data.select_dtypes(include=[np.number])
+    anomalies = []
+    for _, row in numeric.iterrows():
+        anomalies.append(any(abs(row.get(col, 0.0) - m) > model.k * s for col, (m, s) in model.stats.items()))
+    return pd.Series(anomalies, index=data.index, name="is_anomaly")
+
+
+def _frame(n, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "temperature": rng.normal(30, 2, n),
+        "pressure": rng.normal(100, 5, n),
+        "count": rng.integers(0, 10, n),
+        "line": rng.choice(["a", "b"], n),
+    })
+    df.loc[df.index[::7], "pressure"] = np.nan
+    return df
+
+
+def test_score_matches_row_loop():
+    model = PyTorchAnomalyPredictor(k=2.0)
+    model.train(_frame(500, 0))
+    data = _frame(2000, 1)
+    data["temperature"] *= 1.1
+
+    scores = model.score(data)
+    pd.testing.assert_series_equal(model.predict(data), _legacy_predict(model, data))
+    assert scores["is_anomaly"].any() and not scores["is_anomaly"].all()
+
+    flagged = scores[scores["is_anomaly"]]
+    assert (flagged["max_zscore"] > model.k).all()
+    for idx, row in flagged.head(20).iterrows():
+        col = row["trigger_column"]
+        assert model.stats[col] and list(model.stats).index(col) == row["trigger_index"]
+        m, s = model.stats[col]
+        assert abs(data.loc[idx, col] - m) > model.k * s
+    normal = scores[~scores["is_anomaly"]]
+    assert (normal["trigger_index"] == -1).all() and normal["trigger_column"].isna().all()
+
+    # missing columns count as 0.0, like the row loop
+    partial = data.drop(columns=["count"])
+    pd.testing.assert_series_equal(model.predict(partial), _legacy_predict(model, partial))
+
+
+def test_chunked_scoring(tmp_path):
+    model = PyTorchAnomalyPredictor()
+    model.train(_frame(500, 0))
+    data = _frame(1000, 2)
+    expected = model.score(data)
+
+    pd.testing.assert_frame_equal(model.score_frame(data, chunksize=128), expected)
+
+    path = tmp_path / "scores.csv"
+    data.to_csv(path, index=False)
+    streamed = pd.concat(list(model.score_file(path, chunksize=300)), ignore_index=True)
+    pd.testing.assert_series_equal(streamed["is_anomaly"], expected["is_anomaly"].reset_index(drop=True))
+
+
+def test_streaming_detector_filter_matches_sample_loop(tmp_path):
+    from app.services.predictors.anomaly import StreamingAnomalyDetector
+
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(500, 3)) + np.linspace(0, 5, 500)[:, None]
+    X[250, 1] += 40.0
+
+    batched = StreamingAnomalyDetector(["a", "b", "c"], alpha=0.05, min_samples=20)
+    out = batched.update_array(X[:100])
+    rest = batched.update_array(X[100:])
+    looped = StreamingAnomalyDetector(["a", "b", "c"], alpha=0.05, min_samples=20)
+    dev, std, ready = looped._update_loop(X)
+
+    np.testing.assert_allclose(batched.means, looped.means)
+    np.testing.assert_allclose(batched.vars, looped.vars)
+    is_anomaly = np.concatenate([out["is_anomaly"], rest["is_anomaly"]])
+    np.testing.assert_array_equal(is_anomaly, ((dev > batched.k * std) & ready).any(axis=1))
+    assert not is_anomaly[:20].any()
+    assert is_anomaly[250] and rest["trigger_index"][150] == 1
+
+    # missing features neither score nor update
+    before = batched.means.copy()
+    scores = batched.update(pd.DataFrame({"a": [np.nan], "c": [before[2]]}))
+    np.testing.assert_array_equal(batched.means[:2], before[:2])
+    assert not scores["is_anomaly"].iloc[0]
+
+    path = tmp_path / "stream.npz"
+    batched.save(str(path))
+    restored = StreamingAnomalyDetector.load(str(path))
+    np.testing.assert_allclose(restored.vars, batched.vars)
+    assert restored.counts.tolist() == batched.counts.tolist()
+    # the checkpoint is also a valid batch model file
+    frozen = PyTorchAnomalyPredictor.load(str(path))
+    assert list(frozen.stats) == ["a", "b", "c"]
@@ -0,0 +1,80 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.deploy.columnar import ARROW_STREAM, NPZ, decode_columnar
+from app.services.feature.curve_extractor import CurveFeatureExtractor
+
+
+def _reference():
+    return pd.DataFrame({
+        "temperature": [30.0, 31.5, 29.0],
+        "signal": [[0.1, 0.2, 0.15], [0.3, 0.1], [0.5, 0.4, 0.2, 0.9]],
+    })
+
+
+def test_arrow_stream_curves_are_zero_copy_buffers():
+    df = _reference()
+    table = pa.table({
+        "temperature": pa.array(df["temperature"]),
+        "signal": pa.array(df["signal"].tolist(), type=pa.list_(pa.float32())),
+    })
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    frame, packed, _ = decode_columnar(sink.getvalue(), ARROW_STREAM)
+    values, offsets = packed["signal"]
+    assert values.dtype == np.float32
+    assert offsets.tolist() == [0, 3, 5, 9]
+    assert list(frame.columns) == ["temperature"]
+
+    extractor = CurveFeatureExtractor(["signal"], dtype=np.float32)
+    result = extractor.transform(frame, packed=packed)
+    expected = extractor.transform(df)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_npz_ragged_and_fixed_width_curves():
+    df = _reference()
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        temperature=df["temperature"].to_numpy(),
+        **{"signal.values": np.concatenate(df["signal"].map(np.asarray).tolist()), "signal.offsets": np.array([0, 3, 5, 9])},
+        pressure=np.arange(6, dtype=np.float64).reshape(3, 2),
+    )
+
+    frame, packed, _ = decode_columnar(buf.getvalue(), NPZ)
+    assert not packed["signal"][0].flags.owndata  # mapped onto the request body
+    assert packed["pressure"][1].tolist() == [0, 2, 4, 6]
+
+    result = CurveFeatureExtractor(["signal", "pressure"]).transform(frame, packed=packed)
+    expected = CurveFeatureExtractor(["signal"]).transform(df)
+    pd.testing.assert_frame_equal(result[expected.columns], expected)
+    assert result["pressure_max"].tolist() == [1.0, 3.0, 5.0]
+
+
+def test_npz_rejects_values_without_offsets():
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **{"signal.values": np.ones(3)})
+    with pytest.raises(ValueError):
+        decode_columnar(buf.getvalue(), NPZ)
+
+
+def test_npz_rejects_scalar_and_curve_length_mismatch():
+    buf = io.BytesIO()
+    np.savez(buf, temperature=np.ones(2), **{"signal.values": np.ones(4), "signal.offsets": np.array([0, 1, 3, 4])})
+    with pytest.raises(ValueError, match="mismatched row counts"):
+        decode_columnar(buf.getvalue(), NPZ)
+
+
+@pytest.mark.parametrize("offsets", [[0, 5, 3], [0, 2, 50], [1, 2, 4], [0.0, 2.0, 4.0], [[0, 2, 4]]])
+def test_npz_rejects_invalid_offsets(offsets):
+    buf = io.BytesIO()
+    np.savez(buf, **{"signal.values": np.ones(4), "signal.offsets": np.array(offsets)})
+    with pytest.raises(ValueError, match="offsets"):
+        decode_columnar(buf.getvalue(), NPZ)
@@ -0,0 +1,240 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.cache import LRUCache
+from app.services.feature.chunks import parse_curve_column
+from app.services.feature.curve_extractor import CurveFeatureExtractor
+from app.services.feature.incremental import IncrementalCurveFeatureExtractor
+
+
+def _curve_frame(n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    curves = [
+        list(rng.normal(loc=rng.uniform(-50, 50), scale=rng.uniform(0.1, 5), size=rng.integers(2, 300)))
+        for _ in range(n_rows)
+    ]
+    # constant curve: skew/kurt are NaN in scipy
+    curves[3] = [1.5] * 10
+    other = [list(rng.exponential(size=rng.integers(3, 50))) for _ in range(n_rows)]
+    return pd.DataFrame({
+        "temperature": rng.normal(size=n_rows),
+        "signal": curves,
+        "pressure_curve": other,
+        "label": rng.normal(size=n_rows),
+    })
+
+
+def test_ragged_engine_matches_scipy_engine():
+    df = _curve_frame()
+    cols = ["signal", "pressure_curve"]
+    expected = CurveFeatureExtractor(cols, engine="scipy").transform(df)
+    result = CurveFeatureExtractor(cols).transform(df)
+
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9, atol=1e-12)
+    # input frame must be left untouched
+    assert "signal" in df.columns
+
+
+def test_ragged_engine_float32_mode():
+    df = _curve_frame(seed=1)
+    cols = ["signal", "pressure_curve"]
+    expected = CurveFeatureExtractor(cols, engine="scipy").transform(df)
+    result = CurveFeatureExtractor(cols, dtype=np.float32).transform(df)
+
+    assert list(result.columns) == list(expected.columns)
+    assert result["signal_mean"].dtype == np.float32
+    for col in expected.columns:
+        np.testing.assert_allclose(
+            result[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float), rtol=1e-3, atol=1e-3
+        )
+
+
+def test_ragged_engine_empty_curve_is_nan():
+    df = pd.DataFrame({"signal": [[1.0, 2.0, 4.0], []]})
+    result = CurveFeatureExtractor(["signal"]).transform(df)
+    assert result.loc[1].isna().all()
+    assert result.loc[0, "signal_max"] == pytest.approx(4.0)
+
+
+def test_transform_file_streams_csv_chunks(tmp_path):
+    df = _curve_frame(n_rows=25, seed=2)
+    csv_path = tmp_path / "raw.csv"
+    df.assign(signal=df["signal"].map(json.dumps)).drop(columns=["pressure_curve"]).to_csv(csv_path, index=False)
+
+    extractor = CurveFeatureExtractor(["signal"])
+    chunks = list(extractor.transform_file(csv_path, chunksize=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert all("signal" not in c.columns for c in chunks)
+
+    streamed = pd.concat(chunks, ignore_index=True)
+    expected = extractor.transform(df.drop(columns=["pressure_curve"]))
+    np.testing.assert_allclose(streamed["signal_kurt"], expected["signal_kurt"], rtol=1e-9)
+
+
+def test_parse_curve_column_matches_json_loads():
+    df = _curve_frame(n_rows=50, seed=5)
+    raw = df["signal"].map(json.dumps)
+    raw.iloc[4] = "[]"
+    raw.iloc[7] = " [1e-3, -2.5E2,7] "
+    parsed = parse_curve_column(raw)
+    assert parsed.index.equals(raw.index)
+    for got, text in zip(parsed, raw):
+        np.testing.assert_array_equal(got, np.asarray(json.loads(text), dtype=float))
+
+    # anything but flat numeric lists is left to json.loads
+    odd = pd.Series(["[1, null]", "[[1, 2]]", '["a"]'], index=[10, 11, 12])
+    assert parse_curve_column(odd).tolist() == [[1, None], [[1, 2]], ["a"]]
+    assert parse_curve_column(pd.Series([[1.0], "[2]"])).tolist() == [[1.0], [2]]
+
+
+def test_parallel_extraction_preserves_row_order():
+    df = _curve_frame(n_rows=60, seed=3)
+    cols = ["signal", "pressure_curve"]
+    expected = CurveFeatureExtractor(cols).transform(df)
+    result = CurveFeatureExtractor(cols, n_jobs=2, shard_rows=7).transform(df)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+
+def test_parallel_stream_starts_one_pool(monkeypatch):
+    import app.services.feature.curve_extractor as curve_extractor
+
+    started = []
+
+    class _CountingPool(curve_extractor.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(curve_extractor, "ProcessPoolExecutor", _CountingPool)
+    df = _curve_frame(n_rows=60, seed=5)
+    cols = ["signal", "pressure_curve"]
+    extractor = CurveFeatureExtractor(cols, n_jobs=2, shard_rows=7)
+    chunks = [df.iloc[i:i + 20] for i in range(0, 60, 20)]
+    result = pd.concat(extractor.transform_stream(chunks))
+    pd.testing.assert_frame_equal(result, CurveFeatureExtractor(cols).transform(df))
+    assert len(started) == 1
+    assert extractor._pool is None
+
+def test_feature_cache_skips_seen_curves():
+    df = _curve_frame(n_rows=30, seed=4)
+    cols = ["signal", "pressure_curve"]
+    cache = LRUCache(max_bytes=1 << 20)
+    extractor = CurveFeatureExtractor(cols, cache=cache)
+
+    first = extractor.transform(df)
+    assert cache.stats()["misses"] == 60 and cache.stats()["hits"] == 0
+
+    # half of the rows are re-sent, the others are new
+    mixed = pd.concat([df.iloc[:15], _curve_frame(n_rows=30, seed=5).iloc[15:]], ignore_index=True)
+    second = extractor.transform(mixed)
+    assert cache.stats()["hits"] == 30
+    pd.testing.assert_frame_equal(second.iloc[:15], first.iloc[:15])
+    pd.testing.assert_frame_equal(second, CurveFeatureExtractor(cols).transform(mixed))
+
+
+def test_feature_cache_evicts_by_byte_size():
+    cache = LRUCache(max_bytes=3 * (6 * 8 + 64))
+    extractor = CurveFeatureExtractor(["signal"], cache=cache)
+    extractor.transform(pd.DataFrame({"signal": [[float(i), i + 1.0] for i in range(5)]}))
+    assert len(cache) == 3
+    assert cache.stats()["evictions"] == 2
+
+
+def test_spectral_and_shape_feature_bank():
+    t = np.linspace(0, 1, 400)
+    df = pd.DataFrame({
+        # 20 cycles over the curve: energy sits in one band
+        "press": [list(np.sin(2 * np.pi * 20 * t)), list(np.linspace(0.0, 1.0, 57))],
+        "signal": [[1.0, 2.0, 3.0], [4.0, 5.0]],
+    })
+    extractor = CurveFeatureExtractor(
+        ["press", "signal"],
+        feature_sets={"press": ["spectral", "shape"]},
+        n_points=128,
+        n_bands=4,
+    )
+    out = extractor.transform(df)
+
+    assert [c for c in out.columns if c.startswith("press_")] == (
+        [f"press_band{i}" for i in range(4)]
+        + ["press_peaks", "press_zero_cross", "press_t10", "press_t90", "press_rise_time", "press_area"]
+    )
+    assert "signal_mean" in out.columns and "press_mean" not in out.columns
+    bands = out.loc[0, [f"press_band{i}" for i in range(4)]].to_numpy(dtype=float)
+    assert bands.sum() == pytest.approx(1.0)
+    assert bands.argmax() == 1
+    assert out.loc[0, "press_peaks"] == 20
+    assert out.loc[0, "press_zero_cross"] == pytest.approx(39, abs=1)
+    # linear ramp: 10%/90% of range reached at ~0.1/0.9 of the time axis
+    assert out.loc[1, "press_t10"] == pytest.approx(0.1, abs=0.01)
+    assert out.loc[1, "press_rise_time"] == pytest.approx(0.8, abs=0.02)
+    assert out.loc[1, "press_area"] == pytest.approx(0.5)
+
+    parallel = CurveFeatureExtractor(
+        ["press", "signal"], feature_sets={"press": ["spectral", "shape"]}, n_bands=4, n_jobs=2, shard_rows=1
+    ).transform(df)
+    pd.testing.assert_frame_equal(parallel, out)
+
+
+def test_unknown_feature_group_is_rejected():
+    with pytest.raises(ValueError):
+        CurveFeatureExtractor(["signal"], feature_sets={"signal": ["wavelets"]})
+
+
+def test_incremental_extractor_matches_full_recompute():
+    rng = np.random.default_rng(6)
+    full = {eid: rng.normal(loc=100.0, scale=3.0, size=90) for eid in ("a", "b")}
+    inc = IncrementalCurveFeatureExtractor(["signal"], entity_column="id")
+
+    # entity "a" arrives in three segments (two in the same batch), "b" in two
+    batches = [
+        pd.DataFrame({"id": ["a", "b", "a"], "signal": [list(full["a"][:10]), list(full["b"][:50]), list(full["a"][10:40])]}),
+        pd.DataFrame({"id": ["a", "b"], "signal": [list(full["a"][40:]), list(full["b"][50:])]}),
+    ]
+    inc.update(batches[0])
+    result = inc.update(batches[1])
+
+    expected = CurveFeatureExtractor(["signal"]).transform(
+        pd.DataFrame({"id": ["a", "b"], "signal": [list(full["a"]), list(full["b"])]})
+    )
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9)
+
+    inc.reset(["a"])
+    restarted = inc.update(pd.DataFrame({"id": ["a"], "signal": [[1.0, 2.0]]}))
+    assert restarted.loc[0, "signal_mean"] == pytest.approx(1.5)
+
+
+def test_incremental_extractor_keeps_state_when_an_update_fails():
+    inc = IncrementalCurveFeatureExtractor(["signal", "pressure"], entity_column="id")
+    inc.update(pd.DataFrame({"id": ["a"], "signal": [[1.0, 2.0]], "pressure": [[10.0]]}))
+    with pytest.raises(ValueError):
+        inc.update(pd.DataFrame({"id": ["a"], "signal": [[5.0]], "pressure": [["x"]]}))
+    # neither column of "a" lost or half-applied its history
+    out = inc.update(pd.DataFrame({"id": ["a"], "signal": [[3.0]], "pressure": [[20.0]]}))
+    assert out.loc[0, "signal_mean"] == pytest.approx(2.0)
+    assert out.loc[0, "pressure_mean"] == pytest.approx(15.0)
+
+
+def test_incremental_extractor_state_is_bounded(monkeypatch):
+    import app.services.feature.incremental as incremental
+
+    now = [0.0]
+    monkeypatch.setattr(incremental.time, "monotonic", lambda: now[0])
+    inc = IncrementalCurveFeatureExtractor(["signal"], entity_column="id", max_entities=2, idle_ttl_s=10)
+    for eid in ("a", "b", "c"):
+        inc.update(pd.DataFrame({"id": [eid], "signal": [[1.0, 2.0]]}))
+    # "a" was least recently updated
+    assert len(inc) == 2 and inc.stats()["evictions"] == 1
+    again = inc.update(pd.DataFrame({"id": ["a"], "signal": [[3.0]]}))
+    assert again.loc[0, "signal_mean"] == pytest.approx(3.0)
+
+    now[0] = 5.0
+    inc.update(pd.DataFrame({"id": ["c"], "signal": [[4.0]]}))
+    now[0] = 12.0
+    # "a" idle for 12 s, "c" for 7 s
+    assert inc.evict_idle() == 1
+    assert len(inc) == 1
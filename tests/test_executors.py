@@ -0,0 +1,22 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executors import BoundedExecutor, ExecutorBusy
+
+
+def test_bounded_executor_rejects_beyond_queue_depth():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    gate = threading.Event()
+    running = executor.submit(gate.wait)
+    queued = executor.submit(gate.wait)
+    with pytest.raises(ExecutorBusy):
+        executor.submit(gate.wait)
+    assert executor.stats()["pending"] == 2
+
+    gate.set()
+    running.result(timeout=5)
+    queued.result(timeout=5)
+    assert asyncio.run(executor.run(lambda x: x * 2, 21)) == 42
+    assert executor.stats()["pending"] == 0
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from app.services.feature.chunks import iter_frame_chunks
+from app.services.feature.curve_extractor import CurveFeatureExtractor
+from app.services.feature.store import FeatureStore
+
+
+def _frame(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "signal": [rng.normal(size=rng.integers(5, 60)) for _ in range(n_rows)],
+        "pressure": [rng.exponential(size=20) for _ in range(n_rows)],
+        "label": rng.normal(size=n_rows),
+    })
+
+
+def _run(store, df, chunksize=40):
+    return pd.concat(store.transform_stream(iter_frame_chunks(df, chunksize)), ignore_index=True)
+
+
+def test_store_extracts_only_new_rows(tmp_path):
+    extractor = CurveFeatureExtractor(["signal", "pressure"], feature_sets={"pressure": ["stats", "shape"]})
+    history = _frame(100, seed=0)
+
+    first = FeatureStore(tmp_path, extractor)
+    pd.testing.assert_frame_equal(_run(first, history), extractor.transform(history))
+    assert (first.hits, first.misses) == (0, 100)
+
+    grown = pd.concat([history, _frame(30, seed=1)], ignore_index=True)
+    second = FeatureStore(tmp_path, extractor)
+    features = _run(second, grown, chunksize=64)
+    pd.testing.assert_frame_equal(features, extractor.transform(grown))
+    assert (second.hits, second.misses) == (100, 30)
+    assert second.fingerprint != first.fingerprint
+
+    # the recorded feature set is rebuilt without extracting anything
+    reloaded = FeatureStore(tmp_path, extractor).load(second.fingerprint)
+    pd.testing.assert_frame_equal(reloaded, features[second.columns])
+
+    # the fingerprint covers every raw column, but not the chunking
+    again = FeatureStore(tmp_path, extractor)
+    _run(again, grown, chunksize=7)
+    assert again.fingerprint == second.fingerprint
+    relabelled = FeatureStore(tmp_path, extractor)
+    _run(relabelled, grown.assign(label=0.0), chunksize=7)
+    assert relabelled.fingerprint != second.fingerprint
+    assert relabelled.misses == 0
+
+
+def test_compaction_merges_parts_and_drops_expired_rows(tmp_path):
+    extractor = CurveFeatureExtractor(["signal"])
+    old, new = _frame(50, seed=2), _frame(50, seed=3)
+
+    store = FeatureStore(tmp_path, extractor, max_parts=2, keep_datasets=1)
+    _run(store, old, chunksize=10)
+    # five chunks of new rows -> five parts -> compacted into one
+    assert len(store._parts()) == 1
+    _run(store, new, chunksize=10)
+    assert len(store._parts()) == 1
+    fingerprint = store.fingerprint
+
+    # only the newest dataset's rows survive; a fresh index still finds them
+    fresh = FeatureStore(tmp_path, extractor, max_parts=2, keep_datasets=1)
+    pd.testing.assert_frame_equal(_run(fresh, new), extractor.transform(new))
+    assert (fresh.hits, fresh.misses) == (50, 0)
+    assert fresh.fingerprint == fingerprint
+    pd.testing.assert_frame_equal(fresh.load(fingerprint), extractor.transform(new)[fresh.columns])
+    _run(fresh, old)
+    assert fresh.misses == 50
+
+
+def test_store_version_follows_extractor_config(tmp_path):
+    stats = FeatureStore(tmp_path, CurveFeatureExtractor(["signal"]))
+    shape = FeatureStore(tmp_path, CurveFeatureExtractor(["signal"], feature_sets={"signal": ["stats", "shape"]}))
+    assert stats.version != shape.version
+    assert stats.version == FeatureStore(tmp_path, CurveFeatureExtractor(["signal"])).version
@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.deploy.kserve_inference import decode_v2_request, encode_v2_response, v2_tensors_to_frame
+from app.services.feature.curve_extractor import CurveFeatureExtractor
+
+
+def test_v2_json_and_binary_tensors_match():
+    signal = np.arange(12, dtype=np.float32).reshape(3, 4)
+    temperature = np.array([30.0, 31.5, 29.0])
+    json_request = {
+        "inputs": [
+            {"name": "temperature", "shape": [3], "datatype": "FP64", "data": temperature.tolist()},
+            {"name": "signal", "shape": [3, 4], "datatype": "FP32", "data": signal.tolist()},
+        ],
+    }
+    _, json_tensors = decode_v2_request(json.dumps(json_request).encode())
+
+    binary_request = {
+        "inputs": [
+            {"name": "temperature", "shape": [3], "datatype": "FP64", "data": temperature.tolist()},
+            {"name": "signal", "shape": [3, 4], "datatype": "FP32", "parameters": {"binary_data_size": signal.nbytes}},
+        ],
+    }
+    header = json.dumps(binary_request).encode()
+    _, binary_tensors = decode_v2_request(header + signal.tobytes(), len(header))
+    assert not binary_tensors["signal"].flags.owndata
+
+    frame, packed = v2_tensors_to_frame(binary_tensors)
+    json_frame, json_packed = v2_tensors_to_frame(json_tensors)
+    pd.testing.assert_frame_equal(frame, json_frame)
+    assert packed["signal"][1].tolist() == [0, 4, 8, 12]
+
+    extractor = CurveFeatureExtractor(["signal"], dtype=np.float32)
+    expected = extractor.transform(pd.DataFrame({"temperature": temperature, "signal": list(signal)}))
+    pd.testing.assert_frame_equal(extractor.transform(frame, packed=packed), expected)
+
+
+def test_v2_ragged_curve_pair():
+    _, tensors = decode_v2_request(json.dumps({
+        "inputs": [
+            {"name": "signal.values", "shape": [5], "datatype": "FP64", "data": [0.1, 0.2, 0.15, 0.3, 0.1]},
+            {"name": "signal.offsets", "shape": [3], "datatype": "INT64", "data": [0, 3, 5]},
+        ],
+    }).encode())
+    frame, packed = v2_tensors_to_frame(tensors)
+    assert len(frame) == 2
+    assert packed["signal"][1].tolist() == [0, 3, 5]
+
+
+def test_v2_response_json_and_binary_outputs():
+    preds = pd.Series([1.5, 2.5])
+    header, binary = encode_v2_response("run1", {"predictions": preds}, {"id": "r1"})
+    assert binary is None
+    assert header["id"] == "r1"
+    assert header["outputs"] == [{"name": "predictions", "shape": [2], "datatype": "FP64", "data": [1.5, 2.5]}]
+
+    header, binary = encode_v2_response(
+        "run1",
+        {"predictions": np.array(["ok", "fault"])},
+        {"outputs": [{"name": "predictions", "parameters": {"binary_data": True}}]},
+    )
+    assert header["outputs"][0]["datatype"] == "BYTES"
+    assert header["outputs"][0]["parameters"]["binary_data_size"] == len(binary)
+    assert binary == b"\x02\x00\x00\x00ok\x05\x00\x00\x00fault"
+
+
+def test_v2_rejects_invalid_curve_offsets():
+    tensors = {"signal.values": np.ones(4), "signal.offsets": np.array([0, 5, 4])}
+    with pytest.raises(ValueError, match="offsets"):
+        v2_tensors_to_frame(tensors)
+
+
+def test_model_ready_reflects_registry_and_cache(tmp_path, monkeypatch):
+    try:
+        # app.routers imports every router, including training and plotting
+        from app.routers import kserve
+    except ImportError as exc:
+        pytest.skip(f"router dependencies missing: {exc}")
+    from fastapi import HTTPException
+
+    from app.services.predictors.model_cache import ModelCache
+
+    artifact = tmp_path / "model.npz"
+    artifact.write_bytes(b"x")
+    entries = {"known": {"artifact_path": str(artifact), "metadata": {"task_type": "anomaly_detection"}}}
+    monkeypatch.setattr(kserve, "get_model", entries.get)
+    monkeypatch.setattr(kserve, "model_cache", ModelCache(1 << 20))
+
+    with pytest.raises(HTTPException) as exc:
+        kserve.model_ready("unknown")
+    assert exc.value.status_code == 404
+    assert kserve.model_ready("known").status_code == 503
+
+    predictor_cls = type(kserve.PredictorFactory.get_predictor(kserve.TaskType.ANOMALY_DETECTION))
+    monkeypatch.setattr(predictor_cls, "load", classmethod(lambda cls, path: cls()))
+    kserve.model_cache.get("known", str(artifact), predictor_cls)
+    assert kserve.model_ready("known") == {"name": "known", "ready": True}
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.predictors import model_cache as model_cache_module
+from app.services.predictors.model_cache import ModelCache
+
+
+class _SlowPredictor:
+    loads = 0
+
+    @classmethod
+    def load(cls, path):
+        cls.loads += 1
+        time.sleep(0.05)
+        obj = cls()
+        obj.path = path
+        return obj
+
+
+def test_concurrent_requests_share_one_load(tmp_path):
+    artifact = tmp_path / "model.npz"
+    artifact.write_bytes(b"x" * 100)
+    cache = ModelCache(max_bytes=1000)
+    _SlowPredictor.loads = 0
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("run1", str(artifact), _SlowPredictor)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert _SlowPredictor.loads == 1
+    assert len({id(r) for r in results}) == 1
+    assert cache.get("run1", str(artifact), _SlowPredictor) is results[0]
+
+
+def test_reload_on_mtime_change_and_memory_eviction(tmp_path):
+    a = tmp_path / "a.npz"
+    b = tmp_path / "b.npz"
+    a.write_bytes(b"x" * 600)
+    b.write_bytes(b"x" * 600)
+    cache = ModelCache(max_bytes=1000)
+
+    first = cache.get("a", str(a), _SlowPredictor)
+    a.write_bytes(b"y" * 600)
+    os.utime(a, ns=(time.time_ns(), time.time_ns() + 10**9))
+    second = cache.get("a", str(a), _SlowPredictor)
+    assert second is not first
+    assert cache.stats()["entries"] == 1
+
+    cache.get("b", str(b), _SlowPredictor)
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["evictions"] == 1
+
+
+def test_failed_load_is_not_cached(tmp_path):
+    class _Broken:
+        @classmethod
+        def load(cls, path):
+            raise RuntimeError("corrupt")
+
+    artifact = tmp_path / "m.npz"
+    artifact.write_bytes(b"x")
+    cache = ModelCache(max_bytes=1000)
+    with pytest.raises(RuntimeError):
+        cache.get("r", str(artifact), _Broken)
+    assert cache.stats()["entries"] == 0 and cache.stats()["loading"] == 0
+
+
+def test_nested_artifact_rewrite_changes_the_key(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache_module, "MTIME_SCAN_TTL_S", 0.0)
+    run = tmp_path / "run"
+    (run / "models" / "m1").mkdir(parents=True)
+    nested = run / "models" / "m1" / "model.pkl"
+    nested.write_bytes(b"x" * 10)
+    cache = ModelCache(max_bytes=1000)
+
+    first = cache.get("r", str(run), _SlowPredictor)
+    nested.write_bytes(b"y" * 10)
+    os.utime(nested, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert cache.get("r", str(run), _SlowPredictor) is not first
+
+
+def test_oversized_model_is_pinned(tmp_path, caplog):
+    artifact = tmp_path / "big.npz"
+    artifact.write_bytes(b"x" * 2000)
+    cache = ModelCache(max_bytes=1000)
+    _SlowPredictor.loads = 0
+
+    first = cache.get("big", str(artifact), _SlowPredictor)
+    assert cache.get("big", str(artifact), _SlowPredictor) is first
+    assert _SlowPredictor.loads == 1
+    assert cache.stats()["pinned"] == ["big"]
+    assert "exceeds MODEL_CACHE_MAX_BYTES" in caplog.text
+
+    # a second oversized model replaces the first: at most one is pinned
+    other = tmp_path / "bigger.npz"
+    other.write_bytes(b"x" * 3000)
+    cache.get("bigger", str(other), _SlowPredictor)
+    assert cache.stats()["pinned"] == ["bigger"]
+    assert cache.get("big", str(artifact), _SlowPredictor) is not first
+    assert _SlowPredictor.loads == 3
+    assert cache.stats()["pinned"] == ["big"]
+
+
+def test_is_loaded_tracks_the_current_version(tmp_path):
+    artifact = tmp_path / "model.npz"
+    artifact.write_bytes(b"x" * 10)
+    cache = ModelCache(max_bytes=1000)
+    assert not cache.is_loaded("r", str(artifact), _SlowPredictor)
+    cache.get("r", str(artifact), _SlowPredictor)
+    assert cache.is_loaded("r", str(artifact), _SlowPredictor)
+    # rewritten artifacts are a new version that is not loaded yet
+    os.utime(artifact, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert not cache.is_loaded("r", str(artifact), _SlowPredictor)
@@ -0,0 +1,135 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.registry import model_registry
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def registry(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "REGISTRY_FILE", tmp_path / "registry.json")
+    monkeypatch.setattr(model_registry, "REGISTRY_DB", tmp_path / "registry.db")
+    monkeypatch.setattr(model_registry, "REGISTRY_BACKEND", request.param)
+    monkeypatch.setattr(model_registry, "_sqlite", None)
+    return model_registry
+
+
+def _register(registry, n):
+    for i in range(n):
+        task = "regression" if i % 2 else "classification"
+        registry.register_model(f"run{i}", f"/artifacts/run{i}", {"task_type": task, "label": "y"})
+
+
+def test_register_get_and_paginate(registry):
+    _register(registry, 5)
+    assert registry.get_model("run3")["artifact_path"] == "/artifacts/run3"
+    assert registry.get_model("missing") is None
+    assert registry.count_models() == 5
+    assert registry.count_models(task_type="regression") == 2
+
+    page = registry.query_models(limit=2, offset=1)
+    assert [m["run_id"] for m in page] == ["run3", "run2"]
+    assert [m["run_id"] for m in registry.query_models(task_type="regression")] == ["run3", "run1"]
+
+    # re-registering updates in place and keeps the run's position
+    registry.register_model("run0", "/moved", {"task_type": "classification", "label": "y"})
+    assert registry.count_models() == 5
+    assert registry.get_model("run0")["artifact_path"] == "/moved"
+    assert registry.query_models()[-1]["run_id"] == "run0"
+
+
+def test_models_endpoint_is_paginated(registry):
+    from fastapi import FastAPI
+
+    try:
+        # app.routers imports every router, including training and plotting
+        from app.routers import models as models_router
+    except ImportError as exc:
+        pytest.skip(f"router dependencies missing: {exc}")
+
+    app = FastAPI()
+    app.include_router(models_router.router)
+    _register(registry, 3)
+    body = TestClient(app).get("/models", params={"limit": 1, "task_type": "classification"}).json()
+    assert body["total"] == 2 and body["limit"] == 1 and body["offset"] == 0
+    assert [m["run_id"] for m in body["models"]] == ["run2"]
+
+
+def test_migrate_json_registry(tmp_path, monkeypatch):
+    import json
+    import sys
+
+    from scripts import migrate_registry
+    from app.services.registry.sqlite_registry import SQLiteRegistry
+
+    source = tmp_path / "registry.json"
+    source.write_text(json.dumps({f"run{i}": {"artifact_path": f"/a/{i}", "metadata": {}} for i in range(3)}))
+    db = tmp_path / "registry.db"
+    monkeypatch.setattr(sys, "argv", ["migrate_registry", "--json", str(source), "--db", str(db)])
+    migrate_registry.main()
+    assert [m["run_id"] for m in SQLiteRegistry(db).query()] == ["run2", "run1", "run0"]
+
+
+def _register_from_process(path, worker, n):
+    model_registry.REGISTRY_FILE = path
+    model_registry.REGISTRY_BACKEND = "json"
+    for i in range(n):
+        model_registry.register_model(f"w{worker}-{i}", f"/artifacts/{worker}/{i}")
+
+
+def test_concurrent_processes_lose_no_registrations(tmp_path, monkeypatch):
+    import multiprocessing
+
+    if model_registry.fcntl is None:
+        pytest.skip("file locking needs fcntl")
+    ctx = multiprocessing.get_context("fork")
+    path = tmp_path / "registry.json"
+    procs = [ctx.Process(target=_register_from_process, args=(path, w, 25)) for w in range(8)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    monkeypatch.setattr(model_registry, "REGISTRY_FILE", path)
+    monkeypatch.setattr(model_registry, "REGISTRY_BACKEND", "json")
+    assert model_registry.count_models() == 8 * 25
+
+
+def test_json_reads_reuse_snapshot_until_file_changes(registry, monkeypatch):
+    if registry.REGISTRY_BACKEND != "json":
+        pytest.skip("snapshot applies to the JSON backend")
+    _register(registry, 2)
+    first = registry._load()
+    assert registry._load() is first
+
+    calls = []
+    real_loads = model_registry.json.loads
+    monkeypatch.setattr(model_registry.json, "loads", lambda s: calls.append(1) or real_loads(s))
+    registry.get_model("run0")
+    assert not calls
+    registry.register_model("run2", "/artifacts/run2")
+    assert registry.get_model("run2")["artifact_path"] == "/artifacts/run2"
+    assert registry._load() is not first
+
+
+def test_repair_script_updates_either_backend(registry, tmp_path, monkeypatch):
+    import importlib.util
+    from pathlib import Path
+
+    spec = importlib.util.spec_from_file_location("repair_registry", Path(__file__).parents[1] / "scripts" / "repair_registry.py")
+    repair = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(repair)
+
+    model_dir = tmp_path / "mlruns" / "0" / "lost" / "artifacts" / "model"
+    model_dir.mkdir(parents=True)
+    monkeypatch.setattr(repair, "MLRUNS", tmp_path / "mlruns")
+    registry.register_model("lost", str(tmp_path / "gone"), {"task_type": "regression"})
+    registry.register_model("kept", str(tmp_path), {"task_type": "regression"})
+
+    repair.main()
+    assert registry.get_model("lost")["artifact_path"] == str(model_dir.resolve())
+    assert registry.get_model("kept")["artifact_path"] == str(tmp_path)
+
+    # compare-and-set: a stale expected path changes nothing
+    assert not registry.replace_artifact_path("lost", "/stale", "/elsewhere")
+    assert not registry.replace_artifact_path("missing", None, "/elsewhere")
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core import config
+from app.services.predictors.simple_tabular import SimpleTabularPredictor
+from app.services.registry import model_registry
+
+
+def _train(tmp_path, name, slope):
+    df = pd.DataFrame({"x": np.arange(20.0)})
+    df["y"] = slope * df["x"]
+    model = SimpleTabularPredictor()
+    model.train(df, SimpleNamespace(label="y"))
+    run_dir = tmp_path / name / "simple"
+    model.save(str(run_dir / "simple_model.npz"))
+    return str(run_dir)
+
+
+def test_predict_serves_latest_registered_run(tmp_path, monkeypatch):
+    try:
+        # app.routers imports every router, including training and plotting
+        from app.routers import predict
+    except ImportError as exc:
+        pytest.skip(f"router dependencies missing: {exc}")
+
+    monkeypatch.setattr(model_registry, "REGISTRY_FILE", tmp_path / "registry.json")
+    monkeypatch.setattr(model_registry, "REGISTRY_BACKEND", "json")
+    monkeypatch.setattr(config, "PREDICT_MODEL_PATH", "")
+    monkeypatch.setattr(config, "PREDICT_RUN_ID", "latest")
+    monkeypatch.setattr(predict, "_RESOLVE_TTL_S", 0.0)
+    assert predict.load_model() is None
+
+    meta = {"task_type": "tabular_regression", "label": "y"}
+    model_registry.register_model("first", _train(tmp_path, "first", 2.0), meta)
+    assert predict.load_model().predict(pd.DataFrame({"x": [3.0]})).iloc[0] == pytest.approx(6.0)
+
+    # a newly finished training job is served without a restart
+    model_registry.register_model("second", _train(tmp_path, "second", 5.0), meta)
+    assert predict.load_model().predict(pd.DataFrame({"x": [3.0]})).iloc[0] == pytest.approx(15.0)
@@ -0,0 +1,106 @@
+import pandas as pd
+
+from app.services.predictors.result_cache import PredictionCache, model_version
+
+
+class _Model:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, df):
+        self.batches.append(len(df))
+        return pd.Series(df["x"].to_numpy() * 2.0, index=df.index, name="y")
+
+
+def test_only_uncached_rows_reach_the_predictor():
+    cache = PredictionCache(1 << 20, ttl=60)
+    model = _Model()
+    first = cache.predict("run", (1, "a"), pd.DataFrame({"x": [1.0, 2.0, 3.0]}), model.predict)
+    assert first.tolist() == [2.0, 4.0, 6.0]
+
+    df = pd.DataFrame({"x": [3.0, 4.0, 1.0, 5.0]}, index=[10, 11, 12, 13])
+    out = cache.predict("run", (1, "a"), df, model.predict)
+    pd.testing.assert_series_equal(out, pd.Series([6.0, 8.0, 2.0, 10.0], index=df.index, name="y"))
+    assert model.batches == [3, 2]
+    assert cache.stats()["hits"] == 2
+
+    # an all-hit batch keeps the model's output name
+    hit = cache.predict("run", (1, "a"), df.iloc[:2], model.predict)
+    pd.testing.assert_series_equal(hit, pd.Series([6.0, 8.0], index=df.index[:2], name="y"))
+    assert model.batches == [3, 2]
+
+
+def test_new_model_version_invalidates_rows():
+    cache = PredictionCache(1 << 20)
+    model = _Model()
+    df = pd.DataFrame({"x": [1.0, 2.0]})
+    cache.predict("run", (1, "a"), df, model.predict)
+    cache.predict("run", (1, "b"), df, model.predict)
+    assert model.batches == [2, 2]
+    assert cache.stats()["entries"] == 2
+
+
+def test_ttl_expiry(monkeypatch):
+    import app.core.cache as core_cache
+
+    now = [0.0]
+    monkeypatch.setattr(core_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(1 << 20, ttl=5)
+    model = _Model()
+    df = pd.DataFrame({"x": [1.0]})
+    cache.predict("run", (1, "a"), df, model.predict)
+    now[0] = 10.0
+    cache.predict("run", (1, "a"), df, model.predict)
+    assert model.batches == [1, 1]
+
+
+def test_model_version_tracks_registry_entry(tmp_path):
+    entry = {"artifact_path": str(tmp_path), "metadata": {"label": "y"}}
+    before = model_version(entry)
+    assert model_version(dict(entry)) == before
+    entry["metadata"] = {"label": "z"}
+    assert model_version(entry) != before
+
+
+class _FrameModel:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, df):
+        self.batches.append(len(df))
+        return pd.DataFrame({"score": df["x"].to_numpy() * 2.0, "flag": df["x"].to_numpy() > 2.0}, index=df.index)
+
+
+def test_frame_output_keeps_its_container_on_every_path():
+    cache = PredictionCache(1 << 20)
+    model = _FrameModel()
+    first = pd.DataFrame({"x": [1.0, 3.0]}, index=[5, 6])
+    pd.testing.assert_frame_equal(cache.predict("run", (1, "a"), first, model.predict), model.predict(first))
+
+    # mixed hit/miss batch: only the new rows reach the model
+    mixed = pd.DataFrame({"x": [3.0, 4.0, 1.0]}, index=[20, 21, 22])
+    model.batches.clear()
+    out = cache.predict("run", (1, "a"), mixed, model.predict)
+    assert model.batches == [1]
+    pd.testing.assert_frame_equal(out, model.predict(mixed))
+
+    # all hits
+    model.batches.clear()
+    out = cache.predict("run", (1, "a"), mixed.iloc[::-1], model.predict)
+    assert model.batches == []
+    pd.testing.assert_frame_equal(out, model.predict(mixed.iloc[::-1]))
+
+
+def test_outputs_that_are_not_row_aligned_are_not_cached():
+    cache = PredictionCache(1 << 20)
+    calls = []
+
+    def forecast(df):
+        calls.append(len(df))
+        return {"mean": [1.0, 2.0, 3.0]}
+
+    df = pd.DataFrame({"x": [1.0, 2.0]})
+    assert cache.predict("run", (1, "a"), df, forecast) == {"mean": [1.0, 2.0, 3.0]}
+    assert cache.predict("run", (1, "a"), df, forecast) == {"mean": [1.0, 2.0, 3.0]}
+    assert calls == [2, 2]
+    assert cache.stats()["entries"] == 0
@@ -31,3 +31,140 @@ def test_simple_tabular_train_predict_and_save_load(tmp_path):
 
     # numeric comparison
     np.testing.assert_allclose(preds.to_numpy(), preds2.to_numpy(), rtol=1e-6, atol=1e-8)
+
+
+def test_simple_tabular_encoding_plan_matches_get_dummies(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "flag": rng.random(n) > 0.5,
+        "line": rng.choice(["l1", "l2", "l3"], n),
+        "shift": pd.Categorical(rng.choice(["night", "day"], n), categories=["night", "day"]),
+    })
+    df["y"] = 2.0 * df["a"] + (df["line"] == "l3") * 1.5 - df["flag"] + rng.normal(scale=0.1, size=n)
+    model = SimpleTabularPredictor()
+    model.train(df, SimpleNamespace(label="y"))
+    assert model.input_columns_ == ["a", "flag", "line", "shift"]
+
+    X = df.drop(columns=["y"])
+    np.testing.assert_allclose(model.predict(X).to_numpy(), model._predict_legacy(X).to_numpy())
+
+    # single rows no longer depend on which levels happen to be in the batch
+    row = X.iloc[[3]]
+    np.testing.assert_allclose(model.predict(row).to_numpy(), model.predict(X).to_numpy()[[3]])
+
+    # unseen levels and missing columns encode as zeros
+    odd = pd.DataFrame({"a": [1.0], "line": ["l9"]})
+    assert model.predict(odd).iloc[0] == model.intercept_ + model.coef_[1]
+
+    save_path = tmp_path / "simple_model.npz"
+    model.save(str(save_path))
+    loaded = SimpleTabularPredictor.load(str(save_path))
+    assert loaded.encoding_ == model.encoding_
+    np.testing.assert_allclose(loaded.predict(X).to_numpy(), model.predict(X).to_numpy())
+
+    # artifacts saved before encoding plans existed use the get_dummies path
+    np.savez(save_path, coef=model.coef_, columns=model.columns_)
+    legacy = SimpleTabularPredictor.load(str(save_path))
+    assert legacy.encoding_ is None
+    np.testing.assert_allclose(legacy.predict(X).to_numpy(), model.predict(X).to_numpy())
+
+
+def test_predict_row_matches_predict():
+    rng = np.random.default_rng(3)
+    n = 120
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "flag": rng.random(n) > 0.5,
+        "line": rng.choice(["l1", "l2", "l3"], n),
+    })
+    df["y"] = df["a"] - (df["line"] == "l2") + rng.normal(scale=0.1, size=n)
+    X = df.drop(columns=["y"])
+    for kwargs in ({}, {"hash_buckets": 4}):
+        model = SimpleTabularPredictor(**kwargs)
+        model.train(df, SimpleNamespace(label="y"))
+        rows = [model.predict_row(r) for r in X.to_dict("records")]
+        np.testing.assert_allclose(rows, model.predict(X).to_numpy())
+        odd = {"a": 1.0, "line": "l9"}
+        assert np.isclose(model.predict_row(odd), model.predict(pd.DataFrame([odd])).iloc[0])
+
+    # the flattened weights follow a refit
+    model.partial_fit(df.assign(y=df["y"] + 10.0), SimpleNamespace(label="y"))
+    np.testing.assert_allclose(model.predict_row(X.iloc[0].to_dict()), model.predict(X.iloc[:1]).iloc[0])
+
+
+def test_simple_tabular_chunked_and_partial_fit_match_full_fit(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 3000
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "line": rng.choice(["l1", "l2", "l3"], n),
+    })
+    # a level that only shows up in the last rows
+    df.loc[df.index[-200:], "line"] = "l9"
+    df["y"] = 1.5 * df["a"] + (df["line"] == "l9") * 4.0 + rng.normal(scale=0.1, size=n)
+    cfg = SimpleNamespace(label="y")
+    X = df.drop(columns=["y"])
+
+    full = SimpleTabularPredictor()
+    full.train(df, cfg)
+
+    chunked = SimpleTabularPredictor().train_chunks((df.iloc[i:i + 500] for i in range(0, n, 500)), cfg)
+    assert chunked.columns_ == full.columns_
+    assert chunked.n_rows_ == n
+    np.testing.assert_allclose(chunked.predict(X).to_numpy(), full.predict(X).to_numpy(), atol=1e-9)
+
+    # fit on the history, save, then add the new rows only
+    first = SimpleTabularPredictor()
+    first.train(df.iloc[:2000], cfg)
+    save_path = tmp_path / "simple_model.npz"
+    first.save(str(save_path))
+    updated = SimpleTabularPredictor.load(str(save_path)).partial_fit(df.iloc[2000:], cfg)
+    assert updated.columns_[-1] == "line_l9"
+    np.testing.assert_allclose(updated.predict(X).to_numpy(), full.predict(X).to_numpy(), atol=1e-9)
+
+    ridge = SimpleTabularPredictor(ridge=1e4).train_chunks([df], cfg)
+    assert abs(ridge.coef_[1]) < abs(full.coef_[1])
+    ridge.save(str(save_path))
+    assert SimpleTabularPredictor.load(str(save_path)).ridge == 1e4
+
+
+def test_simple_tabular_sparse_and_hashed_modes(tmp_path):
+    rng = np.random.default_rng(2)
+    n = 4000
+    equipment = np.array([f"eq{i}" for i in range(400)])
+    effect = dict(zip(equipment, rng.normal(size=400)))
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "equipment": rng.choice(equipment, n),
+        "recipe": rng.choice(["r1", "r2", "r3"], n),
+    })
+    df["y"] = 2.0 * df["a"] + df["equipment"].map(effect) + rng.normal(scale=0.05, size=n)
+    cfg = SimpleNamespace(label="y")
+    X = df.drop(columns=["y"])
+
+    dense = SimpleTabularPredictor()
+    dense.train(df, cfg)
+    sparse = SimpleTabularPredictor(sparse=True)
+    sparse.train(df, cfg)
+    assert sparse.columns_ == dense.columns_
+    assert sparse._design_matrix(X).nnz == n * 3 - (X["equipment"] == "eq0").sum() - (X["recipe"] == "r1").sum()
+    np.testing.assert_allclose(sparse.predict(X).to_numpy(), dense.predict(X).to_numpy(), atol=1e-6)
+
+    save_path = tmp_path / "sparse_model.npz"
+    sparse.save(str(save_path))
+    loaded = SimpleTabularPredictor.load(str(save_path))
+    assert loaded.sparse
+    np.testing.assert_allclose(loaded.predict(X).to_numpy(), sparse.predict(X).to_numpy())
+    loaded.partial_fit(df.iloc[:50].assign(equipment="eq_new"), cfg)
+    assert "equipment_eq_new" in loaded.columns_
+
+    hashed = SimpleTabularPredictor(sparse=True, hash_buckets=1 << 14)
+    hashed.train(df, cfg)
+    assert len(hashed.columns_) == 1 + 1 + 2 * (1 << 14)
+    residual = hashed.predict(X).to_numpy() - df["y"].to_numpy()
+    assert np.sqrt(np.mean(residual ** 2)) < 0.5
+    # buckets do not depend on the process (no Python hash randomization)
+    hashed.save(str(save_path))
+    np.testing.assert_allclose(SimpleTabularPredictor.load(str(save_path)).predict(X).to_numpy(), hashed.predict(X).to_numpy())
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.services.predictors.anomaly import StreamingAnomalyDetector
+from app.services.predictors.streaming import StreamRegistry
+
+
+def test_registry_reuses_caps_and_restores_streams(tmp_path):
+    registry = StreamRegistry(str(tmp_path), max_streams=2)
+    first = registry.get("s1", ["a", "b"])
+    assert registry.get("s1") is first
+    registry.get("s2", ["a"])
+    with pytest.raises(ValueError, match="stream limit"):
+        registry.get("s3", ["a"])
+
+    first.update_array(np.ones((5, 2)))
+    path = registry.close("s1")
+    # closing frees the slot; the stream comes back from its checkpoint
+    registry.get("s3", ["a"])
+    registry.close("s3")
+    restored = registry.get("s1")
+    assert restored is not first
+    assert restored.counts.tolist() == [5, 5]
+    assert path.endswith("s1.npz")
+
+    with pytest.raises(ValueError, match="invalid stream id"):
+        registry.get("../etc", ["a"])
+
+
+def test_detector_rejects_rows_of_the_wrong_width():
+    detector = StreamingAnomalyDetector(["a"])
+    with pytest.raises(ValueError):
+        detector.update_array(np.array([[1.0, 2.0]]))
+    with pytest.raises(ValueError):
+        detector.update_array(np.array([1.0, 2.0]))
+    assert detector.samples == 0
+
+
+@pytest.fixture
+def deploy_router(tmp_path, monkeypatch):
+    try:
+        # app.routers imports every router, including training and plotting
+        from app.routers import deploy
+    except ImportError as exc:
+        pytest.skip(f"router dependencies missing: {exc}")
+    monkeypatch.setattr(deploy, "streams", StreamRegistry(str(tmp_path), max_streams=1))
+    return deploy
+
+
+def test_stream_append_rejects_misshapen_rows(deploy_router):
+    params = {"run_id": None, "alpha": None, "k": None, "min_samples": None}
+    bad = deploy_router._stream_append("s", b'{"columns": ["a"], "rows": [[1.0, 2.0]]}', "application/json", params)
+    assert bad["error"].startswith("invalid stream batch")
+    ok = deploy_router._stream_append("s", b'{"columns": ["a"], "rows": [[1.0], [2.0]]}', "application/json", params)
+    assert ok["is_anomaly"] == [False, False]
+    assert deploy_router.streams.get("s").samples == 2
+    # the cap applies to new stream ids
+    full = deploy_router._stream_append("t", b'{"columns": ["a"], "rows": [[1.0]]}', "application/json", params)
+    assert "stream limit" in full["error"]
+
+
+def test_stream_websocket_scores_every_message(deploy_router):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.include_router(deploy_router.router)
+    with TestClient(app).websocket_connect("/deploy/stream/ws1/ws?min_samples=0") as ws:
+        ws.send_text('{"columns": ["a", "b"], "rows": [[1.0, 2.0], [1.0, 2.0]]}')
+        assert ws.receive_json()["is_anomaly"] == [False, False]
+        ws.send_text('{"columns": ["a", "b"], "rows": [[1.0]]}')
+        assert ws.receive_json()["error"].startswith("invalid stream batch")
+    assert deploy_router.streams.get("ws1").samples == 2
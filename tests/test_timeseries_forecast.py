@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.predictors import timeseries
+from app.services.predictors.timeseries import AutoGluonTimeSeriesPredictor, forecast_std
+
+
+class _TSFrame:
+    @staticmethod
+    def from_data_frame(df, id_column, timestamp_column):
+        return df.set_index([id_column, timestamp_column])
+
+
+class _Model:
+    """Forecasts last value + step for 2 steps, with AutoGluon-style quantiles."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, data):
+        self.calls.append(sorted(data.index.get_level_values(0).unique()))
+        rows = []
+        for item, group in data.groupby(level=0):
+            last_ts = group.index.get_level_values(1).max()
+            last = group["target"].iloc[-1]
+            for step in (1, 2):
+                rows.append((item, last_ts + pd.Timedelta(hours=step), last + step))
+        out = pd.DataFrame(rows, columns=["item_id", "timestamp", "mean"]).set_index(["item_id", "timestamp"])
+        out["0.1"] = out["mean"] - 1.2815515655446004
+        out["0.9"] = out["mean"] + 1.2815515655446004
+        return out
+
+
+def _history(items, periods=5):
+    ts = pd.date_range("2024-01-01", periods=periods, freq="h")
+    return pd.DataFrame({
+        "item_id": np.repeat(items, periods),
+        "timestamp": np.tile(ts, len(items)),
+        "target": np.arange(periods * len(items), dtype=float),
+    })
+
+
+@pytest.fixture
+def predictor(monkeypatch):
+    monkeypatch.setattr(timeseries, "TimeSeriesDataFrame", _TSFrame)
+    obj = AutoGluonTimeSeriesPredictor()
+    obj.model = _Model()
+    obj.version = "v1"
+    return obj
+
+
+def test_predict_many_serves_unchanged_series_from_cache(predictor):
+    out = predictor.predict_many(_history(["a", "b", "c"]), sensitivity_factor=2.0)
+    assert predictor.model.calls == [["a", "b", "c"]]
+    assert out["item_id"].tolist() == ["a", "a", "b", "b", "c", "c"]
+    np.testing.assert_allclose(out["upper"] - out["mean"], 2.0)
+    np.testing.assert_allclose(out["mean"] - out["lower"], 2.0)
+
+    # series "b" gained a sample: only it is forecast again
+    grown = pd.concat([_history(["a", "b", "c"]), _history(["b"], periods=6).tail(1)], ignore_index=True)
+    again = predictor.predict_many(grown, sensitivity_factor=1.0)
+    assert predictor.model.calls[1] == ["b"]
+    assert again["item_id"].tolist() == ["a", "a", "b", "b", "c", "c"]
+    pd.testing.assert_frame_equal(again[again["item_id"] != "b"].reset_index(drop=True),
+                                  predictor.predict_many(_history(["a", "c"]), 1.0))
+    assert len(predictor.model.calls) == 2
+
+    # a new model version invalidates every cached forecast
+    predictor.version = "v2"
+    predictor.predict_many(_history(["a"]))
+    assert predictor.model.calls[2] == ["a"]
+
+
+def test_forecast_std_prefers_std_column():
+    df = pd.DataFrame({"mean": [1.0], "std": [0.5], "0.1": [0.0], "0.9": [9.0]})
+    assert forecast_std(df).tolist() == [0.5]
+    with pytest.raises(ValueError):
+        forecast_std(pd.DataFrame({"mean": [1.0]}))
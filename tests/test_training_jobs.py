@@ -0,0 +1,108 @@
+import math
+import time
+
+import pytest
+
+from app.core.executors import ExecutorBusy
+from app.services.training.jobs import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+
+def _wait(queue, job_id, states, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(job_id)
+        if status["state"] in states:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} stuck in {queue.status(job_id)['state']}")
+
+
+def test_jobs_run_in_priority_order_and_can_be_cancelled(tmp_path):
+    queue = JobQueue(max_workers=1, max_queue=3, artifacts_dir=str(tmp_path))
+    blocker = queue.submit(time.sleep, 30)
+    low = queue.submit(math.sqrt, 16.0)
+    high = queue.submit(math.sqrt, 81.0, priority=5)
+    bad = queue.submit(math.sqrt, -1.0)
+
+    assert queue.status(blocker.id)["state"] == RUNNING
+    assert queue.status(high.id)["queue_position"] == 0
+    assert queue.status(low.id)["queue_position"] == 1
+    with pytest.raises(ExecutorBusy):
+        queue.submit(math.sqrt, 1.0)
+
+    queue.cancel(low.id)
+    assert queue.status(low.id)["state"] == CANCELLED
+    assert queue.status(bad.id)["queue_position"] == 1
+
+    queue.cancel(blocker.id)
+    assert _wait(queue, blocker.id, [CANCELLED])["state"] == CANCELLED
+    assert _wait(queue, high.id, [SUCCEEDED])["result"] == 9.0
+    failed = _wait(queue, bad.id, [FAILED, SUCCEEDED])
+    assert failed["state"] == FAILED and "ValueError" in failed["error"]
+    assert (tmp_path / "jobs" / high.id).is_dir()
+    assert queue.stats()["running"] == 0 and queue.stats()["queued"] == 0
+    assert queue.status(low.id)["state"] != QUEUED
+
+
+def _spawn_grandchild(pid_file):
+    import subprocess
+    import sys
+
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    with open(pid_file, "w") as fh:
+        fh.write(str(child.pid))
+    child.wait()
+
+
+def test_cancel_stops_processes_started_by_the_job(tmp_path):
+    import os
+
+    if not hasattr(os, "killpg"):
+        pytest.skip("process groups need POSIX")
+    queue = JobQueue(max_workers=1, max_queue=1, artifacts_dir=str(tmp_path))
+    pid_file = tmp_path / "grandchild.pid"
+    job = queue.submit(_spawn_grandchild, str(pid_file))
+    deadline = time.monotonic() + 30
+    while not (pid_file.exists() and pid_file.read_text()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    pid = int(pid_file.read_text())
+
+    queue.cancel(job.id)
+    _wait(queue, job.id, [CANCELLED])
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        # reaped by init once its parent is gone; a zombie still counts as alive here
+        time.sleep(0.05)
+    else:
+        pytest.fail("grandchild process survived the cancel")
+
+
+def _sleep_with_upload(seconds, raw_df=None):
+    time.sleep(seconds)
+
+
+def test_uploads_are_removed_however_the_job_ends(tmp_path):
+    def upload(name):
+        path = tmp_path / "uploads" / name / "data.csv"
+        path.parent.mkdir(parents=True)
+        path.write_text("x\n1\n")
+        return str(path)
+
+    queue = JobQueue(max_workers=1, max_queue=2, artifacts_dir=str(tmp_path))
+    finished = queue.submit(_sleep_with_upload, 0, raw_df=upload("finished"), remove_input=True)
+    _wait(queue, finished.id, [SUCCEEDED])
+    assert not (tmp_path / "uploads" / "finished").exists()
+
+    running = queue.submit(_sleep_with_upload, 30, raw_df=upload("running"), remove_input=True)
+    queued = queue.submit(_sleep_with_upload, 30, raw_df=upload("queued"), remove_input=True)
+    assert queue.status(running.id)["state"] == RUNNING
+    queue.cancel(queued.id)
+    assert not (tmp_path / "uploads" / "queued").exists()
+    # shutdown cancels the running job; its upload goes with it
+    queue.shutdown()
+    assert not (tmp_path / "uploads" / "running").exists()
+    _wait(queue, running.id, [CANCELLED])
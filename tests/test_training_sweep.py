@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("mlflow")
+
+from app.models.task_config import TabularConfig
+from app.services.training import training_service
+from app.services.training.training_service import TrainingService, _cpu_slots
+
+
+def test_cpu_slots_partition_available_cpus():
+    slots = _cpu_slots(1000)
+    flat = [c for slot in slots for c in slot]
+    assert len(flat) == len(set(flat))
+    assert all(slots)
+    assert len(_cpu_slots(1)) == 1
+
+
+def test_sweep_trains_every_config_and_registers_best(tmp_path, monkeypatch):
+    registered = {}
+    monkeypatch.setattr(training_service, "register_model", lambda run_id, path, metadata: registered.update({run_id: metadata}))
+    monkeypatch.setattr(training_service.settings, "ARTIFACTS_DIR", str(tmp_path))
+    monkeypatch.setattr(training_service.settings, "FEATURE_STORE_DIR", str(tmp_path / "feature_store"))
+    training_service.mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"signal": [list(rng.normal(size=20)) for _ in range(60)], "x": rng.normal(size=60)})
+    df["label"] = 3.0 * df["x"]
+    configs = [TabularConfig(presets="medium_quality", time_limit=t) for t in (5, 10)]
+
+    result = TrainingService().train_sweep(df, "label", ["signal"], configs, max_workers=2)
+    assert [m["time_limit"] for m in result["runs"]] == [5, 10]
+    assert all(m["error"] is None for m in result["runs"])
+    assert list(registered) == [result["best_run_id"]]
+    assert registered[result["best_run_id"]]["sweep_run_id"] == result["sweep_run_id"]
+
+
+def test_fallback_fit_streams_feature_chunks(tmp_path, monkeypatch):
+    if training_service.TabularPredictor is not None:
+        pytest.skip("AutoGluon is installed; the fallback trainer is not used")
+    scores = []
+    monkeypatch.setattr(training_service, "register_model", lambda run_id, path, metadata: None)
+    monkeypatch.setattr(training_service.mlflow, "log_metric", lambda k, v: scores.append(v))
+    monkeypatch.setattr(training_service.settings, "SIMPLE_FIT_CHUNK_ROWS", 16)
+    training_service.mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"signal": [rng.normal(size=20) for _ in range(90)], "x": rng.normal(size=90)})
+    df["label"] = 3.0 * df["x"] + rng.normal(scale=0.1, size=90)
+    consumed = []
+
+    def chunks():
+        for start in range(0, len(df), 25):
+            consumed.append(start)
+            yield df.iloc[start:start + 25]
+
+    config = TabularConfig(presets="medium_quality", time_limit=5)
+    TrainingService().train_tabular(chunks(), "label", ["signal"], config, artifact_dir=tmp_path / "run")
+    assert consumed == [0, 25, 50, 75]
+
+    # the single-pass score matches the RMSE of the saved model's predictions
+    from app.services.predictors.simple_tabular import SimpleTabularPredictor
+
+    model = SimpleTabularPredictor.load(str(tmp_path / "run" / "simple" / "simple_model.npz"))
+    features = TrainingService._build_training_frame(df, training_service.CurveFeatureExtractor(["signal"]), None)
+    rmse = np.sqrt(np.mean((model.predict(features.drop(columns=["label"])).to_numpy() - features["label"].to_numpy()) ** 2))
+    assert scores[-1] == pytest.approx(-rmse, rel=1e-6)
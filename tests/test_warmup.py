@@ -0,0 +1,62 @@
+import pandas as pd
+
+from app.core import config
+from app.services.predictors import warmup
+from app.services.predictors.simple_tabular import SimpleTabularPredictor
+
+
+class _Predictor:
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.frames = []
+
+    def predict(self, df):
+        self.frames.append(df)
+        return pd.Series([0.0] * len(df))
+
+
+def test_synthetic_frame_from_predictor_schema():
+    frame = warmup.synthetic_frame(_Predictor({"temperature": (0, 1), "pressure": (0, 1)}))
+    assert list(frame.columns) == ["temperature", "pressure"]
+    assert len(frame) == 1
+    assert warmup.synthetic_frame(_Predictor()) is None
+    assert warmup.synthetic_frame(SimpleTabularPredictor()) is None
+
+
+def test_warm_up_models_sets_readiness(monkeypatch):
+    monkeypatch.setattr(config, "PRELOAD_RUN_IDS", [])
+    monkeypatch.setattr(warmup, "warmup_state", warmup.WarmupState())
+    known = _Predictor({"x": (0, 1)})
+
+    def broken():
+        raise OSError("missing artifacts")
+
+    warmup.warm_up_models({"known": lambda: known, "absent": lambda: None})
+    assert warmup.warmup_state.ready
+    assert warmup.warmup_state.as_dict()["models"] == {"known": "warm", "absent": "skipped"}
+    assert len(known.frames) == 1
+
+    monkeypatch.setattr(config, "WARMUP_RETRY_S", 0)
+    warmup.warm_up_models({"broken": broken})
+    # a failed model is reported but does not keep the replica unready
+    assert warmup.warmup_state.status == "degraded"
+    assert warmup.warmup_state.ready
+    assert warmup.warmup_state.as_dict()["errors"] == {"broken": "missing artifacts"}
+
+
+def test_failed_preloads_are_retried(monkeypatch):
+    monkeypatch.setattr(warmup, "warmup_state", warmup.WarmupState())
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OSError("registry volume not mounted yet")
+        return _Predictor({"x": (0, 1)})
+
+    warmup.warmup_state.status = "degraded"
+    warmup.warmup_state.record_error("flaky", "registry volume not mounted yet")
+    warmup.retry_failed({"flaky": flaky}, delay=0.001, max_delay=0.002)
+    assert len(attempts) == 3
+    assert warmup.warmup_state.status == "ready"
+    assert warmup.warmup_state.as_dict()["models"] == {"flaky": "warm"}